@@ -0,0 +1,103 @@
+"""
+Benchmark clash detection over many leagues sharing a few venues.
+
+Builds synthetic leagues (several of our teams per ground, weekly fixtures
+over many seasons), then times league_bookings() and the sweep in
+find_clashes(). With --check, the result is compared with a pairwise
+comparison of every booking (slow; use with small --matches).
+
+Usage:
+    python benchmarks/bench_clashes.py [--matches 50000] [--teams 12] [--check]
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import random
+import sys
+import time
+from datetime import date, time as dtime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ggbowlscalendar.clashes import find_clashes, league_bookings  # noqa: E402
+from ggbowlscalendar.models import VENUE_AWAY, VENUE_HOME, League, Match, TeamRegistry  # noqa: E402
+
+OPPONENT_COUNT = 40
+GROUND_COUNT = 3
+START_TIMES = (dtime(14, 0), dtime(14, 30), dtime(18, 30), dtime(19, 0))
+
+
+def registry(team_count: int) -> TeamRegistry:
+    teams = {
+        f"OPP{i}": {"name": f"Opponent Club {i}", "location": f"{i} Green Lane, Town"}
+        for i in range(OPPONENT_COUNT)
+    }
+    for t in range(team_count):
+        teams[f"ME{t}"] = {"name": f"Falls {t}", "location": f"Falls Ground {t % GROUND_COUNT}"}
+    return TeamRegistry.from_dict(teams)
+
+
+def leagues(match_count: int, team_count: int) -> list[League]:
+    rng = random.Random(1)
+    per_team = match_count // team_count
+    start = date(2000, 4, 1)
+    result = []
+    for t in range(team_count):
+        # Roughly one match a week per team, on one of two evenings
+        matches = [
+            Match(
+                venue=rng.choice((VENUE_HOME, VENUE_AWAY)),
+                opp_id=f"OPP{rng.randrange(OPPONENT_COUNT)}",
+                date=start + timedelta(days=7 * i + rng.randrange(2)),
+                start_time=rng.choice(START_TIMES),
+            )
+            for i in range(per_team)
+        ]
+        result.append(League(my_team_id=f"ME{t}", duration_hours=2 + t % 2, default_day="Tue",
+                             default_time=START_TIMES[0], matches=matches))
+    return result
+
+
+def pairwise(bookings) -> int:
+    return sum(
+        1 for a, b in itertools.combinations(bookings, 2)
+        if a.venue == b.venue and a.start < b.end and b.start < a.end and a.fixture != b.fixture
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--matches", type=int, default=50_000)
+    parser.add_argument("--teams", type=int, default=12)
+    parser.add_argument("--check", action="store_true", help="also run the O(n^2) comparison")
+    args = parser.parse_args()
+
+    teams = registry(args.teams)
+    data = leagues(args.matches, args.teams)
+
+    started = time.perf_counter()
+    bookings = league_bookings(data, teams)
+    booked = time.perf_counter() - started
+
+    started = time.perf_counter()
+    clashes = find_clashes(bookings)
+    swept = time.perf_counter() - started
+
+    print(f"{len(bookings)} bookings, {len(clashes)} clashes")
+    print(f"  bookings {booked:6.3f}s  sweep {swept:6.3f}s  total {booked + swept:6.3f}s")
+
+    if args.check:
+        started = time.perf_counter()
+        expected = pairwise(bookings)
+        print(f"  pairwise {time.perf_counter() - started:6.3f}s  ({expected} clashes)")
+        if expected != len(clashes):
+            print("  RESULTS DIFFER")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+"""
+Benchmark the icalendar and streaming ICS backends on a synthetic league.
+
+For each backend the per-event time and peak Python memory (tracemalloc)
+are reported. Timing and memory are measured in separate passes because
+tracemalloc slows allocation-heavy code considerably.
+
+Usage:
+    python benchmarks/bench_ics_backends.py [--matches 50000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, datetime, time as dtime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ggbowlscalendar.calendar import build_calendar, iter_event_data  # noqa: E402
+from ggbowlscalendar.ics_writer import write_calendar  # noqa: E402
+from ggbowlscalendar.models import League, Match, TeamRegistry  # noqa: E402
+
+DTSTAMP = datetime(2024, 1, 1, tzinfo=timezone.utc)
+OPPONENT_COUNT = 40
+
+
+def synthetic_league(match_count: int) -> tuple[League, TeamRegistry]:
+    """A league of *match_count* matches against a rota of opponents."""
+    teams = {
+        f"OPP{i}": {"name": f"Opponent Club {i}", "location": f"{i} Green Lane, Town, BT{i} 1AA"}
+        for i in range(OPPONENT_COUNT)
+    }
+    teams["ME"] = {"name": "Falls", "location": "63 Andersonstown Rd, Belfast BT11 9AH"}
+    start = date(2000, 1, 1)
+    matches = [
+        Match(
+            venue="home" if i % 2 else "away",
+            opp_id=f"OPP{i % OPPONENT_COUNT}",
+            date=start + timedelta(days=i),
+            start_time=dtime(18, 30),
+            our_score=(i * 7) % 21,
+            opp_score=(i * 5) % 21,
+            label="Cup" if i % 10 == 0 else "",
+        )
+        for i in range(match_count)
+    ]
+    league = League(my_team_id="ME", duration_hours=3, default_day="Tue",
+                    default_time=dtime(18, 30), matches=matches)
+    return league, TeamRegistry.from_dict(teams)
+
+
+def icalendar_backend(league: League, registry: TeamRegistry, path: Path) -> None:
+    path.write_bytes(build_calendar(league, registry, DTSTAMP).to_ical())
+
+
+def stream_backend(league: League, registry: TeamRegistry, path: Path) -> None:
+    with open(path, "wb") as fh:
+        write_calendar(fh, iter_event_data(league, registry, DTSTAMP))
+
+
+BACKENDS = {"icalendar": icalendar_backend, "stream": stream_backend}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--matches", type=int, default=50_000)
+    parser.add_argument("--output", type=Path, default=Path(tempfile.gettempdir()) / "bench.ics")
+    args = parser.parse_args()
+
+    league, registry = synthetic_league(args.matches)
+    print(f"{args.matches} matches")
+
+    outputs = {}
+    for name, backend in BACKENDS.items():
+        path = args.output.with_name(f"{args.output.stem}-{name}.ics")
+
+        started = time.perf_counter()
+        backend(league, registry, path)
+        elapsed = time.perf_counter() - started
+
+        tracemalloc.start()
+        backend(league, registry, path)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        outputs[name] = path.read_bytes()
+        print(
+            f"  {name:<10} {elapsed:7.2f}s  {elapsed / args.matches * 1e6:7.1f} µs/event  "
+            f"peak {peak / 2 ** 20:8.1f} MiB"
+        )
+        path.unlink()
+
+    identical = len(set(outputs.values())) == 1
+    print("  outputs identical" if identical else "  OUTPUTS DIFFER")
+    return 0 if identical else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
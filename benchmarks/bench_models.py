@@ -0,0 +1,173 @@
+"""
+Benchmark the slotted, frozen Match against the previous plain dataclass.
+
+For a synthetic league, reports per-instance memory (tracemalloc), the time
+to build every Match, and the time to render the league: console table rows
+plus the .ics stream. The "before" class is a copy of the old Match, which
+had a __dict__ and recomputed result/scheduled_datetime() on every call.
+
+Usage:
+    python benchmarks/bench_models.py [--matches 100000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import date, datetime, time as dtime, timedelta, timezone
+from pathlib import Path
+from typing import Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ggbowlscalendar.calendar import iter_event_data  # noqa: E402
+from ggbowlscalendar.ics_writer import write_calendar  # noqa: E402
+from ggbowlscalendar.models import TBD, VENUE_HOME, League, Match, TeamRegistry  # noqa: E402
+from ggbowlscalendar.printer import _build_table  # noqa: E402
+
+DTSTAMP = datetime(2024, 1, 1, tzinfo=timezone.utc)
+OPPONENT_COUNT = 40
+
+
+@dataclass
+class LegacyMatch:
+    """Match as it was before: per-instance __dict__, derived values recomputed."""
+
+    venue: str
+    opp_id: str
+    date: date
+    start_time: dtime
+    our_score: int = 0
+    opp_score: int = 0
+    rescheduled_date: Optional[date] = None
+    rescheduled_time: Optional[dtime] = None
+    sub_team: Optional[str] = None
+    label: str = ""
+    neutral_venue_id: Optional[str] = None
+    fixed_start: bool = False
+
+    @property
+    def played(self) -> bool:
+        return not (self.our_score == 0 and self.opp_score == 0)
+
+    @property
+    def result(self) -> str:
+        if not self.played:
+            return " "
+        if self.our_score > self.opp_score:
+            return "W"
+        if self.opp_score > self.our_score:
+            return "L"
+        return "D"
+
+    @property
+    def is_home(self) -> bool:
+        return self.venue == VENUE_HOME
+
+    @property
+    def effective_date(self) -> Optional[date]:
+        if self.rescheduled_date == TBD:
+            return None
+        return self.rescheduled_date or self.date
+
+    @property
+    def effective_time(self) -> dtime:
+        return self.rescheduled_time or self.start_time
+
+    def scheduled_datetime(self) -> Optional[datetime]:
+        eff_date = self.effective_date
+        if eff_date is None:
+            return None
+        return datetime.combine(eff_date, self.effective_time)
+
+    def original_datetime(self) -> datetime:
+        return datetime.combine(self.date, self.start_time)
+
+    def score_display(self) -> tuple[str, str]:
+        if not self.played:
+            return "", ""
+        return str(self.our_score), str(self.opp_score)
+
+    def notes(self) -> str:
+        return self.label
+
+
+def match_kwargs(match_count: int) -> list[dict]:
+    start = date(2000, 1, 1)
+    return [
+        {
+            "venue": "home" if i % 2 else "away",
+            "opp_id": f"OPP{i % OPPONENT_COUNT}",
+            "date": start + timedelta(days=i),
+            "start_time": dtime(18, 30),
+            "our_score": (i * 7) % 21,
+            "opp_score": (i * 5) % 21,
+            "rescheduled_date": start + timedelta(days=i + 7) if i % 9 == 0 else None,
+            "label": "Cup" if i % 10 == 0 else "",
+        }
+        for i in range(match_count)
+    ]
+
+
+def registry() -> TeamRegistry:
+    teams = {
+        f"OPP{i}": {"name": f"Opponent Club {i}", "location": f"{i} Green Lane, Town, BT{i} 1AA"}
+        for i in range(OPPONENT_COUNT)
+    }
+    teams["ME"] = {"name": "Falls", "location": "63 Andersonstown Rd, Belfast BT11 9AH"}
+    return TeamRegistry.from_dict(teams)
+
+
+def build(cls: type, kwargs: list[dict]) -> League:
+    return League(my_team_id="ME", duration_hours=3, default_day="Tue",
+                  default_time=dtime(18, 30), matches=[cls(**kw) for kw in kwargs])
+
+
+def render(league: League, teams: TeamRegistry) -> bytes:
+    _build_table(league, teams)   # shares League.resolve with the calendar
+    buf = io.BytesIO()
+    write_calendar(buf, iter_event_data(league, teams, DTSTAMP))
+    return buf.getvalue()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--matches", type=int, default=100_000)
+    args = parser.parse_args()
+
+    kwargs = match_kwargs(args.matches)
+    teams = registry()
+    print(f"{args.matches} matches")
+
+    outputs = {}
+    for name, cls in (("before", LegacyMatch), ("after", Match)):
+        tracemalloc.start()
+        league = build(cls, kwargs)
+        size, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del league
+
+        started = time.perf_counter()
+        league = build(cls, kwargs)
+        built = time.perf_counter() - started
+
+        started = time.perf_counter()
+        outputs[name] = render(league, teams)
+        rendered = time.perf_counter() - started
+
+        print(
+            f"  {name:<7} {size / args.matches:6.0f} B/match  "
+            f"build {built:6.2f}s  render {rendered:6.2f}s  total {built + rendered:6.2f}s"
+        )
+
+    identical = outputs["before"] == outputs["after"]
+    print("  outputs identical" if identical else "  OUTPUTS DIFFER")
+    return 0 if identical else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,103 @@
+"""
+Benchmark TeamRegistry lookups against the previous implementation.
+
+A registry of 10k teams (plus CLUBCOMP) is asked for a stream of IDs that
+mixes known teams, a pool of unknown IDs and club-internal competitions.
+Reports lookups per second for a get() per ID and for one get_many(), and
+how many distinct placeholder Team objects each approach allocated. The
+"before" registry is a copy of the old get(), which tested the "Club"
+prefix and built a new placeholder on every call.
+
+Usage:
+    python benchmarks/bench_registry.py [--teams 10000] [--lookups 1000000] [--unknown 0.1]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ggbowlscalendar.models import Team, TeamRegistry  # noqa: E402
+
+UNKNOWN_POOL = 1_000
+CLUB_SHARE = 0.05
+
+
+class LegacyTeamRegistry:
+    """TeamRegistry.get as it was before: no memo, a new placeholder every time."""
+
+    def __init__(self, teams: dict[str, Team]) -> None:
+        self._teams = teams
+
+    def get(self, team_id: str) -> Team:
+        lookup_id = "CLUBCOMP" if team_id.startswith("Club") else team_id
+        if lookup_id in self._teams:
+            return self._teams[lookup_id]
+        return Team(team_id=team_id, name=f"***{team_id}***", location="TBD")
+
+
+def teams_data(team_count: int) -> dict:
+    data = {
+        f"T{i:05d}": {"name": f"Team {i}", "location": f"{i} Green Lane, Town"}
+        for i in range(team_count)
+    }
+    data["CLUBCOMP"] = {"name": "Club Competition", "location": "Home Ground"}
+    return data
+
+
+def lookup_ids(team_count: int, count: int, unknown_share: float, seed: int = 1) -> list[str]:
+    rng = random.Random(seed)
+    ids = []
+    for _ in range(count):
+        roll = rng.random()
+        if roll < unknown_share:
+            team_id = f"U{rng.randrange(UNKNOWN_POOL):04d}"
+        elif roll < unknown_share + CLUB_SHARE:
+            team_id = rng.choice(("ClubSingles", "ClubPairs", "ClubTriples"))
+        else:
+            team_id = f"T{rng.randrange(team_count):05d}"
+        # Strings built at run time, as parsed YAML values are
+        ids.append("".join(team_id))
+    return ids
+
+
+def timed(label: str, lookup, ids: list[str]) -> list[Team]:
+    started = time.perf_counter()
+    teams = lookup(ids)
+    seconds = time.perf_counter() - started
+    placeholders = len({id(team) for team in teams if team.name.startswith("***")})
+    print(f"  {label:<16} {len(ids) / seconds / 1e6:6.2f}M lookups/s  "
+          f"{placeholders:>8} placeholder objects")
+    return teams
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--teams", type=int, default=10_000)
+    parser.add_argument("--lookups", type=int, default=1_000_000)
+    parser.add_argument("--unknown", type=float, default=0.1, help="share of unknown IDs")
+    args = parser.parse_args()
+
+    data = teams_data(args.teams)
+    ids = lookup_ids(args.teams, args.lookups, args.unknown)
+    print(f"{args.teams} teams, {args.lookups} lookups, {args.unknown:.0%} unknown, {CLUB_SHARE:.0%} club")
+
+    legacy = LegacyTeamRegistry({team.team_id: team for team in TeamRegistry.from_dict(data).teams()})
+    registry = TeamRegistry.from_dict(data)
+    before = timed("before get()", lambda ids: [legacy.get(i) for i in ids], ids)
+    after = timed("after get()", lambda ids: [registry.get(i) for i in ids], ids)
+    many = timed("after get_many()", TeamRegistry.from_dict(data).get_many, ids)
+    print(f"  {len(registry.unknown_ids)} unknown IDs recorded")
+
+    identical = before == after == many
+    print("  results identical" if identical else "  RESULTS DIFFER")
+    return 0 if identical else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,117 @@
+"""
+Benchmark the season database against parsing the YAML data tree.
+
+A synthetic tree of --seasons seasons x --teams games files is written to a
+temporary directory. Reports the time to compile it into a SeasonDB (cold),
+to refresh it with nothing and with one file changed, to load every league
+from YAML and from the database, and to answer a head-to-head query across
+every season by scanning the YAML against the indexed lookup. The leagues
+and query answers from both sources are compared.
+
+Usage:
+    python benchmarks/bench_seasondb.py [--seasons 20] [--teams 20] [--matches 40]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+import yaml
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+os.environ["ICAL_YAML_CACHE"] = "off"   # time the parse, not the pickle cache
+
+from ggbowlscalendar.models import League  # noqa: E402
+from ggbowlscalendar.repository import DataRepository  # noqa: E402
+from ggbowlscalendar.seasondb import SeasonDB  # noqa: E402
+from ggbowlscalendar.utils import load_yaml  # noqa: E402
+
+OPPONENTS = 60
+RIVAL = "OPP007"
+
+
+def write_tree(base: Path, seasons: int, teams: int, matches: int, seed: int = 1) -> None:
+    rng = random.Random(seed)
+    (base / "teams.yml").write_text(yaml.safe_dump({
+        f"OPP{i:03d}": {"name": f"Opponents {i}", "location": f"{i} Green Lane, Town"}
+        for i in range(OPPONENTS)
+    } | {
+        f"CLUB{t:02d}": {"name": f"Club team {t}", "location": "Home Ground"} for t in range(teams)
+    }))
+    for season in range(2000, 2000 + seasons):
+        folder = base / str(season)
+        folder.mkdir()
+        for team in range(teams):
+            start = date(season, 4, 1)
+            games = [
+                {
+                    rng.choice(("home", "away")): f"OPP{rng.randrange(OPPONENTS):03d}",
+                    "date": start + timedelta(days=7 * week),
+                    "our_score": rng.randrange(30),
+                    "opp_score": rng.randrange(30),
+                }
+                for week in range(matches)
+            ]
+            data = {"me": f"CLUB{team:02d}", "day": "Tue", "start_time": "18:00", "duration": 3,
+                    "matches": games}
+            (folder / f"club{team:02d}_games_{season}.yml").write_text(yaml.safe_dump(data))
+
+
+def timed(label: str, func):
+    started = time.perf_counter()
+    value = func()
+    print(f"  {label:<32} {time.perf_counter() - started:8.3f}s")
+    return value
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seasons", type=int, default=20)
+    parser.add_argument("--teams", type=int, default=20)
+    parser.add_argument("--matches", type=int, default=40)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        base = Path(tmp) / "data"
+        base.mkdir()
+        write_tree(base, args.seasons, args.teams, args.matches)
+        repository = DataRepository.scan(base)
+        files = repository.list_files()
+        print(f"{len(files)} games files, {len(files) * args.matches} matches")
+
+        with SeasonDB.open(Path(tmp) / "seasons.sqlite3") as db:
+            timed("compile (cold)", lambda: db.refresh(repository))
+            timed("refresh, nothing changed", lambda: db.refresh(repository))
+            changed = files[0].path
+            changed.write_text(changed.read_text().replace("our_score: ", "our_score: 1", 1))
+            timed("refresh, one file changed", lambda: db.refresh(DataRepository.scan(base)))
+
+            from_yaml = timed("load leagues from YAML", lambda: [
+                League.from_dict(load_yaml(df.path)) for df in files
+            ])
+            from_db = timed("load leagues from database", lambda: [
+                League.from_db(db, df.team, df.season) for df in files
+            ])
+            scanned = timed(f"head-to-head {RIVAL}, YAML scan", lambda: sorted(
+                (m.effective_date, df.team)
+                for df in files for m in League.from_dict(load_yaml(df.path)).matches if m.opp_id == RIVAL
+            ))
+            indexed = timed(f"head-to-head {RIVAL}, indexed", lambda: sorted(
+                (found.match.effective_date, found.team) for found in db.head_to_head(RIVAL)
+            ))
+
+    identical = from_yaml == from_db and scanned == indexed
+    print("  results identical" if identical else "  RESULTS DIFFER")
+    return 0 if identical else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,72 @@
+"""
+Benchmark the pure-Python and libyaml (C) YAML loaders over the data tree.
+
+Every *.yml file under the data directory is parsed with both loaders; the
+parsed values (including their date/time types) are compared, and the total
+parse time for each loader is reported.
+
+Usage:
+    python benchmarks/bench_yaml_loader.py [DATA_DIR] [--repeat N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import yaml
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ggbowlscalendar.utils import _parse_yaml  # noqa: E402
+
+DEFAULT_DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+
+
+def _typed(value):
+    """Return *value* with every leaf tagged by its type, for strict comparison."""
+    if isinstance(value, dict):
+        return {k: _typed(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_typed(v) for v in value]
+    return (type(value).__name__, value)
+
+
+def _time_loader(paths: list[Path], loader: type, repeat: int) -> tuple[float, dict]:
+    parsed = {}
+    started = time.perf_counter()
+    for _ in range(repeat):
+        parsed = {path: _parse_yaml(path, loader) for path in paths}
+    return time.perf_counter() - started, parsed
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("data_dir", nargs="?", type=Path, default=DEFAULT_DATA_DIR)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    paths = sorted(args.data_dir.rglob("*.yml"))
+    print(f"{len(paths)} YAML files under {args.data_dir}, {args.repeat} passes")
+
+    py_secs, py_parsed = _time_loader(paths, yaml.SafeLoader, args.repeat)
+    print(f"  SafeLoader  (pure Python): {py_secs:8.3f}s")
+
+    if not hasattr(yaml, "CSafeLoader"):
+        print("  CSafeLoader (libyaml):     not available in this PyYAML build")
+        return 0
+
+    c_secs, c_parsed = _time_loader(paths, yaml.CSafeLoader, args.repeat)
+    print(f"  CSafeLoader (libyaml):     {c_secs:8.3f}s  ({py_secs / c_secs:.1f}x faster)")
+
+    mismatches = [p for p in paths if _typed(py_parsed[p]) != _typed(c_parsed[p])]
+    for path in mismatches:
+        print(f"  MISMATCH: {path}")
+    print("  parsed values identical" if not mismatches else f"  {len(mismatches)} files differ")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,155 @@
+"""
+Load-test the feed server over loopback.
+
+Starts the asyncio feed server on a synthetic data tree (or targets an
+already running server with --url) and fires --requests GETs from
+--connections concurrent keep-alive connections. The first request on every
+connection arrives at once while the feed is still cold, so the number of
+renders shows whether the burst was coalesced into one build. Reports
+p50/p99 latency and requests per second.
+
+Usage:
+    python benchmarks/load_test.py [--requests 5000] [--connections 50] [--matches 2000]
+    python benchmarks/load_test.py --url http://127.0.0.1:5000/fallsvets1/2026.ics
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import yaml
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ggbowlscalendar.repository import DataRepository  # noqa: E402
+from ggbowlscalendar.server import AsyncFeedServer, FeedCache  # noqa: E402
+
+OPPONENT_COUNT = 40
+
+
+def write_synthetic_data(base: Path, match_count: int) -> None:
+    """A teams.yml and one games file of *match_count* matches under *base*."""
+    teams = {
+        f"OPP{i}": {"name": f"Opponent Club {i}", "location": f"{i} Green Lane, Town, BT{i} 1AA"}
+        for i in range(OPPONENT_COUNT)
+    }
+    teams["ME"] = {"name": "Falls", "location": "63 Andersonstown Rd, Belfast BT11 9AH"}
+    start = date(2000, 1, 1)
+    games = {
+        "me": "ME",
+        "day": "Tue",
+        "start_time": "18:30",
+        "duration": 3,
+        "matches": [
+            {
+                "home" if i % 2 else "away": f"OPP{i % OPPONENT_COUNT}",
+                "date": start + timedelta(days=i),
+                "our_score": (i * 7) % 21,
+                "opp_score": (i * 5) % 21,
+            }
+            for i in range(match_count)
+        ],
+    }
+    (base / "teams.yml").write_text(yaml.safe_dump(teams))
+    (base / "2024").mkdir()
+    (base / "2024" / "loadtest_games_2024.yml").write_text(yaml.safe_dump(games))
+
+
+def start_server(base: Path) -> tuple[str, FeedCache]:
+    """Run the feed server for *base* on a background thread; returns (url, cache)."""
+    cache = FeedCache(DataRepository.scan(base), base / "teams.yml")
+    ready = threading.Event()
+    address: list = []
+
+    async def _serve() -> None:
+        server = await AsyncFeedServer(cache).start("127.0.0.1", 0)
+        address.append(server.sockets[0].getsockname())
+        ready.set()
+        async with server:
+            await server.serve_forever()
+
+    threading.Thread(target=asyncio.run, args=(_serve(),), daemon=True).start()
+    ready.wait()
+    host, port = address[0][:2]
+    return f"http://{host}:{port}/loadtest/2024.ics", cache
+
+
+async def _worker(url: str, count: int, start: asyncio.Event, latencies: list[float]) -> None:
+    parts = urlsplit(url)
+    reader, writer = await asyncio.open_connection(parts.hostname, parts.port or 80)
+    request = f"GET {parts.path} HTTP/1.1\r\nHost: {parts.netloc}\r\n\r\n".encode("latin-1")
+    await start.wait()
+    try:
+        for _ in range(count):
+            started = time.perf_counter()
+            writer.write(request)
+            await writer.drain()
+            head = await reader.readuntil(b"\r\n\r\n")
+            length = 0
+            for line in head.split(b"\r\n"):
+                name, _, value = line.partition(b":")
+                if name.strip().lower() == b"content-length":
+                    length = int(value)
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - started)
+    finally:
+        writer.close()
+
+
+async def run_load(url: str, requests: int, connections: int) -> tuple[list[float], float]:
+    latencies: list[float] = []
+    start = asyncio.Event()
+    per_connection, extra = divmod(requests, connections)
+    workers = [
+        asyncio.ensure_future(_worker(url, per_connection + (i < extra), start, latencies))
+        for i in range(connections)
+    ]
+    await asyncio.sleep(0.1)  # let every connection open before the burst
+    started = time.perf_counter()
+    start.set()
+    await asyncio.gather(*workers)
+    return latencies, time.perf_counter() - started
+
+
+def _percentile(values: list[float], pct: int) -> float:
+    return statistics.quantiles(values, n=100, method="inclusive")[pct - 1]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--connections", type=int, default=50)
+    parser.add_argument("--matches", type=int, default=2000,
+                        help="size of the synthetic league (ignored with --url)")
+    parser.add_argument("--url", help="target an already running server instead")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = None
+        url = args.url
+        if url is None:
+            write_synthetic_data(Path(tmp), args.matches)
+            url, cache = start_server(Path(tmp))
+
+        latencies, elapsed = asyncio.run(run_load(url, args.requests, args.connections))
+
+    print(f"{len(latencies)} requests over {args.connections} connections to {url}")
+    print(f"  p50 {_percentile(latencies, 50) * 1e3:8.2f} ms")
+    print(f"  p99 {_percentile(latencies, 99) * 1e3:8.2f} ms")
+    print(f"  {len(latencies) / elapsed:10.0f} requests/s")
+    if cache is not None:
+        print(f"  {cache.renders} render(s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
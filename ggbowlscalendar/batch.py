@@ -0,0 +1,381 @@
+"""
+Batch calendar generation — build many team/season calendars in one process,
+optionally fanned out across a pool of worker processes and skipping any
+calendar whose inputs are unchanged since the last build.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from .calendar import EventWindow, build_calendar, event_end, iter_event_data, reproducible_dtstamp
+from .depindex import DependencyIndex
+from .event_cache import EventCache
+from .ics_diff import CalendarDiff, EventChange, format_change, summarize_changes
+from .ics_writer import IcsWriter, write_calendar
+from .manifest import BuildManifest, file_digest, input_digests
+from .models import League, TeamRegistry
+from .repository import DataFile, league_teams_path
+from .seasondb import shared_season_db
+from .utils import get_output_dir, league_registry, load_yaml, open_ical_output, write_ical_file
+
+LOGGER = logging.getLogger(__name__)
+
+GAMES_MARKER = "_games_"
+
+BACKEND_ICALENDAR = "icalendar"  # build an icalendar object tree, then to_ical()
+BACKEND_STREAM = "stream"        # stream events straight to the file (ics_writer)
+BACKENDS = (BACKEND_ICALENDAR, BACKEND_STREAM)
+
+TEAMS_INPUT = "teams"  # the options.shared_inputs key for teams.yml
+LEAGUE_TEAMS_INPUT = "league_teams"  # a job's own '<team>_teams.yml', if it has one
+
+
+@dataclass
+class BuildJob:
+    """One games file to be turned into a calendar."""
+
+    team: str
+    year: str
+    path: Path
+
+    @classmethod
+    def from_path(cls, path: Path) -> BuildJob:
+        """Derive the team and year from a '<team>_games_<year>.yml' file name."""
+        team, _, year = path.stem.rpartition(GAMES_MARKER)
+        return cls(team=team, year=year, path=path)
+
+    @classmethod
+    def from_data_file(cls, data_file: DataFile) -> BuildJob:
+        return cls(team=data_file.team, year=data_file.season, path=data_file.path)
+
+    @property
+    def ics_filename(self) -> str:
+        return f"{self.team}_games_{self.year}.ics"
+
+    @property
+    def archive_filename(self) -> str:
+        """The feed of events older than the rolling window (see BuildOptions.window)."""
+        return f"{self.team}_games_{self.year}_archive.ics"
+
+    def output_filenames(self, window: Optional[EventWindow]) -> list[str]:
+        """Every file a build writes: the calendar and, with a *window*, its archive."""
+        return [self.ics_filename] if window is None else [self.ics_filename, self.archive_filename]
+
+
+@dataclass
+class BuildOptions:
+    """Settings shared by every job in a batch."""
+
+    # Inputs common to every job, e.g. {"teams": teams_path}
+    shared_inputs: dict[str, Path] = field(default_factory=dict)
+    # Stamp events from the inputs rather than the clock (see reproducible_dtstamp)
+    reproducible: bool = False
+    # How the .ics bytes are produced; both give identical output
+    backend: str = BACKEND_ICALENDAR
+    # Reuse serialized events from previous runs (implies the stream backend)
+    event_cache_dir: Optional[Path] = None
+    # Keep only recent and future events in the main feed; older ones go to an archive feed
+    window: Optional[EventWindow] = None
+    # Compare with the previous build: keep unchanged events' bytes, version and report the rest
+    diff: bool = False
+    # Load leagues from this season database (see seasondb.py) instead of parsing their YAML
+    season_db: Optional[Path] = None
+
+    def signature(self) -> str:
+        """The option values that change the output bytes, for the build manifest."""
+        signature = f"reproducible={self.reproducible}"
+        if self.window is not None:
+            signature += f" window={self.window.cutoff.date().isoformat()}"
+        if self.diff:
+            signature += " diff=True"
+        return signature
+
+
+@dataclass
+class BuildResult:
+    """The outcome of building a single job."""
+
+    job: BuildJob
+    seconds: float
+    event_count: int = 0
+    error: Optional[str] = None
+    skipped: bool = False  # inputs unchanged since the last build
+    cache_hits: int = 0
+    cache_misses: int = 0
+    # Per output file, what changed since its previous build (BuildOptions.diff)
+    changes: dict[str, list[EventChange]] = field(default_factory=dict)
+    # Team IDs missing from teams.yml, first met in this job (see TeamRegistry.unknown_ids)
+    unknown_team_ids: list[str] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def build_job(
+    job: BuildJob,
+    registry: TeamRegistry,
+    options: Optional[BuildOptions] = None,
+    league: Optional[League] = None,
+) -> BuildResult:
+    """
+    Load, build and write the calendar for *job*, timing the whole step.
+
+    Pass an already parsed *league* to skip loading job.path.
+    """
+    options = options or BuildOptions()
+    started = time.perf_counter()
+    registry = league_registry(registry, job.path)
+    if league is None:
+        league = _load_league(job, options)
+    dtstamp = (
+        reproducible_dtstamp(league, [job.path, *options.shared_inputs.values(), *_league_teams(job)])
+        if options.reproducible else None
+    )
+    result = BuildResult(job=job, seconds=0.0)
+    unknown_before = len(registry.unknown_ids)
+    outputs = [(job.ics_filename, options.window)]
+    if options.window is not None:
+        outputs.append((job.archive_filename, options.window.archived()))
+    for filename, window in outputs:
+        event_count = _write_output(filename, league, registry, options, dtstamp, window, result)
+        if filename == job.ics_filename:
+            result.event_count = event_count
+    result.unknown_team_ids = registry.unknown_ids[unknown_before:]
+    result.seconds = time.perf_counter() - started
+    return result
+
+
+def _league_teams(job: BuildJob) -> list[Path]:
+    """The job's own teams file, if it has one, as a list of inputs."""
+    teams_path = league_teams_path(job.path)
+    return [teams_path] if teams_path is not None and teams_path.is_file() else []
+
+
+def _load_league(job: BuildJob, options: BuildOptions) -> League:
+    """The league of *job*, from the season database if there is one and it has the league."""
+    if options.season_db is not None:
+        league = shared_season_db(options.season_db).league(job.team, job.year)
+        if league is not None:
+            return league
+        LOGGER.debug("%s not in the season database, parsing it", job.path.name)
+    return League.from_dict(load_yaml(job.path))
+
+
+def _write_output(
+    filename: str,
+    league: League,
+    registry: TeamRegistry,
+    options: BuildOptions,
+    dtstamp: Optional[datetime],
+    window: Optional[EventWindow],
+    result: BuildResult,
+) -> int:
+    """Write one calendar file, adding cache counts and changes to *result*; returns the event count."""
+    if options.diff:
+        diff = CalendarDiff.load(get_output_dir() / filename, modified=dtstamp)
+        with open_ical_output(filename) as fh, IcsWriter(fh) as writer:
+            for event_bytes in diff.render(iter_event_data(league, registry, dtstamp, window)):
+                writer.write_raw_event(event_bytes)
+        if diff.changes:
+            result.changes[filename] = diff.changes
+        return writer.event_count
+    if options.event_cache_dir is not None:
+        cache = EventCache(options.event_cache_dir / f"{filename}.events")
+        with open_ical_output(filename) as fh, IcsWriter(fh) as writer:
+            for event_bytes in cache.render(league, registry, dtstamp, window):
+                writer.write_raw_event(event_bytes)
+        cache.save()
+        result.cache_hits += cache.hits
+        result.cache_misses += cache.misses
+        return writer.event_count
+    if options.backend == BACKEND_STREAM:
+        with open_ical_output(filename) as fh:
+            return write_calendar(fh, iter_event_data(league, registry, dtstamp, window))
+    calendar = build_calendar(league, registry, dtstamp, window)
+    write_ical_file(filename, calendar.to_ical())
+    return _event_count(league, registry, window)
+
+
+def _event_count(league: League, registry: TeamRegistry, window: Optional[EventWindow]) -> int:
+    """How many events iter_event_data yields: timed from the resolved start, as it windows them."""
+    return sum(
+        1 for record in league.resolve(registry)
+        if record.scheduled is not None
+        and (window is None or window.includes(event_end(record.scheduled, league)))
+    )
+
+
+def _safe_build_job(
+    job: BuildJob,
+    registry: TeamRegistry,
+    options: BuildOptions,
+    league: Optional[League] = None,
+) -> BuildResult:
+    """Run build_job, turning any failure into an error result."""
+    started = time.perf_counter()
+    try:
+        return build_job(job, registry, options, league)
+    except Exception as exc:  # pylint: disable=broad-except
+        return BuildResult(
+            job=job,
+            seconds=time.perf_counter() - started,
+            error=f"{type(exc).__name__}: {exc}",
+        )
+
+
+# Registry and options shared by every job in a worker process (set by _init_worker)
+_WORKER_REGISTRY: Optional[TeamRegistry] = None
+_WORKER_OPTIONS: Optional[BuildOptions] = None
+
+
+def _init_worker(registry: TeamRegistry, options: BuildOptions) -> None:
+    global _WORKER_REGISTRY, _WORKER_OPTIONS  # pylint: disable=global-statement
+    _WORKER_REGISTRY = registry
+    _WORKER_OPTIONS = options
+
+
+def _worker_build_job(job: BuildJob) -> BuildResult:
+    return _safe_build_job(job, _WORKER_REGISTRY, _WORKER_OPTIONS)
+
+
+def resolve_workers(workers: int) -> int:
+    """Return the worker count to use; 0 or less means one per CPU."""
+    return workers if workers > 0 else (os.cpu_count() or 1)
+
+
+def run_batch(
+    jobs: list[BuildJob],
+    registry: TeamRegistry,
+    workers: int = 1,
+    manifest: Optional[BuildManifest] = None,
+    options: Optional[BuildOptions] = None,
+    dependencies: Optional[DependencyIndex] = None,
+) -> list[BuildResult]:
+    """
+    Build every job, sharing one *registry*.
+
+    With *workers* > 1 the jobs are spread over a process pool; the registry
+    is pickled once per worker rather than once per job. A failing job is
+    reported in its result rather than aborting the run. Results are always
+    returned in the same order as *jobs* so logging stays deterministic.
+
+    When a *manifest* is given, a job is skipped if its games file, every
+    file in options.shared_inputs, the generator version and the output
+    options all match what its output was last written from.
+
+    With *dependencies* as well (set_teams() already called), the teams.yml
+    input of each job is a digest of only the team entries its league
+    references, so editing one club leaves the other calendars skipped.
+    """
+    options = options or BuildOptions()
+    started = time.perf_counter()
+
+    results: list[Optional[BuildResult]] = [None] * len(jobs)
+    inputs: dict[int, dict[str, str]] = {}
+    if dependencies is not None:
+        dependencies.refresh(job.path for job in jobs)
+    if manifest is not None:
+        output_dir = get_output_dir()
+        shared = {**input_digests(**options.shared_inputs), "options": options.signature()}
+        for i, job in enumerate(jobs):
+            job_inputs = _job_inputs(job, shared, dependencies)
+            if job_inputs is None:
+                continue  # unreadable — let the build report the error
+            if manifest.is_current(output_dir / job.ics_filename, job_inputs):
+                results[i] = BuildResult(job=job, seconds=0.0, skipped=True)
+            else:
+                inputs[i] = job_inputs
+
+    pending = [i for i, result in enumerate(results) if result is None]
+    workers = min(resolve_workers(workers), len(pending)) or 1
+    for i, result in zip(pending, _build_all([jobs[i] for i in pending], registry, options, workers)):
+        results[i] = result
+
+    if manifest is not None:
+        for i in pending:
+            output, *also = (output_dir / name for name in jobs[i].output_filenames(options.window))
+            if results[i].ok and i in inputs:
+                manifest.record(output, inputs[i], also)
+            else:
+                manifest.forget(output)
+        manifest.save()
+    if dependencies is not None:
+        dependencies.save()
+
+    log_results(results, time.perf_counter() - started, workers)
+    return results
+
+
+def _job_inputs(
+    job: BuildJob, shared: dict[str, str], dependencies: Optional[DependencyIndex] = None
+) -> Optional[dict[str, str]]:
+    try:
+        job_inputs = {**shared, "games": file_digest(job.path)}
+    except OSError:
+        return None
+    for teams_path in _league_teams(job):
+        job_inputs[LEAGUE_TEAMS_INPUT] = file_digest(teams_path)
+    if dependencies is not None and TEAMS_INPUT in job_inputs:
+        teams_digest = dependencies.teams_digest(job.path)
+        if teams_digest is not None:
+            job_inputs[TEAMS_INPUT] = teams_digest
+    return job_inputs
+
+
+def _build_all(
+    jobs: list[BuildJob], registry: TeamRegistry, options: BuildOptions, workers: int
+) -> list[BuildResult]:
+    if workers == 1:
+        return [_safe_build_job(job, registry, options) for job in jobs]
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(registry, options)
+    ) as pool:
+        return list(pool.map(_worker_build_job, jobs))
+
+
+def log_results(
+    results: list[BuildResult], total_seconds: float, workers: int = 1
+) -> None:
+    """Log per-team timings followed by a one-line summary for the run."""
+    for result in results:
+        if result.skipped:
+            LOGGER.info("Skipped %-38s unchanged", result.job.ics_filename)
+        elif result.ok:
+            LOGGER.info(
+                "Built %-40s %4d events in %.3fs",
+                result.job.ics_filename, result.event_count, result.seconds,
+            )
+        else:
+            LOGGER.error("Failed %s: %s", result.job.ics_filename, result.error)
+        log_changes(result)
+    failed = sum(1 for r in results if not r.ok)
+    skipped = sum(1 for r in results if r.skipped)
+    hits = sum(r.cache_hits for r in results)
+    misses = sum(r.cache_misses for r in results)
+    if hits or misses:
+        LOGGER.info("Event cache — %d hits, %d misses", hits, misses)
+    unknown = dict.fromkeys(team_id for r in results for team_id in r.unknown_team_ids)
+    if unknown:
+        LOGGER.warning("Team IDs not in teams.yml: %s", ", ".join(unknown))
+    LOGGER.info(
+        "Batch complete — %d built, %d skipped, %d failed in %.3fs (%d worker%s)",
+        len(results) - failed - skipped, skipped, failed, total_seconds,
+        workers, "" if workers == 1 else "s",
+    )
+
+
+def log_changes(result: BuildResult) -> None:
+    """Log what changed in each output of *result* since its previous build."""
+    for filename, changes in result.changes.items():
+        LOGGER.info("Changed %s: %s", filename, summarize_changes(changes))
+        for change in changes:
+            LOGGER.info("    %s", format_change(change))
@@ -5,27 +5,97 @@ iCalendar (.ics) generator for league matches.
 from __future__ import annotations
 
 import logging
-from datetime import datetime, timedelta, timezone
+import os
+from dataclasses import dataclass, replace
+from datetime import date, datetime, time, timedelta, timezone
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable, Iterator, Optional
 
 from icalendar import Alarm, Calendar
 from icalendar.cal import Event
 
 from .models import League, Match, TeamRegistry
 
+if TYPE_CHECKING:
+    from .resolve import ResolvedMatch
+
 LOGGER = logging.getLogger(__name__)
 
 CALENDAR_DOMAIN = "mc-williams.co.uk"
 CALENDAR_PRODID = f"-//Bowling Calendar//{CALENDAR_DOMAIN}//"
 CALENDAR_TIMEZONE = "Europe/London"
 ALARM_OFFSET = timedelta(hours=-1)
+ALARM_ACTION = "DISPLAY"
+ALARM_DESCRIPTION = "Reminder"
 EVENT_PRE_START_BUFFER = timedelta(minutes=10)
+EVENT_PRIORITY = 5
+
+
+@dataclass(frozen=True)
+class EventData:
+    """The resolved values for one calendar event, independent of the writer."""
+
+    uid: str
+    summary: str
+    description: str
+    location: str
+    start: datetime
+    end: datetime
+    dtstamp: datetime
+    # Revision of a changed event (see ics_diff); omitted from the output while 0 / None
+    sequence: int = 0
+    last_modified: Optional[datetime] = None
+
+
+@dataclass(frozen=True)
+class EventWindow:
+    """
+    Which events a feed holds: those ending at or after *cutoff* or, for the
+    archive feed, those ending before it.
+
+    Event UIDs do not depend on the window, so an event that moves from the
+    current feed to the archive is the same event in a client subscribed to
+    both.
+    """
+
+    cutoff: datetime   # naive local time, like match times
+    archive: bool = False
+
+    @classmethod
+    def recent(cls, days: int, today: Optional[date] = None) -> EventWindow:
+        """
+        At least the last *days* days plus everything after.
+
+        The cutoff is moved back to a Monday, so the current and archive
+        feeds change at most once a week.
+        """
+        first = (today or date.today()) - timedelta(days=days)
+        first -= timedelta(days=first.weekday())
+        return cls(datetime.combine(first, time()))
 
+    def archived(self) -> EventWindow:
+        """The complementary window: everything this one leaves out."""
+        return replace(self, archive=not self.archive)
 
-def build_calendar(league: League, registry: TeamRegistry) -> Calendar:
+    def includes(self, event_end: datetime) -> bool:
+        return (event_end < self.cutoff) if self.archive else (event_end >= self.cutoff)
+
+
+def build_calendar(
+    league: League,
+    registry: TeamRegistry,
+    dtstamp: Optional[datetime] = None,
+    window: Optional[EventWindow] = None,
+) -> Calendar:
     """
     Build and return an iCalendar object for all scheduled matches in *league*.
 
-    Matches with no confirmed date (TBD) are silently skipped.
+    Matches with no confirmed date (TBD) are silently skipped. Events are
+    added in match order, and icalendar serialises properties in sorted
+    order, so the output depends only on the inputs and *dtstamp*. Pass a
+    fixed *dtstamp* (see reproducible_dtstamp) for byte-identical rebuilds;
+    by default every event is stamped with the current time. With a
+    *window*, only the events it includes are added.
     """
     if not league.matches:
         LOGGER.warning("No matches found — calendar will be empty.")
@@ -33,20 +103,59 @@ def build_calendar(league: League, registry: TeamRegistry) -> Calendar:
     cal = Calendar()
     _add_calendar_headers(cal)
 
-    now = datetime.now(timezone.utc)
-    my_team = registry.get(league.my_team_id)
+    for data in iter_event_data(league, registry, dtstamp, window):
+        cal.add_component(_build_event(data))
+        LOGGER.debug("Added event: %s", data.summary)
+
+    return cal
+
+
+def iter_event_data(
+    league: League,
+    registry: TeamRegistry,
+    dtstamp: Optional[datetime] = None,
+    window: Optional[EventWindow] = None,
+) -> Iterator[EventData]:
+    """
+    Yield the EventData for each scheduled match in *league*, in match order.
 
-    for match in league.matches:
-        match_dt = match.scheduled_datetime()
-        if match_dt is None:
-            LOGGER.debug("Skipping TBD match vs %s", match.opp_id)
+    This is the single source of event content for every output backend.
+    With a *window*, matches outside it are skipped.
+    """
+    now = dtstamp or datetime.now(timezone.utc)
+    my_team_name = registry.get(league.my_team_id).name
+
+    for record in league.resolve(registry):
+        if record.scheduled is None:
+            LOGGER.debug("Skipping TBD match vs %s", record.match.opp_id)
+            continue
+        if window is not None and not window.includes(event_end(record.scheduled, league)):
             continue
+        yield event_data(record, league, my_team_name, now)
 
-        event = _build_event(match, match_dt, league, registry, my_team.name, my_team.location, now)
-        cal.add_component(event)
-        LOGGER.debug("Added event: %s", event.get("summary"))
 
-    return cal
+def reproducible_dtstamp(league: League, input_paths: Iterable[Path] = ()) -> datetime:
+    """
+    Return a stable DTSTAMP for *league*, so identical inputs give identical output.
+
+    Sources, in order of preference:
+        1. $SOURCE_DATE_EPOCH (seconds since the Unix epoch)
+        2. a 'dtstamp' value in the games YAML
+        3. the newest modification time of *input_paths*
+
+    Raises:
+        ValueError: If none of these is available.
+    """
+    epoch = os.getenv("SOURCE_DATE_EPOCH")
+    if epoch:
+        return datetime.fromtimestamp(int(epoch), timezone.utc)
+    if league.dtstamp is not None:
+        stamp = league.dtstamp
+        return stamp if stamp.tzinfo else stamp.replace(tzinfo=timezone.utc)
+    mtimes = [Path(p).stat().st_mtime for p in input_paths]
+    if not mtimes:
+        raise ValueError("No source for a reproducible DTSTAMP")
+    return datetime.fromtimestamp(int(max(mtimes)), timezone.utc)
 
 
 def _add_calendar_headers(cal: Calendar) -> None:
@@ -56,64 +165,48 @@ def _add_calendar_headers(cal: Calendar) -> None:
     cal.add("X-WR-TIMEZONE", CALENDAR_TIMEZONE)
 
 
-def _build_event(
-    match: Match,
-    match_dt: datetime,
-    league: League,
-    registry: TeamRegistry,
-    my_team_name: str,
-    my_team_location: str,
-    now: datetime,
-) -> Event:
-    opp = registry.get(match.opp_id)
-    opp_name = _resolve_opp_name(match, opp.name)
-    location = _resolve_location(match, registry, my_team_location, opp.location)
+def event_data(record: ResolvedMatch, league: League, my_team_name: str, now: datetime) -> EventData:
+    """The event for a scheduled (non-TBD) match of *league*."""
+    return EventData(
+        uid=record.uid,
+        summary=_build_summary(record.match, record.opp_name, my_team_name),
+        description=_build_description(record.match, record.opp_name),
+        location=record.location,
+        start=record.scheduled - EVENT_PRE_START_BUFFER,
+        end=event_end(record.scheduled, league),
+        dtstamp=now,
+    )
+
+
+def event_end(match_dt: datetime, league: League) -> datetime:
+    """When the event of a match starting at *match_dt* ends (see EventWindow.includes)."""
+    return match_dt + timedelta(hours=league.duration_hours)
 
-    start = match_dt - EVENT_PRE_START_BUFFER
-    end = match_dt + timedelta(hours=league.duration_hours)
 
+def _build_event(data: EventData) -> Event:
     event = Event()
-    event["uid"] = _calendar_uid(match, league.my_team_id)
-    event["location"] = location
-    event.add("priority", 5)
-    event.add("summary", _build_summary(match, opp_name, my_team_name))
-    event.add("description", _build_description(match, opp_name))
-    event.add("dtstart", start)
-    event.add("dtend", end)
-    event.add("dtstamp", now)
+    event["uid"] = data.uid
+    event["location"] = data.location
+    event.add("priority", EVENT_PRIORITY)
+    event.add("summary", data.summary)
+    event.add("description", data.description)
+    event.add("dtstart", data.start)
+    event.add("dtend", data.end)
+    event.add("dtstamp", data.dtstamp)
+    if data.sequence:
+        event.add("sequence", data.sequence)
+    if data.last_modified is not None:
+        event.add("last-modified", data.last_modified)
 
     alarm = Alarm()
-    alarm.add("action", "DISPLAY")
-    alarm.add("description", "Reminder")
+    alarm.add("action", ALARM_ACTION)
+    alarm.add("description", ALARM_DESCRIPTION)
     alarm.add("trigger", ALARM_OFFSET)
     event.add_component(alarm)
 
     return event
 
 
-def _resolve_opp_name(match: Match, raw_name: str) -> str:
-    """Clean up the opponent display name."""
-    if raw_name.startswith("***"):
-        return raw_name.replace("*", "")
-    if raw_name.startswith("Club"):
-        return match.opp_id
-    return f"{raw_name} {match.sub_team}" if match.sub_team else raw_name
-
-
-def _resolve_location(
-    match: Match,
-    registry: TeamRegistry,
-    my_team_location: str,
-    opp_location: str,
-) -> str:
-    """Return the address/location string for the event."""
-    if match.neutral_venue_id:
-        neutral = registry.get(match.neutral_venue_id)
-        LOGGER.debug("Neutral venue: %s", neutral.location)
-        return neutral.location
-    return my_team_location if match.is_home else opp_location
-
-
 def _build_summary(match: Match, opp_name: str, my_team_name: str) -> str:
     """Return the calendar event title."""
     # Club-internal comp — just use the comp ID
@@ -138,17 +231,3 @@ def _build_description(match: Match, opp_name: str) -> str:
     """Return the calendar event description."""
     venue_label = "neutral" if match.neutral_venue_id else match.venue
     return f"{match.result} {venue_label} ({opp_name})".strip()
-
-
-def _calendar_uid(match: Match, my_team_id: str) -> str:
-    """
-    Build a stable unique ID for a match.
-
-    Uses the *original* date/time (not rescheduled) so the UID doesn't
-    change when a match is moved.  The label is included to handle the edge
-    case of a team playing twice on the same day (#35).
-    """
-    id_time = match.original_datetime().strftime("%Y%m%d%H%M")
-    label = match.label.replace(" ", "") if match.label else ""
-    team = my_team_id.replace(" ", "")
-    return f"{team}-{id_time}{label}@{CALENDAR_DOMAIN}"
\ No newline at end of file
@@ -0,0 +1,114 @@
+"""
+Fixture clash detection across leagues.
+
+Every scheduled match books its venue for the same span as its calendar
+event, [start - EVENT_PRE_START_BUFFER, start + duration_hours), at the
+location the event would show (see League.resolve). Bookings
+are grouped by venue, sorted by start and swept once, keeping a heap of
+the bookings still in progress, so the cost is O(n log n) plus one step
+per clash rather than a comparison of every pair:
+
+    clashes = find_clashes(league_bookings(leagues, registry))
+    print_clashes(clashes, registry)
+
+A fixture between two of our own teams is in both teams' files; those two
+bookings are the same match, not a clash.
+"""
+
+from __future__ import annotations
+
+import heapq
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Iterable, Optional
+
+from .calendar import EVENT_PRE_START_BUFFER
+from .models import League, Match, Team, TeamRegistry
+from .standings import Fixture, FixtureKey
+
+LOGGER = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class Booking:
+    """One match's use of a venue."""
+
+    venue: str          # resolved location string
+    start: datetime
+    end: datetime
+    team_id: str        # the league's own team ('me')
+    match: Match
+    fixture: FixtureKey  # the same for both teams' copies of one fixture
+    # Both teams as the league resolved them (its own teams file included), for display
+    team: Optional[Team] = None
+    opp: Optional[Team] = None
+
+    @property
+    def match_start(self) -> datetime:
+        """When the match itself starts (the resolved time, after the home team's start_time)."""
+        return self.start + EVENT_PRE_START_BUFFER
+
+
+@dataclass(frozen=True, slots=True)
+class Clash:
+    """Two bookings of one venue that overlap; *first* starts no later than *second*."""
+
+    venue: str
+    first: Booking
+    second: Booking
+
+    @property
+    def overlap(self) -> tuple[datetime, datetime]:
+        return self.second.start, min(self.first.end, self.second.end)
+
+
+def league_bookings(leagues: Iterable[League], registry: TeamRegistry) -> list[Booking]:
+    """A Booking for every scheduled (non-TBD) match of every league."""
+    bookings = []
+    for league in leagues:
+        duration = timedelta(hours=league.duration_hours)
+        my_team = registry.get(league.my_team_id)
+        for record in league.resolve(registry):
+            if record.scheduled is None:
+                continue
+            bookings.append(Booking(
+                venue=record.location,
+                start=record.scheduled - EVENT_PRE_START_BUFFER,
+                end=record.scheduled + duration,
+                team_id=league.my_team_id,
+                match=record.match,
+                fixture=Fixture.from_match(league, record.match).key,
+                team=my_team,
+                opp=record.opp,
+            ))
+    return bookings
+
+
+def find_clashes(bookings: Iterable[Booking]) -> list[Clash]:
+    """
+    Every pair of overlapping bookings at the same venue, by venue then time.
+
+    Bookings that only touch (one ends as the next starts) do not clash.
+    """
+    by_venue: dict[str, list[Booking]] = {}
+    seen = set()
+    for booking in bookings:
+        key = booking.venue, booking.start, booking.end, booking.fixture
+        if key not in seen:   # keep one copy of a fixture reported by both teams
+            seen.add(key)
+            by_venue.setdefault(booking.venue, []).append(booking)
+
+    clashes = []
+    for venue in sorted(by_venue):
+        ordered = sorted(by_venue[venue], key=lambda b: (b.start, b.end))
+        in_progress: list[tuple[datetime, int, Booking]] = []   # heap of (end, order, booking)
+        for order, booking in enumerate(ordered):
+            while in_progress and in_progress[0][0] <= booking.start:
+                heapq.heappop(in_progress)
+            for _, _, other in sorted(in_progress, key=lambda item: item[1]):
+                if other.fixture != booking.fixture:
+                    clashes.append(Clash(venue, other, booking))
+            heapq.heappush(in_progress, (booking.end, order, booking))
+    LOGGER.debug("find_clashes: %d clashes across %d venues", len(clashes), len(by_venue))
+    return clashes
@@ -0,0 +1,282 @@
+"""
+Columnar (NumPy) view of a league's matches, for season analytics.
+
+A MatchFrame holds one array per attribute instead of one object per match,
+so counts, filters and aggregates over many seasons run as vectorized
+operations:
+
+    frame = MatchFrame.concat(League.from_dict(d).to_columns() for d in seasons)
+    frame.summary()                   # played / won / lost / drawn / shots for & against
+    frame.splits()                    # the same, for home and away
+    frame.select(frame.upcoming(date.today(), date.today() + timedelta(days=7)))
+
+Team IDs, sub-teams and labels are interned into small string tables and
+stored as integer codes. Conversion back with to_matches() is exact.
+
+NumPy is optional: it is only needed once a MatchFrame is built
+(pip install numpy).
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import date, time
+from typing import Any, Iterable, Optional, Sequence
+
+from .models import TBD, VENUE_AWAY, VENUE_HOME, Match
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only without numpy
+    np = None
+
+NO_CODE = -1       # code for an absent string (sub_team / neutral_venue_id)
+NO_DATE = 0        # rescheduled_ordinal: not rescheduled (real ordinals start at 1)
+TBD_DATE = -1      # rescheduled_ordinal / effective_ordinal: date to be decided
+NO_TIME = -1       # rescheduled_minutes: start time not moved
+
+_COLUMNS = (
+    "date_ordinal", "start_minutes", "rescheduled_ordinal", "rescheduled_minutes",
+    "effective_ordinal", "effective_minutes", "home", "our_score", "opp_score",
+    "opp_code", "neutral_code", "sub_team_code", "label_code", "fixed_start",
+)
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise ImportError("MatchFrame needs NumPy: pip install numpy")
+
+
+def _minutes(value: time) -> int:
+    if value.second or value.microsecond:
+        raise ValueError(f"MatchFrame stores whole minutes; cannot store {value}")
+    return value.hour * 60 + value.minute
+
+
+def _time(minutes: int) -> time:
+    return time(minutes // 60, minutes % 60)
+
+
+class _Interner:
+    """Assigns a stable integer code to each distinct string."""
+
+    def __init__(self, values: Sequence[str] = ()) -> None:
+        self.values: list[str] = list(values)
+        self._codes = {value: code for code, value in enumerate(self.values)}
+
+    def code(self, value: Optional[str]) -> int:
+        if value is None:
+            return NO_CODE
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+@dataclass
+class MatchFrame:
+    """Parallel arrays, one element per match, in league order."""
+
+    date_ordinal: Any          # int32  original date, date.toordinal()
+    start_minutes: Any         # int16  original start, minutes after midnight
+    rescheduled_ordinal: Any   # int32  NO_DATE, TBD_DATE or the new date's ordinal
+    rescheduled_minutes: Any   # int16  NO_TIME or the new start
+    effective_ordinal: Any     # int32  date actually played, TBD_DATE if unknown
+    effective_minutes: Any     # int16  start actually used
+    home: Any                  # bool   True for home matches
+    our_score: Any             # int16
+    opp_score: Any             # int16
+    opp_code: Any              # int32  index into team_ids
+    neutral_code: Any          # int32  index into team_ids, NO_CODE if none
+    sub_team_code: Any         # int32  index into strings, NO_CODE if none
+    label_code: Any            # int32  index into strings
+    fixed_start: Any           # bool   start_time given on the match (see Match.fixed_start)
+    team_ids: list[str] = field(default_factory=list)
+    strings: list[str] = field(default_factory=list)
+
+    # ------------------------------------------------------------------
+    # Conversion
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def from_matches(cls, matches: Iterable[Match]) -> MatchFrame:
+        """Build a frame from Match objects (see also League.to_columns())."""
+        _require_numpy()
+        teams, strings = _Interner(), _Interner()
+        rows: dict[str, list[int]] = {name: [] for name in _COLUMNS}
+
+        for match in matches:
+            if match.rescheduled_date is None:
+                rescheduled = NO_DATE
+            elif match.rescheduled_date == TBD:
+                rescheduled = TBD_DATE
+            else:
+                rescheduled = match.rescheduled_date.toordinal()
+            effective = match.effective_date
+
+            rows["date_ordinal"].append(match.date.toordinal())
+            rows["start_minutes"].append(_minutes(match.start_time))
+            rows["rescheduled_ordinal"].append(rescheduled)
+            rows["rescheduled_minutes"].append(
+                NO_TIME if match.rescheduled_time is None else _minutes(match.rescheduled_time)
+            )
+            rows["effective_ordinal"].append(TBD_DATE if effective is None else effective.toordinal())
+            rows["effective_minutes"].append(_minutes(match.effective_time))
+            rows["home"].append(match.is_home)
+            rows["our_score"].append(match.our_score)
+            rows["opp_score"].append(match.opp_score)
+            rows["opp_code"].append(teams.code(match.opp_id))
+            rows["neutral_code"].append(teams.code(match.neutral_venue_id))
+            rows["sub_team_code"].append(strings.code(match.sub_team))
+            rows["label_code"].append(strings.code(match.label))
+            rows["fixed_start"].append(match.fixed_start)
+
+        return cls(
+            date_ordinal=np.array(rows["date_ordinal"], dtype=np.int32),
+            start_minutes=np.array(rows["start_minutes"], dtype=np.int16),
+            rescheduled_ordinal=np.array(rows["rescheduled_ordinal"], dtype=np.int32),
+            rescheduled_minutes=np.array(rows["rescheduled_minutes"], dtype=np.int16),
+            effective_ordinal=np.array(rows["effective_ordinal"], dtype=np.int32),
+            effective_minutes=np.array(rows["effective_minutes"], dtype=np.int16),
+            home=np.array(rows["home"], dtype=bool),
+            our_score=np.array(rows["our_score"], dtype=np.int16),
+            opp_score=np.array(rows["opp_score"], dtype=np.int16),
+            opp_code=np.array(rows["opp_code"], dtype=np.int32),
+            neutral_code=np.array(rows["neutral_code"], dtype=np.int32),
+            sub_team_code=np.array(rows["sub_team_code"], dtype=np.int32),
+            label_code=np.array(rows["label_code"], dtype=np.int32),
+            fixed_start=np.array(rows["fixed_start"], dtype=bool),
+            team_ids=teams.values,
+            strings=strings.values,
+        )
+
+    def to_matches(self) -> list[Match]:
+        """Rebuild the Match objects this frame was made from."""
+        matches = []
+        for i in range(len(self)):
+            rescheduled = int(self.rescheduled_ordinal[i])
+            rescheduled_minutes = int(self.rescheduled_minutes[i])
+            neutral = int(self.neutral_code[i])
+            sub_team = int(self.sub_team_code[i])
+            matches.append(Match(
+                venue=VENUE_HOME if self.home[i] else VENUE_AWAY,
+                opp_id=self.team_ids[self.opp_code[i]],
+                date=date.fromordinal(int(self.date_ordinal[i])),
+                start_time=_time(int(self.start_minutes[i])),
+                our_score=int(self.our_score[i]),
+                opp_score=int(self.opp_score[i]),
+                rescheduled_date=(
+                    None if rescheduled == NO_DATE
+                    else TBD if rescheduled == TBD_DATE
+                    else date.fromordinal(rescheduled)
+                ),
+                rescheduled_time=None if rescheduled_minutes == NO_TIME else _time(rescheduled_minutes),
+                sub_team=None if sub_team == NO_CODE else self.strings[sub_team],
+                label=self.strings[self.label_code[i]],
+                neutral_venue_id=None if neutral == NO_CODE else self.team_ids[neutral],
+                fixed_start=bool(self.fixed_start[i]),
+            ))
+        return matches
+
+    @classmethod
+    def concat(cls, frames: Iterable[MatchFrame]) -> MatchFrame:
+        """Join several frames (e.g. one per season), re-coding their string tables."""
+        frames = list(frames)
+        if not frames:
+            return cls.from_matches([])
+        teams, strings = _Interner(), _Interner()
+        columns: dict[str, list] = {name: [] for name in _COLUMNS}
+        for frame in frames:
+            team_map = np.array([teams.code(v) for v in frame.team_ids] + [NO_CODE], dtype=np.int32)
+            string_map = np.array([strings.code(v) for v in frame.strings] + [NO_CODE], dtype=np.int32)
+            for name in _COLUMNS:
+                values = getattr(frame, name)
+                # NO_CODE (-1) indexes the trailing NO_CODE entry of each map
+                if name in ("opp_code", "neutral_code"):
+                    values = team_map[values]
+                elif name in ("sub_team_code", "label_code"):
+                    values = string_map[values]
+                columns[name].append(values)
+        return cls(
+            **{name: np.concatenate(parts) for name, parts in columns.items()},
+            team_ids=teams.values,
+            strings=strings.values,
+        )
+
+    def select(self, mask) -> MatchFrame:
+        """A new frame with only the matches where *mask* is True (or at the given indices)."""
+        return MatchFrame(
+            **{name: getattr(self, name)[mask] for name in _COLUMNS},
+            team_ids=self.team_ids,
+            strings=self.strings,
+        )
+
+    def __len__(self) -> int:
+        return len(self.date_ordinal)
+
+    # ------------------------------------------------------------------
+    # Vectorized queries (each returns a boolean mask)
+    # ------------------------------------------------------------------
+
+    @property
+    def played(self):
+        """0-0 is the unplayed sentinel, as in Match.played."""
+        return (self.our_score != 0) | (self.opp_score != 0)
+
+    @property
+    def won(self):
+        return self.our_score > self.opp_score
+
+    @property
+    def lost(self):
+        return self.opp_score > self.our_score
+
+    @property
+    def drawn(self):
+        return self.played & (self.our_score == self.opp_score)
+
+    @property
+    def scheduled(self):
+        """Matches with a known date (not TBD)."""
+        return self.effective_ordinal != TBD_DATE
+
+    @property
+    def rescheduled(self):
+        return (self.rescheduled_ordinal != NO_DATE) | (self.rescheduled_minutes != NO_TIME)
+
+    def against(self, team_id: str):
+        """Matches whose opponent is *team_id*."""
+        try:
+            code = self.team_ids.index(team_id)
+        except ValueError:
+            return np.zeros(len(self), dtype=bool)
+        return self.opp_code == code
+
+    def upcoming(self, start: date, end: date):
+        """Unplayed, scheduled matches on or after *start* and before *end*."""
+        in_window = (self.effective_ordinal >= start.toordinal()) & (
+            self.effective_ordinal < end.toordinal()
+        )
+        return self.scheduled & ~self.played & in_window
+
+    # ------------------------------------------------------------------
+    # Aggregates
+    # ------------------------------------------------------------------
+
+    def summary(self, mask=None) -> dict[str, int]:
+        """Played/won/lost/drawn counts and shots for/against, optionally within *mask*."""
+        played = self.played if mask is None else self.played & mask
+        return {
+            "matches": int(len(self) if mask is None else np.count_nonzero(mask)),
+            "played": int(np.count_nonzero(played)),
+            "won": int(np.count_nonzero(self.won & played)),
+            "lost": int(np.count_nonzero(self.lost & played)),
+            "drawn": int(np.count_nonzero(self.drawn & played)),
+            "shots_for": int(self.our_score[played].sum(dtype=np.int64)),
+            "shots_against": int(self.opp_score[played].sum(dtype=np.int64)),
+        }
+
+    def splits(self) -> dict[str, dict[str, int]]:
+        """summary() for home and away matches separately."""
+        return {"home": self.summary(self.home), "away": self.summary(~self.home)}
@@ -0,0 +1,219 @@
+"""
+Dependency index — which leagues reference which team IDs.
+
+A league depends on the teams.yml entries of its own team ('me'), every
+opponent ('opp_id') and every neutral venue ('neutral_venue_id'). The index
+keeps those IDs per games file, plus the reverse map from team ID to games
+files, so a teams.yml edit only invalidates the leagues that use an edited
+entry:
+
+    index.affected_by(old_teams, new_teams)  ->  {games paths}
+
+Entries are keyed by games file and validated by its (mtime, size), so
+refresh() only re-parses files that changed. The index is stored as JSON
+next to the build outputs and shared by batch, watch and serve modes.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Iterable, Optional
+
+from .models import League
+from .utils import load_yaml
+
+LOGGER = logging.getLogger(__name__)
+
+DEPENDENCY_INDEX_FILENAME = ".dependency-index.json"
+DEPENDENCY_INDEX_FORMAT = 1
+CLUB_COMP_ID = "CLUBCOMP"  # what TeamRegistry.get maps every 'Club*' ID to
+
+Signature = tuple[int, int]  # (mtime_ns, size) of a games file
+
+
+def league_team_ids(league: League) -> set[str]:
+    """Every team ID *league* depends on: its own team, opponents and neutral venues."""
+    ids = {league.my_team_id}
+    for match in league.matches:
+        ids.add(match.opp_id)
+        if match.neutral_venue_id:
+            ids.add(match.neutral_venue_id)
+    if any(team_id.startswith("Club") for team_id in ids):
+        ids.add(CLUB_COMP_ID)
+    return ids
+
+
+def changed_team_ids(old: dict, new: dict) -> set[str]:
+    """Team IDs whose teams.yml entry was added, removed or edited."""
+    return {team_id for team_id in old.keys() | new.keys() if old.get(team_id) != new.get(team_id)}
+
+
+def _stat_signature(path: Path) -> Signature:
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size
+
+
+def _entry_digest(entry) -> str:
+    return hashlib.sha256(json.dumps(entry, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+class DependencyIndex:
+    """Team ID → games file index, persisted as JSON when given a *path*."""
+
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        entries: Optional[dict[str, tuple[Signature, frozenset[str]]]] = None,
+    ) -> None:
+        self.path = path
+        self._entries: dict[str, tuple[Signature, frozenset[str]]] = {}
+        self._by_team: dict[str, set[str]] = {}
+        self._team_digests: dict[str, str] = {}
+        for key, (signature, team_ids) in (entries or {}).items():
+            self._set(key, signature, team_ids)
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def load(cls, path: Path) -> DependencyIndex:
+        """Read the index at *path*; a missing or unreadable file gives an empty one."""
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return cls(path)
+        except (OSError, ValueError):
+            LOGGER.warning("Ignoring unreadable dependency index: %s", path)
+            return cls(path)
+        if data.get("format") != DEPENDENCY_INDEX_FORMAT:
+            return cls(path)
+        return cls(path, {
+            key: ((entry["sig"][0], entry["sig"][1]), frozenset(entry["teams"]))
+            for key, entry in data.get("leagues", {}).items()
+        })
+
+    def save(self) -> None:
+        """Write the index atomically (a no-op for an in-memory index)."""
+        if self.path is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps({
+            "format": DEPENDENCY_INDEX_FORMAT,
+            "leagues": {
+                key: {"sig": list(signature), "teams": sorted(team_ids)}
+                for key, (signature, team_ids) in sorted(self._entries.items())
+            },
+        }, indent=1), encoding="utf-8")
+        os.replace(tmp_path, self.path)
+
+    # ------------------------------------------------------------------
+    # Updates
+    # ------------------------------------------------------------------
+
+    def update(
+        self, games_path: Path, league: League, signature: Optional[Signature] = None
+    ) -> None:
+        """Record the team IDs of *league*, parsed from *games_path*."""
+        self.set_team_ids(games_path, league_team_ids(league), signature)
+
+    def set_team_ids(
+        self, games_path: Path, team_ids: Iterable[str], signature: Optional[Signature] = None
+    ) -> None:
+        if signature is None:
+            signature = _stat_signature(games_path)
+        self._set(str(games_path), signature, frozenset(team_ids))
+
+    def remove(self, games_path: Path) -> None:
+        key = str(games_path)
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for team_id in entry[1]:
+            leagues = self._by_team.get(team_id)
+            if leagues is not None:
+                leagues.discard(key)
+                if not leagues:
+                    del self._by_team[team_id]
+
+    def refresh(self, games_paths: Iterable[Path]) -> list[Path]:
+        """
+        Bring the entries for *games_paths* up to date, parsing only changed files.
+
+        Files that are missing or cannot be parsed are dropped from the index.
+        Returns the paths that were (re-)parsed.
+        """
+        parsed = []
+        for games_path in games_paths:
+            key = str(games_path)
+            try:
+                signature = _stat_signature(games_path)
+            except FileNotFoundError:
+                self.remove(games_path)
+                continue
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == signature:
+                continue
+            try:
+                league = League.from_dict(load_yaml(games_path))
+            except Exception as exc:  # pylint: disable=broad-except
+                LOGGER.debug("Dependency index: cannot parse %s: %s", games_path.name, exc)
+                self.remove(games_path)
+                continue
+            self.update(games_path, league, signature)
+            parsed.append(games_path)
+        return parsed
+
+    def set_teams(self, teams_data: dict) -> None:
+        """Remember a digest of each teams.yml entry, for teams_digest()."""
+        self._team_digests = {team_id: _entry_digest(entry) for team_id, entry in teams_data.items()}
+
+    def _set(self, key: str, signature: Signature, team_ids: frozenset[str]) -> None:
+        self.remove(Path(key))
+        self._entries[key] = (signature, team_ids)
+        for team_id in team_ids:
+            self._by_team.setdefault(team_id, set()).add(key)
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def __contains__(self, games_path: Path) -> bool:
+        return str(games_path) in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def team_ids(self, games_path: Path) -> Optional[frozenset[str]]:
+        """The team IDs *games_path* references, or None if it is not indexed."""
+        entry = self._entries.get(str(games_path))
+        return None if entry is None else entry[1]
+
+    def leagues_for(self, team_ids: Iterable[str]) -> set[Path]:
+        """Every indexed games file that references any of *team_ids*."""
+        keys: set[str] = set()
+        for team_id in team_ids:
+            keys |= self._by_team.get(team_id, set())
+        return {Path(key) for key in keys}
+
+    def affected_by(self, old_teams: dict, new_teams: dict) -> set[Path]:
+        """Games files whose calendars change when teams.yml goes from *old_teams* to *new_teams*."""
+        return self.leagues_for(changed_team_ids(old_teams, new_teams))
+
+    def teams_digest(self, games_path: Path) -> Optional[str]:
+        """
+        A digest of just the teams.yml entries *games_path* references (see set_teams).
+
+        None if the file is not indexed, so callers can fall back to hashing
+        the whole of teams.yml.
+        """
+        team_ids = self.team_ids(games_path)
+        if team_ids is None:
+            return None
+        # A missing entry (an unknown team) still counts, so adding it later is a change
+        return _entry_digest([(tid, self._team_digests.get(tid)) for tid in sorted(team_ids)])
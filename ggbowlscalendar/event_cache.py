@@ -0,0 +1,119 @@
+"""
+Persistent cache of serialized VEVENTs, keyed by a fingerprint of each match.
+
+Most fixtures never change once a season is published, so rather than
+resolving and serializing every match on every run the cache maps a
+fingerprint of the match, the team data it resolves to and the league
+settings to the VEVENT bytes produced last time. Only new or changed
+matches are rendered; the rest are spliced in from the cache.
+
+DTSTAMP is not part of the fingerprint: a cached event is written with the
+current run's DTSTAMP (see ics_writer.restamp_event), so editing one match
+of a reproducible build, which moves its DTSTAMP on, re-renders just that
+match.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import pickle
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterator, Optional
+
+from . import __version__
+from .calendar import EventWindow, event_data, event_end
+from .ics_writer import restamp_event, serialize_event
+from .models import League, Match, Team, TeamRegistry
+from .yamlcache import cache_root
+
+LOGGER = logging.getLogger(__name__)
+
+CACHE_FORMAT = 2
+
+
+def default_event_cache_dir() -> Path:
+    """$ICAL_EVENT_CACHE_DIR, or 'events' under the app's cache directory."""
+    return Path(os.getenv("ICAL_EVENT_CACHE_DIR") or cache_root() / "events")
+
+
+def match_fingerprint(
+    match: Match,
+    league: League,
+    my_team: Team,
+    opp: Team,
+    neutral: Optional[Team],
+) -> bytes:
+    """A digest of everything that affects the VEVENT rendered for *match*, except DTSTAMP."""
+    key = repr((
+        __version__, match, league.my_team_id, league.duration_hours,
+        my_team, opp, neutral,
+    ))
+    return hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+
+
+class EventCache:
+    """The cached VEVENTs for one output calendar."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._previous = self._load(path)
+        self._current: dict[bytes, bytes] = {}
+
+    @staticmethod
+    def _load(path: Path) -> dict[bytes, bytes]:
+        try:
+            with open(path, "rb") as fh:
+                fmt, entries = pickle.load(fh)
+        except FileNotFoundError:
+            return {}
+        except Exception:  # pylint: disable=broad-except
+            LOGGER.debug("event cache unreadable: %s", path)
+            return {}
+        return entries if fmt == CACHE_FORMAT else {}
+
+    def render(
+        self,
+        league: League,
+        registry: TeamRegistry,
+        dtstamp: Optional[datetime] = None,
+        window: Optional[EventWindow] = None,
+    ) -> Iterator[bytes]:
+        """Yield the serialized VEVENT for each scheduled match (within *window*), in match order."""
+        now = dtstamp or datetime.now(timezone.utc)
+        my_team = registry.get(league.my_team_id)
+
+        for record in league.resolve(registry):
+            if record.scheduled is None:
+                continue
+            if window is not None and not window.includes(event_end(record.scheduled, league)):
+                continue
+            match = record.match
+            neutral = registry.get(match.neutral_venue_id) if match.neutral_venue_id else None
+            key = match_fingerprint(match, league, my_team, record.opp, neutral)
+            event_bytes = self._current.get(key) or self._previous.get(key)
+            if event_bytes is None:
+                self.misses += 1
+                event_bytes = serialize_event(event_data(record, league, my_team.name, now))
+            else:
+                self.hits += 1
+                event_bytes = restamp_event(event_bytes, now)
+            self._current[key] = event_bytes
+            yield event_bytes
+
+    @property
+    def evicted(self) -> int:
+        """Entries from the previous run that were not used in this one."""
+        return len(self._previous.keys() - self._current.keys())
+
+    def save(self) -> None:
+        """Persist only the entries used by this run, dropping removed matches."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as fh:
+            pickle.dump((CACHE_FORMAT, self._current), fh, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,226 @@
+"""
+Change-aware output: compare a new build of a calendar with the last one.
+
+The previous .ics is read with a small UID-indexed reader (split on
+BEGIN:VEVENT, unfold, pick out the few properties that matter) rather than
+icalendar, and each new event is matched to its old copy by UID, which
+does not change when a match is moved (see resolve._calendar_uid):
+
+    diff = CalendarDiff.load(output_path, modified=dtstamp)
+    with IcsWriter(fh) as writer:
+        for event_bytes in diff.render(iter_event_data(league, registry, dtstamp)):
+            writer.write_raw_event(event_bytes)
+    for change in diff.changes:
+        print(format_change(change))
+
+An unchanged event is written with its previous bytes, old DTSTAMP and
+all, so rebuilding unchanged data leaves the file as it was. A changed
+event is written afresh with SEQUENCE one higher than before and
+LAST-MODIFIED set to *modified*, which tells clients to replace their copy.
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+from collections import Counter
+from dataclasses import dataclass, replace
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+from .calendar import EventData
+from .ics_writer import serialize_event
+
+LOGGER = logging.getLogger(__name__)
+
+ADDED = "added"
+MOVED = "moved"          # new date, time or venue
+RESCORED = "rescored"    # result or score changed
+UPDATED = "updated"      # any other change, e.g. a team name or label
+REMOVED = "removed"
+CHANGE_KINDS = (ADDED, MOVED, RESCORED, UPDATED, REMOVED)
+
+_EVENT_BEGIN = b"BEGIN:VEVENT\r\n"
+_EVENT_END = b"END:VEVENT\r\n"
+_ESCAPED = re.compile(r"\\([\\;,nN])")
+_SCORE = re.compile(r" [WLD] \(\d+ - \d+\)")   # as calendar._build_summary writes it
+
+
+@dataclass(frozen=True)
+class PreviousEvent:
+    """An event read back from a previous build, with its exact bytes."""
+
+    uid: str
+    summary: str
+    description: str
+    location: str
+    start: Optional[datetime]
+    end: Optional[datetime]
+    sequence: int
+    raw: bytes
+
+
+@dataclass(frozen=True)
+class EventChange:
+    """One difference between the previous and the new build of a calendar."""
+
+    kind: str
+    uid: str
+    summary: str
+    start: Optional[datetime]
+    previous_start: Optional[datetime] = None   # for MOVED
+
+
+# ---------------------------------------------------------------------------
+# Reader
+# ---------------------------------------------------------------------------
+
+def read_events(data: bytes) -> dict[str, PreviousEvent]:
+    """Index the VEVENTs of an .ics file by UID. Events without a UID are ignored."""
+    events: dict[str, PreviousEvent] = {}
+    begin = data.find(_EVENT_BEGIN)
+    while begin >= 0:
+        end = data.find(_EVENT_END, begin)
+        if end < 0:
+            LOGGER.debug("Truncated VEVENT at byte %d", begin)
+            break
+        end += len(_EVENT_END)
+        event = _parse_event(data[begin:end])
+        if event is not None:
+            events[event.uid] = event
+        begin = data.find(_EVENT_BEGIN, end)
+    return events
+
+
+def _parse_event(raw: bytes) -> Optional[PreviousEvent]:
+    """The properties of one VEVENT (not those of its VALARM)."""
+    props: dict[str, str] = {}
+    depth = 0
+    for line in raw.decode("utf-8").replace("\r\n ", "").split("\r\n"):
+        name, _, value = line.partition(":")
+        name = name.split(";", 1)[0].upper()
+        if name == "BEGIN":
+            depth += 1
+        elif name == "END":
+            depth -= 1
+        elif depth == 1:
+            props.setdefault(name, value)
+    if "UID" not in props:
+        return None
+    return PreviousEvent(
+        uid=_unescape(props["UID"]),
+        summary=_unescape(props.get("SUMMARY", "")),
+        description=_unescape(props.get("DESCRIPTION", "")),
+        location=_unescape(props.get("LOCATION", "")),
+        start=_parse_datetime(props.get("DTSTART")),
+        end=_parse_datetime(props.get("DTEND")),
+        sequence=int(props.get("SEQUENCE") or 0),
+        raw=raw,
+    )
+
+
+def _unescape(value: str) -> str:
+    return _ESCAPED.sub(lambda m: "\n" if m.group(1) in "nN" else m.group(1), value)
+
+
+def _parse_datetime(value: Optional[str]) -> Optional[datetime]:
+    """A DATE-TIME as ics_writer.format_datetime writes it: floating, or UTC with 'Z'."""
+    if not value:
+        return None
+    if value.endswith("Z"):
+        return datetime.strptime(value[:-1], "%Y%m%dT%H%M%S").replace(tzinfo=timezone.utc)
+    return datetime.strptime(value, "%Y%m%dT%H%M%S")
+
+
+# ---------------------------------------------------------------------------
+# Diff
+# ---------------------------------------------------------------------------
+
+def _change_kind(old: PreviousEvent, new: EventData) -> Optional[str]:
+    """How *new* differs from *old*; None if it does not (DTSTAMP is ignored)."""
+    if (old.start, old.end, old.location) != (new.start, new.end, new.location):
+        return MOVED
+    if (old.summary, old.description) == (new.summary, new.description):
+        return None
+    if _score(old.summary) != _score(new.summary):
+        return RESCORED
+    return UPDATED
+
+
+def _score(summary: str) -> Optional[str]:
+    found = _SCORE.search(summary)
+    return found.group(0) if found else None
+
+
+class CalendarDiff:
+    """
+    The previous build of one calendar, and the changes made by the next.
+
+    With no previous build there is nothing to compare with: every event is
+    written fresh and no changes are reported.
+    """
+
+    def __init__(self, previous: Optional[bytes], modified: Optional[datetime] = None) -> None:
+        self.modified = modified or datetime.now(timezone.utc)
+        self.changes: list[EventChange] = []
+        self._first_build = previous is None
+        self._previous = read_events(previous) if previous else {}
+
+    @classmethod
+    def load(cls, path: Path, modified: Optional[datetime] = None) -> CalendarDiff:
+        try:
+            previous = path.read_bytes()
+        except FileNotFoundError:
+            previous = None
+        return cls(previous, modified)
+
+    def render(self, events: Iterable[EventData]) -> Iterator[bytes]:
+        """
+        Yield the VEVENT bytes for each of *events*, recording what changed.
+
+        The removed events are recorded once *events* is exhausted.
+        """
+        seen = set()
+        for data in events:
+            seen.add(data.uid)
+            old = self._previous.get(data.uid)
+            if old is None:
+                self._record(EventChange(ADDED, data.uid, data.summary, data.start))
+                yield serialize_event(data)
+                continue
+            kind = _change_kind(old, data)
+            if kind is None:
+                yield old.raw
+                continue
+            self._record(EventChange(kind, data.uid, data.summary, data.start, old.start))
+            yield serialize_event(replace(data, sequence=old.sequence + 1, last_modified=self.modified))
+        for uid, old in self._previous.items():
+            if uid not in seen:
+                self._record(EventChange(REMOVED, uid, old.summary, old.start))
+
+    def _record(self, change: EventChange) -> None:
+        if not self._first_build:
+            self.changes.append(change)
+
+
+# ---------------------------------------------------------------------------
+# Report
+# ---------------------------------------------------------------------------
+
+def summarize_changes(changes: Iterable[EventChange]) -> str:
+    """e.g. '1 moved, 2 rescored'; empty if there are no changes."""
+    counts = Counter(change.kind for change in changes)
+    return ", ".join(f"{counts[kind]} {kind}" for kind in CHANGE_KINDS if counts[kind])
+
+
+def format_change(change: EventChange) -> str:
+    """One line of the change report, e.g. 'moved     Tue 04 Jun 17:50 (was Tue 21 May 17:50)  ...'."""
+    when = _when(change.start)
+    if change.kind == MOVED and change.previous_start != change.start:
+        when += f" (was {_when(change.previous_start)})"
+    return f"{change.kind:<9} {when}  {change.summary}"
+
+
+def _when(value: Optional[datetime]) -> str:
+    return value.strftime("%a %d %b %H:%M") if value else "?"
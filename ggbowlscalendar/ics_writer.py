@@ -0,0 +1,206 @@
+"""
+Streaming iCalendar serializer.
+
+Writes VCALENDAR/VEVENT/VALARM text straight to a binary stream one event
+at a time, without building an icalendar object tree. The output is
+byte-identical to build_calendar(...).to_ical(): the same property order
+(icalendar's canonical order, then alphabetical), TEXT escaping and
+75-octet line folding.
+"""
+
+from __future__ import annotations
+
+import re
+from datetime import datetime, timedelta, timezone
+from typing import BinaryIO, Iterable
+
+from .calendar import (
+    ALARM_ACTION,
+    ALARM_DESCRIPTION,
+    ALARM_OFFSET,
+    CALENDAR_PRODID,
+    CALENDAR_TIMEZONE,
+    EVENT_PRIORITY,
+    EventData,
+)
+
+CRLF = "\r\n"
+FOLD_LIMIT = 75  # octets per line, excluding the CRLF
+
+
+def escape_text(text: str) -> str:
+    """Escape a TEXT value as RFC 5545 (and icalendar) does."""
+    return (
+        text.replace(r"\N", "\n")
+        .replace("\\", "\\\\")
+        .replace(";", r"\;")
+        .replace(",", r"\,")
+        .replace("\r\n", r"\n")
+        .replace("\n", r"\n")
+        .replace("\r", r"\n")
+    )
+
+
+def fold_line(line: str) -> str:
+    """
+    Fold *line* into 75-octet chunks joined by CRLF + space.
+
+    A fold never splits a multi-byte character, and (as icalendar does) an
+    escaping backslash is carried onto the next line with the character it
+    escapes.
+    """
+    if len(line) < FOLD_LIMIT and line.isascii():
+        return line  # fast path: nothing to fold
+
+    folded: list[str] = []
+    current: list[str] = []
+    byte_count = 0
+    for char in line:
+        char_len = len(char.encode("utf-8"))
+        if current and byte_count + char_len >= FOLD_LIMIT:
+            if len(current) > 1 and current[-1] in "\\^":
+                carried = current.pop()
+                folded.append("".join(current))
+                current = [carried]
+                byte_count = len(carried.encode("utf-8"))
+            else:
+                folded.append("".join(current))
+                current = []
+                byte_count = 0
+        current.append(char)
+        byte_count += char_len
+    if current:
+        folded.append("".join(current))
+    return (CRLF + " ").join(folded)
+
+
+def format_datetime(value: datetime) -> str:
+    """DATE-TIME value: floating for naive values, UTC ('Z') for aware ones."""
+    if value.tzinfo is None:
+        return value.strftime("%Y%m%dT%H%M%S")
+    return value.astimezone(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def _as_utc(value: datetime) -> datetime:
+    """DTSTAMP is always UTC; a naive value is taken to be UTC already."""
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+def format_duration(value: timedelta) -> str:
+    """DURATION value, e.g. '-PT1H'."""
+    sign = ""
+    if value.days < 0:
+        sign = "-"
+        value = -value
+    timepart = ""
+    if value.seconds:
+        hours, rem = divmod(value.seconds, 3600)
+        minutes, seconds = divmod(rem, 60)
+        timepart = "T"
+        if hours:
+            timepart += f"{hours}H"
+        if minutes or (hours and seconds):
+            timepart += f"{minutes}M"
+        if seconds:
+            timepart += f"{seconds}S"
+    if value.days == 0 and timepart:
+        return f"{sign}P{timepart}"
+    return f"{sign}P{abs(value.days)}D{timepart}"
+
+
+def content_line(name: str, value: str) -> str:
+    """One folded 'NAME:value' line, CRLF-terminated; *value* is already in iCalendar form."""
+    return fold_line(f"{name}:{value}") + CRLF
+
+
+def text_line(name: str, value: str) -> str:
+    """As content_line, for a TEXT value (escaped)."""
+    return content_line(name, escape_text(value))
+
+
+# The VCALENDAR wrapper, as bytes, shared with other writers (e.g. occupancy's VFREEBUSY)
+CALENDAR_HEADER = (
+    "BEGIN:VCALENDAR" + CRLF
+    + text_line("VERSION", "2.0")
+    + text_line("PRODID", CALENDAR_PRODID)
+    + text_line("CALSCALE", "GREGORIAN")
+    + text_line("X-WR-TIMEZONE", CALENDAR_TIMEZONE)
+).encode("utf-8")
+
+CALENDAR_FOOTER = ("END:VCALENDAR" + CRLF).encode("utf-8")
+
+_DTSTAMP_LINE = re.compile(rb"\r\nDTSTAMP:[^\r]*\r\n")   # the event's own; VALARM has none
+
+_ALARM = (
+    "BEGIN:VALARM" + CRLF
+    + text_line("ACTION", ALARM_ACTION)
+    + text_line("DESCRIPTION", ALARM_DESCRIPTION)
+    + content_line("TRIGGER", format_duration(ALARM_OFFSET))
+    + "END:VALARM" + CRLF
+)
+
+
+def serialize_event(data: EventData) -> bytes:
+    """Return the complete VEVENT (including its VALARM) for *data*."""
+    return (
+        "BEGIN:VEVENT" + CRLF
+        # icalendar's canonical order first...
+        + text_line("SUMMARY", data.summary)
+        + content_line("DTSTART", format_datetime(data.start))
+        + content_line("DTEND", format_datetime(data.end))
+        + content_line("DTSTAMP", format_datetime(_as_utc(data.dtstamp)))
+        + text_line("UID", data.uid)
+        + (content_line("SEQUENCE", str(data.sequence)) if data.sequence else "")
+        # ...then the remaining properties alphabetically
+        + text_line("DESCRIPTION", data.description)
+        + (content_line("LAST-MODIFIED", format_datetime(_as_utc(data.last_modified)))
+           if data.last_modified is not None else "")
+        + text_line("LOCATION", data.location)
+        + content_line("PRIORITY", str(EVENT_PRIORITY))
+        + _ALARM
+        + "END:VEVENT" + CRLF
+    ).encode("utf-8")
+
+
+def restamp_event(event_bytes: bytes, dtstamp: datetime) -> bytes:
+    """*event_bytes* from serialize_event, with DTSTAMP set to *dtstamp*."""
+    stamp = (CRLF + content_line("DTSTAMP", format_datetime(_as_utc(dtstamp)))).encode("utf-8")
+    return _DTSTAMP_LINE.sub(lambda _: stamp, event_bytes, count=1)
+
+
+class IcsWriter:
+    """
+    Write a calendar to *stream* incrementally.
+
+        with IcsWriter(fh) as writer:
+            for data in iter_event_data(league, registry):
+                writer.write_event(data)
+    """
+
+    def __init__(self, stream: BinaryIO) -> None:
+        self.stream = stream
+        self.event_count = 0
+
+    def __enter__(self) -> IcsWriter:
+        self.stream.write(CALENDAR_HEADER)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.stream.write(CALENDAR_FOOTER)
+
+    def write_event(self, data: EventData) -> None:
+        self.write_raw_event(serialize_event(data))
+
+    def write_raw_event(self, event_bytes: bytes) -> None:
+        """Write an already-serialized VEVENT."""
+        self.stream.write(event_bytes)
+        self.event_count += 1
+
+
+def write_calendar(stream: BinaryIO, events: Iterable[EventData]) -> int:
+    """Stream a whole calendar of *events* to *stream*; returns the event count."""
+    with IcsWriter(stream) as writer:
+        for data in events:
+            writer.write_event(data)
+    return writer.event_count
@@ -0,0 +1,88 @@
+"""
+Build manifest — remembers what each output calendar was built from.
+
+For every .ics file the manifest records a content hash of each input
+(the games YAML, teams.yml, ...) plus the generator version, and the other
+files written with it (e.g. the archive feed). A later run can then skip
+building and writing any calendar whose inputs are unchanged and whose
+files are all still there, which avoids needless rewrites (and cloud-sync
+churn) of the output folder.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Iterable
+
+from . import __version__
+
+LOGGER = logging.getLogger(__name__)
+
+MANIFEST_FILENAME = ".build-manifest.json"
+MANIFEST_FORMAT = 2
+
+
+def file_digest(path: Path) -> str:
+    """SHA-256 of the file's bytes, as hex."""
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+
+
+def input_digests(**paths: Path) -> dict[str, str]:
+    """
+    Hash each named input file and add the generator version.
+
+    e.g. input_digests(games=games_path, teams=teams_path)
+    """
+    digests = {name: file_digest(path) for name, path in sorted(paths.items())}
+    digests["generator"] = __version__
+    return digests
+
+
+class BuildManifest:
+    """Per-output record of input digests and the files written, stored as JSON."""
+
+    def __init__(self, path: Path, entries: dict[str, dict]) -> None:
+        self.path = path
+        self._entries = entries
+
+    @classmethod
+    def load(cls, path: Path) -> BuildManifest:
+        """Read the manifest at *path*; a missing or unreadable file gives an empty one."""
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return cls(path, {})
+        except (OSError, ValueError):
+            LOGGER.warning("Ignoring unreadable build manifest: %s", path)
+            return cls(path, {})
+        if data.get("format") != MANIFEST_FORMAT:
+            return cls(path, {})
+        return cls(path, data.get("outputs", {}))
+
+    def is_current(self, output: Path, inputs: dict[str, str]) -> bool:
+        """True if *output* was last built from exactly *inputs* and every file it wrote exists."""
+        entry = self._entries.get(output.name)
+        if entry is None or entry["inputs"] != inputs:
+            return False
+        return all((output.parent / name).exists() for name in entry["files"])
+
+    def record(self, output: Path, inputs: dict[str, str], also: Iterable[Path] = ()) -> None:
+        """Record that *output*, and the files *also* written with it, were built from *inputs*."""
+        self._entries[output.name] = {"inputs": inputs, "files": [output.name, *(path.name for path in also)]}
+
+    def forget(self, output: Path) -> None:
+        self._entries.pop(output.name, None)
+
+    def save(self) -> None:
+        """Write the manifest atomically."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(
+            {"format": MANIFEST_FORMAT, "outputs": self._entries},
+            indent=1, sort_keys=True,
+        ), encoding="utf-8")
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,121 @@
+"""
+Club-wide calendar: every team's matches merged into one .ics file.
+
+Each source league's events are put in start order, then the sources are
+merged with a heap (heapq.merge) and streamed through IcsWriter, so only
+one event per league is waiting at any time and no Calendar tree is built:
+
+    sources = [MergeSource("Vets 1", vets1), MergeSource("Ladies E1", ladies_e1)]
+    with open("falls_all_2026.ics", "wb") as all_fh, open("falls_home_2026.ics", "wb") as home_fh:
+        write_merged(merge_events(sources, registry), [(all_fh, None), (home_fh, home_only)])
+
+Each event keeps its team's UID (which already includes the team ID) and
+its summary is prefixed with the source's label. Filtered variants such as
+home-only or one venue are written in the same pass, one writer each.
+"""
+
+from __future__ import annotations
+
+import heapq
+import logging
+from contextlib import ExitStack
+from dataclasses import dataclass, replace
+from datetime import datetime, timezone
+from typing import BinaryIO, Callable, Iterable, Iterator, Optional
+
+from .calendar import EventData, event_data
+from .ics_writer import IcsWriter
+from .models import League, Match, TeamRegistry
+
+LOGGER = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class MergeSource:
+    """One league to merge, with the label put in front of its event summaries."""
+
+    prefix: str
+    league: League
+    dtstamp: Optional[datetime] = None   # per-source DTSTAMP, e.g. from reproducible_dtstamp
+    registry: Optional[TeamRegistry] = None   # the league's own (see utils.league_registry), else the shared one
+
+
+@dataclass(frozen=True)
+class MergedEvent:
+    """An event in the merged calendar, with the match and source it came from."""
+
+    source: MergeSource
+    match: Match
+    data: EventData
+
+
+EventFilter = Callable[[MergedEvent], bool]
+
+
+def home_only(event: MergedEvent) -> bool:
+    """Filter for matches at the team's own ground."""
+    return event.match.is_home and not event.match.neutral_venue_id
+
+
+def at_venue(location: str) -> EventFilter:
+    """Filter for matches whose event location is *location* (e.g. a team's teams.yml location)."""
+    def matches(event: MergedEvent) -> bool:
+        return event.data.location == location
+    return matches
+
+
+def _source_events(
+    source: MergeSource, registry: TeamRegistry, now: datetime
+) -> Iterator[MergedEvent]:
+    """The scheduled matches of one source, as prefixed events in start order."""
+    league = source.league
+    registry = source.registry or registry
+    my_team_name = registry.get(league.my_team_id).name
+    dtstamp = source.dtstamp or now
+    # Rescheduled matches can be out of order in the YAML, so sort each league first
+    scheduled = sorted(
+        ((record.scheduled, index, record) for index, record in enumerate(league.resolve(registry))
+         if record.scheduled is not None),
+        key=lambda item: item[:2],
+    )
+    for _, _, record in scheduled:
+        data = event_data(record, league, my_team_name, dtstamp)
+        yield MergedEvent(source, record.match, replace(data, summary=f"{source.prefix}: {data.summary}"))
+
+
+def merge_events(
+    sources: Iterable[MergeSource],
+    registry: TeamRegistry,
+    dtstamp: Optional[datetime] = None,
+) -> Iterator[MergedEvent]:
+    """
+    Yield the events of every source in start order (a k-way heap merge).
+
+    Ties keep the order of *sources*. TBD matches are skipped. *dtstamp* is
+    used for any source without its own (default: now).
+    """
+    now = dtstamp or datetime.now(timezone.utc)
+    streams = [_source_events(source, registry, now) for source in sources]
+    return heapq.merge(*streams, key=lambda event: event.data.start)
+
+
+def write_merged(
+    events: Iterable[MergedEvent],
+    outputs: list[tuple[BinaryIO, Optional[EventFilter]]],
+) -> list[int]:
+    """
+    Write *events* to every (stream, filter) in *outputs* in a single pass.
+
+    A filter of None takes every event. Returns the event count per output.
+    """
+    with ExitStack() as stack:
+        with_writers = [
+            (stack.enter_context(IcsWriter(stream)), event_filter) for stream, event_filter in outputs
+        ]
+        for event in events:
+            for writer, event_filter in with_writers:
+                if event_filter is None or event_filter(event):
+                    writer.write_event(event.data)
+    counts = [writer.event_count for writer, _ in with_writers]
+    LOGGER.debug("Merged calendar event counts: %s", counts)
+    return counts
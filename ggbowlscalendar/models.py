@@ -2,13 +2,26 @@
 Data models for the bowls calendar generator.
 
 Defines the core data structures: Team, Match, and League.
+
+All three are frozen, slotted dataclasses: instances have no __dict__, and
+values derived from a match are worked out once, since they can never go
+stale: the result at construction and the scheduled datetime on first use.
 """
 
 from __future__ import annotations
 
+import logging
+import sys
 from dataclasses import dataclass, field
 from datetime import date, datetime, time
-from typing import Optional
+from typing import TYPE_CHECKING, Iterable, Optional
+
+if TYPE_CHECKING:
+    from .columns import MatchFrame
+    from .resolve import ResolvedMatch
+    from .seasondb import SeasonDB
+
+LOGGER = logging.getLogger(__name__)
 
 TBD = "tbd"  # sentinel value in YAML for an unscheduled match date
 TBD_DISPLAY = "-date-TBD-"
@@ -17,39 +30,76 @@ TBD_DISPLAY = "-date-TBD-"
 VENUE_HOME = "home"
 VENUE_AWAY = "away"
 
+_UNCOMPUTED = ...  # sentinel for a lazily derived value; Ellipsis survives pickling
+
 
 # ---------------------------------------------------------------------------
 # Teams
 # ---------------------------------------------------------------------------
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Team:
     """A team and its home location."""
 
     team_id: str
     name: str
     location: str
+    start_time: Optional[time] = None   # when this team's home matches start, if not the league's time
 
 
 class TeamRegistry:
-    """Looks up teams by ID, built from the teams YAML file."""
+    """
+    Looks up teams by ID, built from the teams YAML file.
+
+    Every ID looked up is remembered with its answer: club-internal
+    competitions resolve to the CLUBCOMP entry and unknown IDs to a
+    placeholder, once each, so a repeated lookup is one dict hit and the
+    same placeholder object is returned every time. Unknown IDs are kept
+    in unknown_ids for reporting.
+
+    A registry can be layered on a *parent*, e.g. a league's own teams file
+    over the shared teams.yml (see overlay). IDs are looked up in this
+    layer first, then the parent; the parent is shared, not copied, and
+    unknown IDs are recorded with it.
+    """
 
-    def __init__(self, teams: dict[str, Team]) -> None:
-        self._teams = teams
+    def __init__(self, teams: dict[str, Team], parent: Optional[TeamRegistry] = None) -> None:
+        self._teams = {sys.intern(team_id): team for team_id, team in teams.items()}
+        self._lookup: dict[str, Team] = dict(self._teams)   # plus aliases and placeholders
+        self._parent = parent
+        # insertion-ordered set, shared by every layer over the same root
+        self._unknown: dict[str, None] = parent._unknown if parent is not None else {}
 
     @classmethod
-    def from_dict(cls, data: dict) -> TeamRegistry:
-        """Build a TeamRegistry from the parsed teams.yml dict."""
+    def from_dict(cls, data: dict, parent: Optional[TeamRegistry] = None) -> TeamRegistry:
+        """
+        Build a TeamRegistry from a parsed teams file.
+
+        That is either the shared teams.yml ({team_id: {name, location}})
+        or a league's own teams file, whose entries are under 'teams:'.
+        """
+        if isinstance(data.get("teams"), dict):
+            data = data["teams"]
         teams = {
             team_id: Team(
-                team_id=team_id,
+                team_id=sys.intern(team_id),
                 name=td["name"],
                 location=td["location"],
+                start_time=_parse_time(td["start_time"]) if td.get("start_time") else None,
             )
             for team_id, td in data.items()
         }
-        return cls(teams)
+        return cls(teams, parent)
+
+    @classmethod
+    def from_db(cls, db: SeasonDB, team: Optional[str] = None, season: Optional[int | str] = None) -> TeamRegistry:
+        """The registry from a season database; see SeasonDB.registry for *team* and *season*."""
+        return db.registry(team, season)
+
+    def overlay(self, data: dict) -> TeamRegistry:
+        """A registry of the teams in *data* layered over this one."""
+        return TeamRegistry.from_dict(data, parent=self)
 
     def get(self, team_id: str) -> Team:
         """
@@ -58,11 +108,38 @@ class TeamRegistry:
         Club-internal competitions are normalised to a single CLUBCOMP entry.
         Unknown teams get a placeholder so the rest of the app can keep running.
         """
+        team = self._lookup.get(team_id)
+        return team if team is not None else self._resolve(team_id)
+
+    def get_many(self, team_ids: Iterable[str]) -> list[Team]:
+        """The Team for each of *team_ids*, in order (as get, without a call per ID)."""
+        lookup = self._lookup
+        resolve = self._resolve
+        return [lookup.get(team_id) or resolve(team_id) for team_id in team_ids]
+
+    def teams(self) -> list[Team]:
+        """The teams defined in this layer, in file order (not those of its parent)."""
+        return list(self._teams.values())
+
+    @property
+    def unknown_ids(self) -> list[str]:
+        """IDs looked up that are not in the teams file, in the order first seen."""
+        return list(self._unknown)
+
+    def _resolve(self, team_id: str) -> Team:
+        """Work out and remember the answer for an ID not looked up before."""
+        team_id = sys.intern(team_id)
         lookup_id = "CLUBCOMP" if team_id.startswith("Club") else team_id
-        if lookup_id in self._teams:
-            return self._teams[lookup_id]
-        # Unknown team — return a placeholder so output still works
-        return Team(team_id=team_id, name=f"***{team_id}***", location="TBD")
+        team = self._teams.get(lookup_id)
+        if team is None and self._parent is not None:
+            team = self._parent.get(team_id)
+        elif team is None:
+            # Unknown team — a placeholder so output still works
+            team = Team(team_id=team_id, name=f"***{team_id}***", location="TBD")
+            self._unknown[team_id] = None
+            LOGGER.debug("Unknown team ID: %s", team_id)
+        self._lookup[team_id] = team
+        return team
 
 
 # ---------------------------------------------------------------------------
@@ -70,7 +147,7 @@ class TeamRegistry:
 # ---------------------------------------------------------------------------
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Match:
     """A single scheduled or played league match."""
 
@@ -85,6 +162,16 @@ class Match:
     sub_team: Optional[str] = None    # e.g. "A", "B" for multi-team clubs
     label: str = ""
     neutral_venue_id: Optional[str] = None   # team ID whose ground is used
+    fixed_start: bool = False   # start_time given on the match, so the home team's start_time does not apply
+
+    # Derived values, excluded from __init__, repr and comparisons
+    result: str = field(init=False, repr=False, compare=False)   # 'W', 'L', 'D' or ' ' (unplayed)
+    _scheduled: Optional[datetime] = field(
+        default=_UNCOMPUTED, init=False, repr=False, compare=False
+    )
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "result", _result(self.our_score, self.opp_score))
 
     # ------------------------------------------------------------------
     # Derived properties
@@ -97,18 +184,7 @@ class Match:
         Both scores are always present; 0-0 is the unplayed sentinel since a
         genuine 0-0 result is not possible in bowls.
         """
-        return not (self.our_score == 0 and self.opp_score == 0)
-
-    @property
-    def result(self) -> str:
-        """'W', 'L', 'D', or ' ' (not yet played)."""
-        if not self.played:
-            return " "
-        if self.our_score > self.opp_score:
-            return "W"
-        if self.opp_score > self.our_score:
-            return "L"
-        return "D"
+        return self.result != " "
 
     @property
     def is_home(self) -> bool:
@@ -131,12 +207,14 @@ class Match:
         Combined effective date + time, or None if the date is TBD.
 
         Returns None rather than raising so callers can safely skip
-        unscheduled matches.
+        unscheduled matches. Worked out on first call, then cached.
         """
-        eff_date = self.effective_date
-        if eff_date is None:
-            return None
-        return datetime.combine(eff_date, self.effective_time)
+        scheduled = self._scheduled
+        if scheduled is _UNCOMPUTED:
+            eff_date = self.effective_date
+            scheduled = None if eff_date is None else datetime.combine(eff_date, self.effective_time)
+            object.__setattr__(self, "_scheduled", scheduled)
+        return scheduled
 
     def original_datetime(self) -> datetime:
         """
@@ -161,7 +239,7 @@ class Match:
 # ---------------------------------------------------------------------------
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class League:
     """All the data for a single team's season in one league."""
 
@@ -170,6 +248,12 @@ class League:
     default_day: str   # e.g. "Tue" — used to highlight non-standard match days
     default_time: time  # default kick-off time — used to suppress printing when unchanged
     matches: list[Match] = field(default_factory=list)
+    dtstamp: Optional[datetime] = None  # fixed DTSTAMP for reproducible builds
+
+    # The last resolve() result and the registry it was made with
+    _resolved: Optional[tuple[TeamRegistry, tuple[ResolvedMatch, ...]]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
 
     @classmethod
     def from_dict(cls, data: dict) -> League:
@@ -189,8 +273,53 @@ class League:
             default_day=default_day,
             default_time=default_time,
             matches=matches,
+            dtstamp=_parse_dtstamp(data.get("dtstamp")),
         )
 
+    @classmethod
+    def from_db(cls, db: SeasonDB, team: str, season: int | str) -> League:
+        """
+        Load *team*'s league for *season* from a season database.
+
+        Raises:
+            KeyError: If the database has no such league.
+        """
+        league = db.league(team, season)
+        if league is None:
+            raise KeyError(f"No league for team={team} season={season} in the season database")
+        return league
+
+    def to_columns(self) -> MatchFrame:
+        """Return the matches as a columnar MatchFrame (requires NumPy)."""
+        from .columns import MatchFrame  # pylint: disable=import-outside-toplevel
+        return MatchFrame.from_matches(self.matches)
+
+    def resolve(self, registry: TeamRegistry) -> tuple[ResolvedMatch, ...]:
+        """
+        Return a ResolvedMatch for every match, in match order.
+
+        The records are kept until the league is resolved against a different
+        registry, so every output of one run shares a single pass.
+        """
+        cached = self._resolved
+        if cached is not None and cached[0] is registry:
+            return cached[1]
+        from .resolve import resolve_matches  # pylint: disable=import-outside-toplevel
+        records = resolve_matches(self, registry)
+        object.__setattr__(self, "_resolved", (registry, records))
+        return records
+
+
+def _result(our_score: int, opp_score: int) -> str:
+    """'W', 'L', 'D', or ' ' for the 0-0 unplayed sentinel."""
+    if our_score == 0 and opp_score == 0:
+        return " "
+    if our_score > opp_score:
+        return "W"
+    if opp_score > our_score:
+        return "L"
+    return "D"
+
 
 def _parse_time(value: str | time) -> time:
     """
@@ -204,6 +333,20 @@ def _parse_time(value: str | time) -> time:
     return datetime.strptime(value, "%H:%M").time()
 
 
+def _parse_dtstamp(value: str | date | datetime | None) -> Optional[datetime]:
+    """
+    Parse the optional 'dtstamp' value from the games YAML.
+
+    YAML gives a datetime for "2024-01-01 12:00:00", a date for "2024-01-01",
+    or a string if quoted; a date is taken as midnight.
+    """
+    if value is None or isinstance(value, datetime):
+        return value
+    if isinstance(value, date):
+        return datetime.combine(value, time())
+    return datetime.fromisoformat(value)
+
+
 def _match_from_dict(data: dict, default_time: time) -> Match:
     """Parse a single match entry from the YAML matches list."""
     if "home" in data:
@@ -215,7 +358,7 @@ def _match_from_dict(data: dict, default_time: time) -> Match:
 
     return Match(
         venue=venue,
-        opp_id=opp_id,
+        opp_id=sys.intern(opp_id),
         date=data["date"],
         start_time=_parse_time(data.get("start_time", default_time)),
         our_score=int(data["our_score"]),
@@ -225,4 +368,5 @@ def _match_from_dict(data: dict, default_time: time) -> Match:
         sub_team=data.get("team"),
         label=data.get("label", ""),
         neutral_venue_id=data.get("location"),
+        fixed_start="start_time" in data,
     )
@@ -0,0 +1,171 @@
+"""
+Venue occupancy — who is using each ground, and when it is free.
+
+An OccupancyIndex is built once from a batch of leagues and holds every
+home match, keyed by resolved location (the same Booking intervals as
+clashes.py). Each venue's bookings are kept sorted by start alongside a
+running maximum of their end times, so a free/busy question is one bisect:
+
+    index = OccupancyIndex.from_leagues(leagues, registry)
+    index.is_free("63 Andersonstown Rd, ...", start, end)
+    index.week(monday)                       # bookings per venue per day
+    write_freebusy(fh, venue, index.busy(venue), dtstamp)
+
+Match times are local (Europe/London) and are converted to UTC for the
+FREEBUSY periods, as RFC 5545 requires.
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+from bisect import bisect_left
+from datetime import date, datetime, timedelta, timezone
+from itertools import accumulate
+from typing import BinaryIO, Iterable, Optional
+from zoneinfo import ZoneInfo
+
+from .calendar import CALENDAR_DOMAIN, CALENDAR_TIMEZONE
+from .clashes import Booking, league_bookings
+from .ics_writer import CALENDAR_FOOTER, CALENDAR_HEADER, CRLF, content_line, format_datetime, text_line
+from .models import League, TeamRegistry
+
+LOGGER = logging.getLogger(__name__)
+
+_LOCAL_ZONE = ZoneInfo(CALENDAR_TIMEZONE)
+
+
+class _VenueBookings:
+    """One venue's bookings sorted by start, with the latest end seen so far."""
+
+    def __init__(self, bookings: list[Booking]) -> None:
+        self.bookings = sorted(bookings, key=lambda b: (b.start, b.end))
+        self.starts = [b.start for b in self.bookings]
+        self.max_ends = list(accumulate((b.end for b in self.bookings), max))
+
+    def overlapping(self, start: datetime, end: datetime) -> list[Booking]:
+        # Candidates start before *end*; walk back while one could still end after *start*
+        found = []
+        i = bisect_left(self.starts, end) - 1
+        while i >= 0 and self.max_ends[i] > start:
+            if self.bookings[i].end > start:
+                found.append(self.bookings[i])
+            i -= 1
+        found.reverse()
+        return found
+
+    def is_free(self, start: datetime, end: datetime) -> bool:
+        i = bisect_left(self.starts, end) - 1
+        return i < 0 or self.max_ends[i] <= start
+
+
+class OccupancyIndex:
+    """Home-match bookings of many leagues, by venue."""
+
+    def __init__(self, bookings: Iterable[Booking]) -> None:
+        by_venue: dict[str, list[Booking]] = {}
+        for booking in bookings:
+            by_venue.setdefault(booking.venue, []).append(booking)
+        self._venues = {venue: _VenueBookings(items) for venue, items in by_venue.items()}
+
+    @classmethod
+    def from_leagues(cls, leagues: Iterable[League], registry: TeamRegistry) -> OccupancyIndex:
+        """Index the home matches (our own ground or a neutral venue we host at) of *leagues*."""
+        return cls.from_bookings(league_bookings(leagues, registry))
+
+    @classmethod
+    def from_bookings(cls, bookings: Iterable[Booking]) -> OccupancyIndex:
+        """As from_leagues, for bookings already made (e.g. each league with its own registry)."""
+        return cls(b for b in bookings if b.match.is_home)
+
+    @property
+    def venues(self) -> list[str]:
+        return sorted(self._venues)
+
+    def team_ids(self, venue: str) -> list[str]:
+        """The teams with a booking at *venue*, e.g. to name its free/busy file."""
+        return sorted({b.team_id for b in self._venue(venue).bookings})
+
+    def bookings(self, venue: str, start: datetime, end: datetime) -> list[Booking]:
+        """Bookings at *venue* that overlap [start, end), by start time."""
+        return self._venue(venue).overlapping(start, end)
+
+    def is_free(self, venue: str, start: datetime, end: datetime) -> bool:
+        """True if nothing is booked at *venue* during [start, end). Unknown venues are free."""
+        venue_bookings = self._venues.get(venue)
+        return venue_bookings is None or venue_bookings.is_free(start, end)
+
+    def busy(self, venue: str) -> list[tuple[datetime, datetime]]:
+        """The busy periods at *venue*: bookings merged where they overlap or touch."""
+        periods: list[tuple[datetime, datetime]] = []
+        for booking in self._venue(venue).bookings:
+            if periods and booking.start <= periods[-1][1]:
+                periods[-1] = periods[-1][0], max(periods[-1][1], booking.end)
+            else:
+                periods.append((booking.start, booking.end))
+        return periods
+
+    def week(self, week_start: date) -> dict[str, list[list[Booking]]]:
+        """For each venue, the bookings starting on each of the 7 days from *week_start*."""
+        start = datetime.combine(week_start, datetime.min.time())
+        end = start + timedelta(days=7)
+        grid = {}
+        for venue in self.venues:
+            days: list[list[Booking]] = [[] for _ in range(7)]
+            for booking in self.bookings(venue, start, end):
+                if start <= booking.start < end:
+                    days[(booking.start.date() - week_start).days].append(booking)
+            grid[venue] = days
+        return grid
+
+    def _venue(self, venue: str) -> _VenueBookings:
+        try:
+            return self._venues[venue]
+        except KeyError:
+            raise KeyError(f"No bookings at venue {venue!r}") from None
+
+
+# ---------------------------------------------------------------------------
+# VFREEBUSY export
+# ---------------------------------------------------------------------------
+
+def _utc(value: datetime) -> datetime:
+    """A local (floating) match time as UTC."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=_LOCAL_ZONE)
+    return value.astimezone(timezone.utc)
+
+
+def venue_slug(venue: str) -> str:
+    """A short, stable identifier for *venue* (lower case, letters and digits only)."""
+    return re.sub(r"[^a-z0-9]+", "-", venue.lower()).strip("-")
+
+
+def write_freebusy(
+    stream: BinaryIO,
+    venue: str,
+    periods: list[tuple[datetime, datetime]],
+    dtstamp: datetime,
+    comment: Optional[str] = None,
+) -> None:
+    """
+    Write a calendar holding one VFREEBUSY for *venue*'s busy *periods*.
+
+    VFREEBUSY has no LOCATION or SUMMARY, so the venue (and any *comment*,
+    e.g. the teams that play there) go in COMMENT properties.
+    """
+    lines = ["BEGIN:VFREEBUSY" + CRLF, text_line("UID", f"freebusy-{venue_slug(venue)}@{CALENDAR_DOMAIN}")]
+    lines.append(content_line("DTSTAMP", format_datetime(_utc(dtstamp))))
+    if periods:
+        lines.append(content_line("DTSTART", format_datetime(_utc(periods[0][0]))))
+        lines.append(content_line("DTEND", format_datetime(_utc(periods[-1][1]))))
+    lines.append(text_line("COMMENT", venue))
+    if comment:
+        lines.append(text_line("COMMENT", comment))
+    for start, end in periods:
+        lines.append(content_line("FREEBUSY;FBTYPE=BUSY", f"{format_datetime(_utc(start))}/{format_datetime(_utc(end))}"))
+    lines.append("END:VFREEBUSY" + CRLF)
+
+    stream.write(CALENDAR_HEADER)
+    stream.write("".join(lines).encode("utf-8"))
+    stream.write(CALENDAR_FOOTER)
@@ -5,12 +5,17 @@ Console table display for league results.
 from __future__ import annotations
 
 import logging
-from datetime import time
+from datetime import date, datetime, time, timedelta
+from typing import Optional
 
 from rich.console import Console
 from rich.table import Table
 
+from .clashes import Booking, Clash
 from .models import League, Match, TBD_DISPLAY, TeamRegistry
+from .occupancy import OccupancyIndex
+from .resolve import ResolvedMatch, resolve_match
+from .standings import StandingsRow
 
 LOGGER = logging.getLogger(__name__)
 
@@ -46,8 +51,8 @@ def _build_table(league: League, registry: TeamRegistry) -> Table:
     for col in ("R", "Venue", "Us", "Opp", "Opponent", f"{league.default_day} Date   {date_hdr_time}", "Note"):
         table.add_column(col)
 
-    for match in league.matches:
-        table.add_row(*_row_values(match, league, registry))
+    for record in league.resolve(registry):
+        table.add_row(*_record_values(record, league))
 
     return table
 
@@ -55,36 +60,41 @@ def _build_table(league: League, registry: TeamRegistry) -> Table:
 def _row_values(
     match: Match, league: League, registry: TeamRegistry
 ) -> tuple[str, ...]:
-    opp = registry.get(match.opp_id)
-    opp_name = _display_opp_name(match, opp.name)
+    return _record_values(resolve_match(match, league, registry), league)
 
-    our, their = match.score_display()
+
+def _record_values(record: ResolvedMatch, league: League) -> tuple[str, ...]:
+    match = record.match
     venue_markup = f"[{_VENUE_COLOUR[match.venue]}]{match.venue}[/]"
 
     return (
-        _RESULT_DISPLAY[match.result],
+        _RESULT_DISPLAY[record.result],
         venue_markup,
-        our,
-        their,
-        opp_name,
-        _format_date(match, league.default_day, league.default_time),
+        record.our_score,
+        record.opp_score,
+        _display_opp_name(match, record.opp.name),
+        _format_datetime(record.scheduled, league.default_day, league.default_time),
         match.notes(),
     )
 
 
 def _display_opp_name(match: Match, raw_name: str) -> str:
     """Resolve the display name for the opponent."""
+    return _display_team_name(match.opp_id, match.sub_team, raw_name)
+
+
+def _display_team_name(team_id: str, sub_team: str | None, raw_name: str) -> str:
     if raw_name.startswith("***"):
         # Unknown team — highlight in red and show original ID
         name = f"[red]{raw_name}[/red]"
     elif raw_name.startswith("Club"):
-        # Internal club competition — use the raw opp_id as the label
-        name = match.opp_id
+        # Internal club competition — use the raw team ID as the label
+        name = team_id
     else:
         name = raw_name
 
-    if match.sub_team:
-        name = f"{name} {match.sub_team}"
+    if sub_team:
+        name = f"{name} {sub_team}"
     return name
 
 
@@ -94,16 +104,134 @@ def _format_date(match: Match, default_day: str, default_time: time) -> str:
     The weekday is suppressed when it matches the league's usual match day.
     The time is suppressed when it matches the league's default kick-off time.
     """
-    match_dt = match.scheduled_datetime()
+    return _format_datetime(match.scheduled_datetime(), default_day, default_time)
+
+
+def _format_datetime(match_dt: Optional[datetime], default_day: str, default_time: time) -> str:
+    """_format_date for an already resolved date and time (see ResolvedMatch.scheduled)."""
     if match_dt is None:
         return TBD_DISPLAY
 
     # Only show the weekday when it differs from the team's usual match day
-    day_prefix = (
-        match_dt.strftime("%a") if match_dt.strftime("%a") != default_day else "   "
-    )
+    weekday = match_dt.strftime("%a")
+    day_prefix = weekday if weekday != default_day else "   "
     # Only show the time when it differs from the league's default kick-off time
     time_suffix = (
-        match_dt.strftime(" %H:%M") if match.effective_time != default_time else ""
+        match_dt.strftime(" %H:%M") if match_dt.time() != default_time else ""
     )
     return match_dt.strftime(f"{day_prefix} %d-%b") + time_suffix
+
+
+# ---------------------------------------------------------------------------
+# Standings
+# ---------------------------------------------------------------------------
+
+_STANDINGS_COLUMNS = ("Pos", "Team", "P", "W", "D", "L", "For", "Agst", "Diff", "Pts")
+
+
+def print_standings(
+    rows: list[StandingsRow], registry: TeamRegistry, highlight: frozenset[str] = frozenset()
+) -> None:
+    """Print a league table; teams whose ID is in *highlight* (e.g. ours) are shown in bold."""
+    console = Console()
+
+    if not rows:
+        console.print("No standings found.")
+        return
+
+    table = Table(show_header=True, header_style="bold magenta")
+    for col in _STANDINGS_COLUMNS:
+        table.add_column(col)
+    for position, row in enumerate(rows, start=1):
+        table.add_row(*_standings_row_values(position, row, registry, highlight))
+    console.print(table)
+
+
+def _standings_row_values(
+    position: int, row: StandingsRow, registry: TeamRegistry, highlight: frozenset[str]
+) -> tuple[str, ...]:
+    name = _display_team_name(row.team_id, row.sub_team, registry.get(row.team_id).name)
+    if row.team_id in highlight:
+        name = f"[bold]{name}[/]"
+    return (
+        str(position),
+        name,
+        str(row.played),
+        str(row.won),
+        str(row.drawn),
+        str(row.lost),
+        str(row.shots_for),
+        str(row.shots_against),
+        f"{row.shot_difference:+d}",
+        str(row.points),
+    )
+
+
+# ---------------------------------------------------------------------------
+# Clashes
+# ---------------------------------------------------------------------------
+
+
+def print_clashes(clashes: list[Clash], registry: TeamRegistry) -> None:
+    """Print every venue clash as a Rich table, one row per overlapping pair."""
+    console = Console()
+
+    if not clashes:
+        console.print("No clashes found.")
+        return
+
+    table = Table(show_header=True, header_style="bold magenta")
+    for col in ("Venue", "Date", "First", "Second", "Overlap"):
+        table.add_column(col)
+    for clash in clashes:
+        start, end = clash.overlap
+        table.add_row(
+            clash.venue,
+            start.strftime("%a %d-%b-%Y"),
+            _booking_label(clash.first, registry),
+            _booking_label(clash.second, registry),
+            f"{start:%H:%M}-{end:%H:%M}",
+        )
+    console.print(table)
+
+
+def _booking_label(booking: Booking, registry: TeamRegistry) -> str:
+    match = booking.match
+    team = (booking.team or registry.get(booking.team_id)).name
+    opp = _display_opp_name(match, (booking.opp or registry.get(match.opp_id)).name)
+    return f"{team} v {opp} [{_VENUE_COLOUR[match.venue]}]{match.venue}[/] {booking.match_start:%H:%M}"
+
+
+# ---------------------------------------------------------------------------
+# Venue occupancy
+# ---------------------------------------------------------------------------
+
+
+def print_week(index: OccupancyIndex, week_start: date, registry: TeamRegistry) -> None:
+    """Print a venue-by-day grid of the bookings in the week from *week_start*."""
+    console = Console()
+    grid = index.week(week_start)
+    if not any(any(days) for days in grid.values()):
+        console.print(f"No bookings in the week of {week_start:%d-%b-%Y}.")
+        return
+
+    table = Table(show_header=True, header_style="bold magenta")
+    table.add_column("Venue")
+    for offset in range(7):
+        table.add_column((week_start + timedelta(days=offset)).strftime("%a %d-%b"))
+    for venue, days in grid.items():
+        if not any(days):
+            continue
+        table.add_row(_venue_label(venue), *(
+            "\n".join(
+                f"{booking.match_start:%H:%M} {(booking.team or registry.get(booking.team_id)).name}"
+                for booking in bookings
+            )
+            for bookings in days
+        ))
+    console.print(table)
+
+
+def _venue_label(venue: str) -> str:
+    """The first part of an address, e.g. the club name."""
+    return venue.split(",", 1)[0]
@@ -0,0 +1,220 @@
+"""
+In-memory index of the YAML data tree under ICAL_DATAPATH.
+
+The tree is scanned once and every games/matches file is indexed by
+(team, season), whichever layout it lives in:
+
+    2026/fallsvets1_games_2026.yml                  per-year folder
+    fallsindoor/fallsindoor_games_2024-25.yml       per-club folder
+    competitions/competitions_matches_2019-20.yml   older '_matches_' naming
+
+Lookups, listings and glob queries are then answered from the index
+without touching the filesystem.
+"""
+
+from __future__ import annotations
+
+import fnmatch
+import json
+import logging
+import os
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+LOGGER = logging.getLogger(__name__)
+
+INDEX_FORMAT = 1
+
+KIND_GAMES = "games"
+KIND_MATCHES = "matches"
+
+_DATA_FILE_RE = re.compile(
+    rf"^(?P<team>.+)_(?P<kind>{KIND_GAMES}|{KIND_MATCHES})_(?P<season>[^_]+)\.yml$"
+)
+
+TEAMS_FILE_SUFFIX = "_teams.yml"   # a league's own teams, e.g. competitions/competitions_teams.yml
+
+
+def league_teams_path(games_path: Path) -> Optional[Path]:
+    """Where the league's own teams file for *games_path* would be (it may not exist)."""
+    found = _DATA_FILE_RE.match(games_path.name)
+    return games_path.with_name(found.group("team") + TEAMS_FILE_SUFFIX) if found else None
+
+
+@dataclass(frozen=True)
+class DataFile:
+    """One indexed games or matches file."""
+
+    team: str
+    season: str
+    kind: str   # KIND_GAMES or KIND_MATCHES
+    path: Path
+
+    @property
+    def key(self) -> tuple[str, str]:
+        return self.team, self.season
+
+
+class DataRepository:
+    """Index of every YAML file under a data directory."""
+
+    def __init__(self, base: Path, files: list[str], dir_mtimes: dict[str, int]) -> None:
+        self.base = base
+        self._dir_mtimes = dir_mtimes
+        self._files: set[str] = set(files)
+        self._data_files: dict[tuple[str, str], DataFile] = {}
+        for rel in sorted(files):
+            self._add_data_file(rel)
+
+    # ------------------------------------------------------------------
+    # Construction
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def scan(cls, base: Path) -> DataRepository:
+        """Walk *base* once and index every .yml file beneath it."""
+        files: list[str] = []
+        dir_mtimes: dict[str, int] = {}
+        for dirpath, dirnames, filenames in os.walk(base):
+            dirnames[:] = sorted(d for d in dirnames if not d.startswith("."))
+            rel_dir = Path(dirpath).relative_to(base)
+            dir_mtimes[rel_dir.as_posix()] = os.stat(dirpath).st_mtime_ns
+            files.extend(
+                (rel_dir / name).as_posix() for name in filenames if name.endswith(".yml")
+            )
+        LOGGER.debug("DataRepository.scan: %d files under %s", len(files), base)
+        return cls(base, files, dir_mtimes)
+
+    @classmethod
+    def load(cls, base: Path, index_path: Optional[Path] = None) -> DataRepository:
+        """
+        Return a repository for *base*, reusing a persisted index if given.
+
+        The persisted index is only trusted when none of the indexed
+        directories has changed since it was written (adding, removing or
+        renaming a file updates its directory's mtime); otherwise the tree is
+        re-scanned and the index rewritten.
+        """
+        if index_path is not None:
+            repo = cls._read_index(base, index_path)
+            if repo is not None:
+                return repo
+        repo = cls.scan(base)
+        if index_path is not None:
+            repo.save_index(index_path)
+        return repo
+
+    def refresh(self) -> None:
+        """Re-scan the data directory, e.g. after files are added or removed."""
+        fresh = self.scan(self.base)
+        self.__dict__.update(fresh.__dict__)
+
+    def is_current(self) -> bool:
+        """True if no indexed directory has changed since the scan (files added, removed or renamed)."""
+        return _dirs_unchanged(self.base, self._dir_mtimes)
+
+    def save_index(self, index_path: Path) -> None:
+        """Persist the index as JSON for a fast start next time."""
+        index_path.parent.mkdir(parents=True, exist_ok=True)
+        index_path.write_text(json.dumps({
+            "format": INDEX_FORMAT,
+            "base": str(self.base),
+            "dirs": self._dir_mtimes,
+            "files": sorted(self._files),
+        }), encoding="utf-8")
+
+    @classmethod
+    def _read_index(cls, base: Path, index_path: Path) -> Optional[DataRepository]:
+        try:
+            data = json.loads(index_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if data.get("format") != INDEX_FORMAT or data.get("base") != str(base):
+            return None
+        if not _dirs_unchanged(base, data["dirs"]):
+            return None
+        LOGGER.debug("DataRepository: using persisted index %s", index_path)
+        return cls(base, data["files"], data["dirs"])
+
+    def _add_data_file(self, rel: str) -> None:
+        match = _DATA_FILE_RE.match(rel.rsplit("/", 1)[-1])
+        if not match:
+            return
+        data_file = DataFile(
+            team=match["team"],
+            season=match["season"],
+            kind=match["kind"],
+            path=self.base / rel,
+        )
+        existing = self._data_files.get(data_file.key)
+        # Prefer '_games_' over the older '_matches_' naming for the same season
+        if existing is not None and existing.kind == KIND_GAMES:
+            LOGGER.debug("DataRepository: ignoring duplicate %s", rel)
+            return
+        self._data_files[data_file.key] = data_file
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def find(self, filename: str, subfolder: Optional[str] = None) -> Path:
+        """
+        Return the path of *filename* (optionally under *subfolder*).
+
+        Raises:
+            FileNotFoundError: If the file is not in the index.
+        """
+        rel = f"{subfolder}/{filename}" if subfolder else filename
+        rel = Path(rel).as_posix()
+        if rel not in self._files:
+            raise FileNotFoundError(f"Data file not found: {self.base / rel}")
+        return self.base / rel
+
+    def get(self, team: str, season: int | str) -> DataFile:
+        """
+        Return the games file for *team* and *season*.
+
+        Raises:
+            FileNotFoundError: If no games or matches file is indexed for it.
+        """
+        try:
+            return self._data_files[(team, str(season))]
+        except KeyError:
+            raise FileNotFoundError(
+                f"No games file for team={team} season={season} under {self.base}"
+            ) from None
+
+    def list_files(self, team: Optional[str] = None, season: Optional[str] = None) -> list[DataFile]:
+        """All indexed games files, optionally restricted to one team or season."""
+        return [
+            df for _, df in sorted(self._data_files.items())
+            if (team is None or df.team == team) and (season is None or df.season == season)
+        ]
+
+    def glob(self, team: str = "*", season: str = "*") -> list[DataFile]:
+        """Games files whose team and season match the given glob patterns."""
+        return [
+            df for _, df in sorted(self._data_files.items())
+            if fnmatch.fnmatchcase(df.team, team) and fnmatch.fnmatchcase(df.season, season)
+        ]
+
+    def teams(self) -> list[str]:
+        """Every team that has at least one games file."""
+        return sorted({team for team, _ in self._data_files})
+
+    def seasons(self, team: Optional[str] = None) -> list[str]:
+        """Every season indexed, optionally for just one team."""
+        return sorted({s for t, s in self._data_files if team is None or t == team})
+
+
+def _dirs_unchanged(base: Path, dir_mtimes: dict[str, int]) -> bool:
+    """True if every directory in *dir_mtimes* (relative to *base*) still has its recorded mtime."""
+    for rel_dir, mtime_ns in dir_mtimes.items():
+        try:
+            if os.stat(base / rel_dir).st_mtime_ns != mtime_ns:
+                return False
+        except OSError:
+            return False
+    return True
@@ -0,0 +1,122 @@
+"""
+One resolution pass over a league, shared by every output.
+
+The console table, the calendar backends, the merged club calendar and the
+clash finder all need the same facts about each match: who the opponent
+is, where and when it is played, its UID and its score. League.resolve
+works those out once per match and keeps the immutable records, so the
+outputs of one run consume them instead of each repeating the lookups:
+
+    for record in league.resolve(registry):
+        record.opp_name, record.location, record.scheduled, record.uid
+"""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+from .calendar import CALENDAR_DOMAIN
+from .models import League, Match, Team, TeamRegistry
+
+LOGGER = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class ResolvedMatch:
+    """A match with its opponent, venue, time and score worked out."""
+
+    match: Match
+    opp: Team                       # the registry entry (a placeholder if unknown)
+    opp_name: str                   # as shown in calendar events
+    location: str                   # our ground, theirs, or the neutral venue
+    scheduled: Optional[datetime]   # effective date and time (see _scheduled); None while TBD
+    uid: str                        # the calendar UID (stable when the match is moved)
+    result: str                     # 'W', 'L', 'D' or ' ' (unplayed)
+    our_score: str                  # '' until played
+    opp_score: str
+
+
+def resolve_match(
+    match: Match,
+    league: League,
+    registry: TeamRegistry,
+    my_team: Optional[Team] = None,
+    opp: Optional[Team] = None,
+) -> ResolvedMatch:
+    """Resolve a single *match* of *league*; pass *my_team* and *opp* if already looked up."""
+    my_team = my_team or registry.get(league.my_team_id)
+    opp = opp or registry.get(match.opp_id)
+    our_score, opp_score = match.score_display()
+    return ResolvedMatch(
+        match=match,
+        opp=opp,
+        opp_name=_resolve_opp_name(match, opp.name),
+        location=_resolve_location(match, registry, my_team.location, opp.location),
+        scheduled=_scheduled(match, my_team, opp),
+        uid=_calendar_uid(match, league.my_team_id),
+        result=match.result,
+        our_score=our_score,
+        opp_score=opp_score,
+    )
+
+
+def _resolve_opp_name(match: Match, raw_name: str) -> str:
+    """Clean up the opponent display name."""
+    if raw_name.startswith("***"):
+        return raw_name.replace("*", "")
+    if raw_name.startswith("Club"):
+        return match.opp_id
+    return f"{raw_name} {match.sub_team}" if match.sub_team else raw_name
+
+
+def _resolve_location(
+    match: Match,
+    registry: TeamRegistry,
+    my_team_location: str,
+    opp_location: str,
+) -> str:
+    """Return the address/location string for the event."""
+    if match.neutral_venue_id:
+        neutral = registry.get(match.neutral_venue_id)
+        LOGGER.debug("Neutral venue: %s", neutral.location)
+        return neutral.location
+    return my_team_location if match.is_home else opp_location
+
+
+def _calendar_uid(match: Match, my_team_id: str) -> str:
+    """
+    Build a stable unique ID for a match.
+
+    Uses the *original* date/time (not rescheduled) so the UID doesn't
+    change when a match is moved.  The label is included to handle the edge
+    case of a team playing twice on the same day (#35).
+    """
+    id_time = match.original_datetime().strftime("%Y%m%d%H%M")
+    label = match.label.replace(" ", "") if match.label else ""
+    team = my_team_id.replace(" ", "")
+    return f"{team}-{id_time}{label}@{CALENDAR_DOMAIN}"
+
+
+def _scheduled(match: Match, my_team: Team, opp: Team) -> Optional[datetime]:
+    """
+    When the match is played: as Match.scheduled_datetime, except that the
+    home team's start_time (from its teams file entry) replaces the league's
+    default time unless the match gives its own start_time or newtime.
+    """
+    match_dt = match.scheduled_datetime()
+    if match_dt is None or match.fixed_start or match.rescheduled_time:
+        return match_dt
+    home_start = (my_team if match.is_home else opp).start_time
+    return match_dt if home_start is None else datetime.combine(match_dt.date(), home_start)
+
+
+def resolve_matches(league: League, registry: TeamRegistry) -> tuple[ResolvedMatch, ...]:
+    """Resolve every match of *league*, in match order (see League.resolve)."""
+    my_team = registry.get(league.my_team_id)
+    opps = registry.get_many(match.opp_id for match in league.matches)
+    return tuple(
+        resolve_match(match, league, registry, my_team, opp) for match, opp in zip(league.matches, opps)
+    )
@@ -0,0 +1,442 @@
+"""
+Season database — the whole data tree compiled into one SQLite file.
+
+teams.yml, every league's own teams file and every games/matches file under
+ICAL_DATAPATH are loaded into tables of teams, leagues and matches, with
+matches indexed by date and by opponent and leagues by team, so questions
+that span seasons are index lookups rather than a parse of every file:
+
+    db = SeasonDB.open(default_season_db_path())
+    db.refresh(get_data_repository())            # re-ingests changed files only
+    db.matches_between(monday, monday + timedelta(days=7), team="falls*")
+    db.head_to_head("BELMO", since=date(2018, 1, 1))
+    League.from_db(db, "fallsindoor", "2024")
+    TeamRegistry.from_db(db)
+
+Each file is recorded with its mtime, size and SHA-256. A refresh hashes
+only the files whose mtime or size changed and re-ingests only those whose
+hash changed; files gone from the tree are dropped. A games file that does
+not parse is recorded, so it is not retried until it changes, but has no
+league rows.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import sqlite3
+import sys
+from dataclasses import dataclass
+from datetime import date, datetime, time
+from pathlib import Path
+from typing import Iterable, Optional
+
+import yaml
+
+from .manifest import file_digest
+from .models import TBD, League, Match, Team, TeamRegistry
+from .repository import DataFile, DataRepository, league_teams_path
+from .utils import load_yaml
+from .yamlcache import cache_root
+
+LOGGER = logging.getLogger(__name__)
+
+SCHEMA_VERSION = 1
+
+KIND_TEAMS = "teams"                 # the shared teams.yml
+KIND_LEAGUE_TEAMS = "league_teams"   # a league's own '<team>_teams.yml'
+
+_SCHEMA = """
+CREATE TABLE files (
+    path TEXT PRIMARY KEY,          -- relative to the data directory
+    kind TEXT NOT NULL,             -- KIND_TEAMS, KIND_LEAGUE_TEAMS, 'games' or 'matches'
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    digest TEXT NOT NULL,
+    ok INTEGER NOT NULL             -- 0 if the file did not parse
+);
+CREATE TABLE teams (
+    source TEXT NOT NULL,           -- the teams file it came from
+    team_id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    location TEXT NOT NULL,
+    start_time TEXT,
+    PRIMARY KEY (source, team_id)
+);
+CREATE TABLE leagues (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    team TEXT NOT NULL,
+    season TEXT NOT NULL,
+    my_team_id TEXT NOT NULL,
+    duration_hours INTEGER NOT NULL,
+    default_day TEXT NOT NULL,
+    default_time TEXT NOT NULL,
+    dtstamp TEXT
+);
+CREATE UNIQUE INDEX leagues_team ON leagues (team, season);
+CREATE INDEX leagues_my_team ON leagues (my_team_id);
+CREATE TABLE matches (
+    league_id INTEGER NOT NULL REFERENCES leagues (id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    venue TEXT NOT NULL,
+    opp_id TEXT NOT NULL,
+    date TEXT NOT NULL,
+    start_time TEXT NOT NULL,
+    our_score INTEGER NOT NULL,
+    opp_score INTEGER NOT NULL,
+    rescheduled_date TEXT,
+    rescheduled_time TEXT,
+    sub_team,                       -- no type: a YAML int stays an int
+    label TEXT NOT NULL,
+    neutral_venue_id TEXT,
+    fixed_start INTEGER NOT NULL,
+    played_on TEXT,                 -- the effective date; NULL while TBD
+    PRIMARY KEY (league_id, position)
+);
+CREATE INDEX matches_played_on ON matches (played_on);
+CREATE INDEX matches_opp ON matches (opp_id, played_on);
+"""
+
+_MATCH_COLUMNS = (
+    "venue", "opp_id", "date", "start_time", "our_score", "opp_score", "rescheduled_date",
+    "rescheduled_time", "sub_team", "label", "neutral_venue_id", "fixed_start",
+)
+_SELECT_MATCHES = (
+    "SELECT l.team, l.season, l.my_team_id, "
+    + ", ".join(f"m.{column}" for column in _MATCH_COLUMNS)
+    + " FROM matches m JOIN leagues l ON l.id = m.league_id"
+)
+
+
+def default_season_db_path() -> Path:
+    """$ICAL_SEASON_DB, or 'seasons.sqlite3' in the per-user cache directory."""
+    configured = os.getenv("ICAL_SEASON_DB")
+    return Path(configured) if configured else cache_root() / "seasons.sqlite3"
+
+
+@dataclass(frozen=True, slots=True)
+class SeasonMatch:
+    """A match found by a query, with the league it belongs to."""
+
+    team: str          # the games file's team, e.g. 'fallsindoor'
+    season: str
+    my_team_id: str
+    match: Match
+
+
+@dataclass
+class RefreshStats:
+    """What one refresh did, by file."""
+
+    added: int = 0
+    updated: int = 0
+    removed: int = 0
+    unchanged: int = 0
+    invalid: int = 0   # added or updated, but did not parse
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.added or self.updated or self.removed)
+
+
+class SeasonDB:
+    """The season database at one path (see the module docstring)."""
+
+    def __init__(self, connection: sqlite3.Connection) -> None:
+        self.connection = connection
+        self._registries: dict[Optional[str], TeamRegistry] = {}   # by league teams source
+
+    @classmethod
+    def open(cls, path: Path | str) -> SeasonDB:
+        """Open (creating if needed) the database at *path*; one of another schema is rebuilt empty."""
+        if str(path) != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(str(path))
+        connection.execute("PRAGMA foreign_keys = ON")
+        version = connection.execute("PRAGMA user_version").fetchone()[0]
+        if version != SCHEMA_VERSION:
+            with connection:
+                tables = connection.execute("SELECT name FROM sqlite_master WHERE type = 'table'").fetchall()
+                for (table,) in tables:
+                    connection.execute(f'DROP TABLE "{table}"')
+                connection.executescript(_SCHEMA)
+                connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            if tables:
+                LOGGER.info("Season database %s: schema changed, rebuilt", path)
+        return cls(connection)
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def __enter__(self) -> SeasonDB:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    # ------------------------------------------------------------------
+    # Refresh
+    # ------------------------------------------------------------------
+
+    def refresh(self, repository: DataRepository, teams_path: Optional[Path] = None) -> RefreshStats:
+        """
+        Bring the database up to date with the data tree of *repository*.
+
+        *teams_path* defaults to the repository's teams.yml. Everything is
+        done in one transaction, so readers see the old or the new tree.
+        """
+        teams_path = teams_path or repository.find("teams.yml")
+        sources = {_relative(teams_path, repository.base): (KIND_TEAMS, None)}
+        for data_file in repository.list_files():
+            sources[_relative(data_file.path, repository.base)] = (data_file.kind, data_file)
+            own_teams = league_teams_path(data_file.path)
+            if own_teams is not None and own_teams.is_file():
+                sources[_relative(own_teams, repository.base)] = (KIND_LEAGUE_TEAMS, None)
+
+        known = {
+            row[0]: row[1:]
+            for row in self.connection.execute("SELECT path, mtime_ns, size, digest FROM files")
+        }
+        stats = RefreshStats()
+        with self.connection:
+            for rel in sorted(known.keys() - sources.keys()):
+                self._forget(rel)
+                stats.removed += 1
+            for rel, (kind, data_file) in sources.items():
+                path = repository.base / rel
+                stat = path.stat()
+                previous = known.get(rel)
+                if previous is not None and previous[:2] == (stat.st_mtime_ns, stat.st_size):
+                    stats.unchanged += 1
+                    continue
+                digest = file_digest(path)
+                if previous is not None and previous[2] == digest:
+                    self.connection.execute(
+                        "UPDATE files SET mtime_ns = ?, size = ? WHERE path = ?",
+                        (stat.st_mtime_ns, stat.st_size, rel),
+                    )
+                    stats.unchanged += 1
+                    continue
+                ok = self._ingest(rel, path, kind, data_file)
+                self.connection.execute(
+                    "INSERT OR REPLACE INTO files (path, kind, mtime_ns, size, digest, ok) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (rel, kind, stat.st_mtime_ns, stat.st_size, digest, int(ok)),
+                )
+                if previous is None:
+                    stats.added += 1
+                else:
+                    stats.updated += 1
+                if not ok:
+                    stats.invalid += 1
+        if stats.changed:
+            self._registries.clear()
+        LOGGER.debug(
+            "Season database: %d added, %d updated, %d removed, %d unchanged, %d invalid",
+            stats.added, stats.updated, stats.removed, stats.unchanged, stats.invalid,
+        )
+        return stats
+
+    def _forget(self, rel: str) -> None:
+        self.connection.execute("DELETE FROM teams WHERE source = ?", (rel,))
+        self.connection.execute("DELETE FROM leagues WHERE path = ?", (rel,))
+        self.connection.execute("DELETE FROM files WHERE path = ?", (rel,))
+
+    def _ingest(self, rel: str, path: Path, kind: str, data_file: Optional[DataFile]) -> bool:
+        """Replace the rows of one file; False if it did not parse."""
+        self.connection.execute("DELETE FROM teams WHERE source = ?", (rel,))
+        self.connection.execute("DELETE FROM leagues WHERE path = ?", (rel,))
+        try:
+            data = load_yaml(path)
+            if kind in (KIND_TEAMS, KIND_LEAGUE_TEAMS):
+                self._insert_teams(rel, TeamRegistry.from_dict(data).teams())
+            else:
+                self._insert_league(rel, data_file.team, data_file.season, League.from_dict(data))
+        except (yaml.YAMLError, KeyError, TypeError, ValueError, AttributeError) as exc:
+            LOGGER.warning("Season database: skipping %s: %s: %s", rel, type(exc).__name__, exc)
+            return False
+        return True
+
+    def _insert_teams(self, source: str, teams: Iterable[Team]) -> None:
+        self.connection.executemany(
+            "INSERT INTO teams (source, team_id, name, location, start_time) VALUES (?, ?, ?, ?, ?)",
+            [(source, t.team_id, t.name, t.location, _iso(t.start_time)) for t in teams],
+        )
+
+    def _insert_league(self, rel: str, team: str, season: str, league: League) -> None:
+        league_id = self.connection.execute(
+            "INSERT INTO leagues (path, team, season, my_team_id, duration_hours, default_day, "
+            "default_time, dtstamp) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (rel, team, season, league.my_team_id, league.duration_hours, league.default_day,
+             _iso(league.default_time), _iso(league.dtstamp)),
+        ).lastrowid
+        self.connection.executemany(
+            f"INSERT INTO matches (league_id, position, {', '.join(_MATCH_COLUMNS)}, played_on) "
+            f"VALUES ({', '.join('?' * (len(_MATCH_COLUMNS) + 3))})",
+            [
+                (league_id, position, m.venue, m.opp_id, _iso(m.date), _iso(m.start_time), m.our_score,
+                 m.opp_score, _iso(m.rescheduled_date), _iso(m.rescheduled_time), m.sub_team, m.label,
+                 m.neutral_venue_id, int(m.fixed_start), _iso(m.effective_date))
+                for position, m in enumerate(league.matches)
+            ],
+        )
+
+    # ------------------------------------------------------------------
+    # Loaders
+    # ------------------------------------------------------------------
+
+    def league(self, team: str, season: int | str) -> Optional[League]:
+        """The League of *team*'s games file for *season*; None if not in the database."""
+        row = self.connection.execute(
+            "SELECT id, my_team_id, duration_hours, default_day, default_time, dtstamp "
+            "FROM leagues WHERE team = ? AND season = ?",
+            (team, str(season)),
+        ).fetchone()
+        if row is None:
+            return None
+        league_id, my_team_id, duration_hours, default_day, default_time, dtstamp = row
+        rows = self.connection.execute(
+            f"SELECT {', '.join(_MATCH_COLUMNS)} FROM matches WHERE league_id = ? ORDER BY position",
+            (league_id,),
+        )
+        return League(
+            my_team_id=my_team_id,
+            duration_hours=duration_hours,
+            default_day=default_day,
+            default_time=time.fromisoformat(default_time),
+            matches=[_match_from_row(row) for row in rows],
+            dtstamp=datetime.fromisoformat(dtstamp) if dtstamp else None,
+        )
+
+    def registry(self, team: Optional[str] = None, season: Optional[int | str] = None) -> TeamRegistry:
+        """
+        The shared teams, with the league's own teams layered over them if
+        *team* and *season* name a games file that has a teams file.
+
+        Registries are kept until the next refresh that changes something.
+        """
+        source = None
+        if team is not None and season is not None:
+            row = self.connection.execute(
+                "SELECT path FROM leagues WHERE team = ? AND season = ?", (team, str(season))
+            ).fetchone()
+            own_teams = league_teams_path(Path(row[0])) if row else None
+            if own_teams is not None and self._has_source(own_teams.as_posix()):
+                source = own_teams.as_posix()
+        registry = self._registries.get(source)
+        if registry is None:
+            if source is None:
+                shared = self.connection.execute(
+                    "SELECT path FROM files WHERE kind = ?", (KIND_TEAMS,)
+                ).fetchone()
+                registry = TeamRegistry(self._teams(shared[0] if shared else None))
+            else:
+                registry = TeamRegistry(self._teams(source), parent=self.registry())
+            self._registries[source] = registry
+        return registry
+
+    def _has_source(self, source: str) -> bool:
+        return self.connection.execute(
+            "SELECT 1 FROM teams WHERE source = ? LIMIT 1", (source,)
+        ).fetchone() is not None
+
+    def _teams(self, source: Optional[str]) -> dict[str, Team]:
+        rows = self.connection.execute(
+            "SELECT team_id, name, location, start_time FROM teams WHERE source = ?", (source,)
+        )
+        return {
+            team_id: Team(
+                team_id=sys.intern(team_id),
+                name=name,
+                location=location,
+                start_time=time.fromisoformat(start_time) if start_time else None,
+            )
+            for team_id, name, location, start_time in rows
+        }
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def matches_between(self, start: date, end: date, team: str = "*") -> list[SeasonMatch]:
+        """
+        Every match played (or to be played) on a day in [start, end), by
+        date, for the games files whose team matches the glob *team*.
+        """
+        return self._query(
+            " WHERE m.played_on >= ? AND m.played_on < ? AND l.team GLOB ?"
+            " ORDER BY m.played_on, l.team, m.position",
+            (start.isoformat(), end.isoformat(), team),
+        )
+
+    def head_to_head(self, opp_id: str, since: Optional[date] = None, team: str = "*") -> list[SeasonMatch]:
+        """Every dated match against *opp_id* (from *since*, if given), across every season, by date."""
+        return self._query(
+            " WHERE m.opp_id = ? AND m.played_on >= ? AND l.team GLOB ?"
+            " ORDER BY m.played_on, l.team, m.position",
+            (opp_id, since.isoformat() if since else "", team),
+        )
+
+    def _query(self, where: str, params: tuple) -> list[SeasonMatch]:
+        return [
+            SeasonMatch(team, season, my_team_id, _match_from_row(row))
+            for team, season, my_team_id, *row in self.connection.execute(_SELECT_MATCHES + where, params)
+        ]
+
+
+# ---------------------------------------------------------------------------
+# Per-process connections
+# ---------------------------------------------------------------------------
+
+_SHARED: dict[tuple[Path, int], SeasonDB] = {}
+
+
+def shared_season_db(path: Path) -> SeasonDB:
+    """
+    An open SeasonDB for *path*, kept for the life of this process.
+
+    Keyed by process ID too, so a forked batch worker opens its own
+    connection rather than using its parent's.
+    """
+    key = Path(path), os.getpid()
+    db = _SHARED.get(key)
+    if db is None:
+        db = _SHARED[key] = SeasonDB.open(path)
+    return db
+
+
+# ---------------------------------------------------------------------------
+# Conversions
+# ---------------------------------------------------------------------------
+
+def _relative(path: Path, base: Path) -> str:
+    return Path(path).relative_to(base).as_posix()
+
+
+def _iso(value) -> Optional[str]:
+    """A date, time or datetime as ISO text; None and TBD are kept as they are."""
+    if value is None or isinstance(value, str):
+        return value
+    return value.isoformat()
+
+
+def _match_from_row(row) -> Match:
+    (venue, opp_id, match_date, start_time, our_score, opp_score, rescheduled_date,
+     rescheduled_time, sub_team, label, neutral_venue_id, fixed_start) = row
+    return Match(
+        venue=venue,
+        opp_id=sys.intern(opp_id),
+        date=date.fromisoformat(match_date),
+        start_time=time.fromisoformat(start_time),
+        our_score=our_score,
+        opp_score=opp_score,
+        rescheduled_date=(
+            rescheduled_date if rescheduled_date in (None, TBD) else date.fromisoformat(rescheduled_date)
+        ),
+        rescheduled_time=time.fromisoformat(rescheduled_time) if rescheduled_time else None,
+        sub_team=sub_team,
+        label=label,
+        neutral_venue_id=neutral_venue_id,
+        fixed_start=bool(fixed_start),
+    )
@@ -0,0 +1,462 @@
+"""
+HTTP feed server for .ics subscriptions.
+
+Serves GET/HEAD /<team>/<year>.ics from an in-memory cache of rendered
+calendars. A calendar is only re-rendered when its games file, teams.yml
+or the league's own teams file changes, so a poll on an unchanged feed costs a couple of stat() calls and
+a dictionary lookup. Responses carry a strong ETag and Last-Modified and
+honour If-None-Match / If-Modified-Since (304), and are gzip-compressed
+for clients that accept it.
+
+The server runs on asyncio. Renders are single-flight: a burst of requests
+for a stale feed waits on one build, which runs in an executor so the event
+loop keeps answering requests for other feeds.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import gzip
+import hashlib
+import http.client
+import io
+import logging
+import re
+import threading
+from concurrent.futures import Executor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from email.parser import BytesParser
+from email.utils import format_datetime, parsedate_to_datetime
+from http import HTTPStatus
+from pathlib import Path
+from typing import Mapping, Optional
+
+from .calendar import iter_event_data, reproducible_dtstamp
+from .depindex import DependencyIndex, league_team_ids
+from .ics_writer import write_calendar
+from .models import League, TeamRegistry
+from .repository import DataRepository, league_teams_path
+from .utils import league_registry, load_yaml
+
+LOGGER = logging.getLogger(__name__)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 5000
+CONTENT_TYPE = "text/calendar; charset=utf-8"
+MAX_HEADER_BYTES = 16 * 1024
+
+_FEED_PATH_RE = re.compile(r"^/(?P<team>[^/]+)/(?P<year>[^/]+)\.ics$")
+
+FeedKey = tuple[str, str]
+
+
+def _signature(paths: tuple[Path, ...]) -> tuple[tuple[int, int], ...]:
+    """(mtime_ns, size) of each path — changes whenever a file is rewritten."""
+    return tuple((st.st_mtime_ns, st.st_size) for st in (p.stat() for p in paths))
+
+
+def _feed_inputs(games_path: Path, teams_path: Path) -> tuple[Path, ...]:
+    """The files a feed is rendered from: its games file, teams.yml and the league's own teams file, if any."""
+    own_teams = league_teams_path(games_path)
+    if own_teams is not None and own_teams.is_file():
+        return games_path, teams_path, own_teams
+    return games_path, teams_path
+
+
+@dataclass
+class RenderedFeed:
+    """One rendered calendar plus everything needed to answer conditional requests."""
+
+    body: bytes
+    etag: str
+    last_modified: datetime
+    signature: tuple = ()
+    games_path: Optional[Path] = None
+    team_ids: frozenset[str] = frozenset()  # what the league references (see depindex.py)
+    _gzipped: Optional[bytes] = field(default=None, repr=False)
+
+    @classmethod
+    def from_body(cls, body: bytes, last_modified: datetime, signature: tuple, **kwargs) -> RenderedFeed:
+        etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+        return cls(body=body, etag=etag, last_modified=last_modified, signature=signature, **kwargs)
+
+    @property
+    def gzip_etag(self) -> str:
+        # A strong ETag identifies the exact bytes, so the gzip variant needs its own
+        return self.etag[:-1] + '-gz"'
+
+    @property
+    def gzipped(self) -> bytes:
+        if self._gzipped is None:
+            # mtime=0 keeps the compressed bytes stable across renders
+            self._gzipped = gzip.compress(self.body, mtime=0)
+        return self._gzipped
+
+
+# Parsed registries by (teams path, signature), kept per process so that an
+# executor worker reuses its registry until teams.yml changes.
+_REGISTRIES: dict[tuple[Path, tuple], TeamRegistry] = {}
+
+
+def _registry_for(teams_path: Path, signature: tuple) -> TeamRegistry:
+    key = (teams_path, signature)
+    registry = _REGISTRIES.get(key)
+    if registry is None:
+        _REGISTRIES.clear()
+        registry = _REGISTRIES[key] = TeamRegistry.from_dict(load_yaml(teams_path))
+    return registry
+
+
+def render_feed(games_path: Path, teams_path: Path, signature: tuple) -> RenderedFeed:
+    """
+    Render the calendar for *games_path*.
+
+    *signature* is the _signature() of _feed_inputs(games_path, teams_path)
+    taken before reading them. This is a module-level function so it can run in any
+    executor, including a ProcessPoolExecutor.
+    """
+    registry = league_registry(_registry_for(teams_path, signature[1]), games_path)
+    league = League.from_dict(load_yaml(games_path))
+    # Stamp from the inputs so an unchanged calendar keeps the same ETag
+    dtstamp = reproducible_dtstamp(league, _feed_inputs(games_path, teams_path))
+
+    buf = io.BytesIO()
+    write_calendar(buf, iter_event_data(league, registry, dtstamp))
+    LOGGER.info("Rendered %s", games_path.name)
+
+    newest_mtime = max(mtime_ns for mtime_ns, _ in signature) / 1e9
+    last_modified = datetime.fromtimestamp(int(newest_mtime), timezone.utc)
+    return RenderedFeed.from_body(
+        buf.getvalue(), last_modified, signature,
+        games_path=games_path, team_ids=frozenset(league_team_ids(league)),
+    )
+
+
+class FeedCache:
+    """
+    Rendered calendars keyed by (team, year), invalidated when their YAML changes.
+
+    When teams.yml changes, only feeds whose league references an edited
+    team entry are re-rendered; the others are carried over unchanged.
+    """
+
+    def __init__(
+        self,
+        repository: DataRepository,
+        teams_path: Path,
+        dependencies: Optional[DependencyIndex] = None,
+    ) -> None:
+        self.repository = repository
+        self.teams_path = teams_path
+        self.dependencies = dependencies if dependencies is not None else DependencyIndex()
+        self.renders = 0
+        self._feeds: dict[FeedKey, RenderedFeed] = {}
+        self._lock = threading.Lock()
+        self._key_locks: dict[FeedKey, threading.Lock] = {}
+        self._teams_signature: Optional[tuple[int, int]] = None
+        self._teams_data: Optional[dict] = None
+
+    def inputs(self, team: str, year: str, rescan: bool = True) -> tuple[Path, tuple]:
+        """
+        Return the games file for *team*/*year* and the signature of its inputs.
+
+        Only stats the files; a changed teams.yml is read by update. If the
+        games file is not indexed and *rescan* is set, the data tree is
+        re-scanned first when a directory in it has changed, so a file added
+        while the server runs is found.
+
+        Raises:
+            FileNotFoundError: If there is no games file for *team*/*year*.
+        """
+        try:
+            games_path = self.repository.get(team, year).path
+        except FileNotFoundError:
+            if not rescan or not self._rescan():
+                raise
+            games_path = self.repository.get(team, year).path
+        return games_path, _signature(_feed_inputs(games_path, self.teams_path))
+
+    def _rescan(self) -> bool:
+        """Re-scan the data tree if it changed since the last scan; True if it was."""
+        with self._lock:
+            if self.repository.is_current():
+                return False
+            LOGGER.info("Data files changed, re-scanning %s", self.repository.base)
+            self.repository.refresh()
+            return True
+
+    def _teams_changed(self, teams_signature: tuple[int, int]) -> None:
+        """Carry cached feeds that no edited team entry affects over to the new teams.yml."""
+        with self._lock:
+            if teams_signature == self._teams_signature:
+                return  # another thread got here first
+            try:
+                teams_data = load_yaml(self.teams_path)
+            except Exception:  # pylint: disable=broad-except
+                LOGGER.exception("Cannot load %s", self.teams_path)
+                teams_data = None
+            if self._teams_data is not None and teams_data is not None:
+                affected = self.dependencies.affected_by(self._teams_data, teams_data)
+                for feed in self._feeds.values():
+                    if feed.games_path in self.dependencies and feed.games_path not in affected:
+                        feed.signature = (feed.signature[0], teams_signature, *feed.signature[2:])
+            self._teams_data = teams_data
+            self._teams_signature = teams_signature
+
+    def fresh(self, key: FeedKey, signature: tuple) -> Optional[RenderedFeed]:
+        """The cached feed for *key* if it was rendered from inputs matching *signature*."""
+        feed = self._feeds.get(key)
+        return feed if feed is not None and feed.signature == signature else None
+
+    def store(self, key: FeedKey, feed: RenderedFeed) -> None:
+        with self._lock:
+            self._feeds[key] = feed
+            self.renders += 1
+            if feed.games_path is not None:
+                self.dependencies.set_team_ids(feed.games_path, feed.team_ids, feed.signature[0])
+
+    def get(self, team: str, year: str) -> RenderedFeed:
+        """
+        Return the feed for *team*/*year*, rendering it only if its inputs changed.
+
+        Concurrent callers for the same stale feed share one render.
+
+        Raises:
+            FileNotFoundError: If there is no games file for *team*/*year*.
+        """
+        key = (team, year)
+        games_path, signature = self.inputs(team, year)
+        feed = self.fresh(key, signature)
+        return feed if feed is not None else self.update(key, games_path, signature)
+
+    def update(self, key: FeedKey, games_path: Path, signature: tuple) -> RenderedFeed:
+        """
+        Bring the feed for *key* up to date with inputs matching *signature*.
+
+        A changed teams.yml is read first, which may carry the cached feed
+        over; otherwise the feed is rendered. Blocks on file reads and the
+        render, so the async server runs it on its executor.
+        """
+        if signature[1] != self._teams_signature:
+            self._teams_changed(signature[1])
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            # Carried over, or another thread rendered it while we waited
+            feed = self.fresh(key, signature)
+            if feed is None:
+                feed = render_feed(games_path, self.teams_path, signature)
+                self.store(key, feed)
+        return feed
+
+    def invalidate(self, team: Optional[str] = None, year: Optional[str] = None) -> None:
+        """Drop cached feeds (all of them, or just those matching *team*/*year*)."""
+        with self._lock:
+            for key in list(self._feeds):
+                if (team is None or key[0] == team) and (year is None or key[1] == year):
+                    del self._feeds[key]
+
+
+@dataclass
+class Response:
+    """A transport-independent HTTP response."""
+
+    status: HTTPStatus
+    headers: dict[str, str] = field(default_factory=dict)
+    body: bytes = b""
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag in candidates
+
+
+def _not_modified_since(if_modified_since: str, last_modified: datetime) -> bool:
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    return last_modified <= since
+
+
+def _route(method: str, path: str) -> tuple[Optional[FeedKey], Optional[Response]]:
+    """Return the feed key for a request, or the error response for a bad one."""
+    if method not in ("GET", "HEAD"):
+        return None, Response(HTTPStatus.METHOD_NOT_ALLOWED, {"Allow": "GET, HEAD"})
+    match = _FEED_PATH_RE.match(path.split("?", 1)[0])
+    if not match:
+        return None, Response(HTTPStatus.NOT_FOUND)
+    return (match["team"], match["year"]), None
+
+
+def _error_response(exc: Exception, path: str) -> Response:
+    if isinstance(exc, FileNotFoundError):
+        return Response(HTTPStatus.NOT_FOUND)
+    LOGGER.error("Failed to render %s", path, exc_info=exc)
+    return Response(HTTPStatus.INTERNAL_SERVER_ERROR)
+
+
+def feed_response(feed: RenderedFeed, method: str, headers: Mapping[str, str]) -> Response:
+    """
+    Answer a GET/HEAD for *feed*, honouring conditional and gzip request headers.
+
+    *headers* must be case-insensitive (e.g. http.client.HTTPMessage) or use
+    Title-Case names.
+    """
+    use_gzip = "gzip" in (headers.get("Accept-Encoding") or "")
+    etag = feed.gzip_etag if use_gzip else feed.etag
+    common = {
+        "ETag": etag,
+        "Last-Modified": format_datetime(feed.last_modified, usegmt=True),
+        "Cache-Control": "no-cache",
+        "Vary": "Accept-Encoding",
+    }
+
+    if_none_match = headers.get("If-None-Match")
+    if if_none_match is not None:
+        if _etag_matches(if_none_match, etag):
+            return Response(HTTPStatus.NOT_MODIFIED, common)
+    elif headers.get("If-Modified-Since") and _not_modified_since(
+        headers["If-Modified-Since"], feed.last_modified
+    ):
+        return Response(HTTPStatus.NOT_MODIFIED, common)
+
+    body = feed.gzipped if use_gzip else feed.body
+    response_headers = {**common, "Content-Type": CONTENT_TYPE, "Content-Length": str(len(body))}
+    if use_gzip:
+        response_headers["Content-Encoding"] = "gzip"
+    return Response(HTTPStatus.OK, response_headers, b"" if method == "HEAD" else body)
+
+
+def respond(cache: FeedCache, method: str, path: str, headers: Mapping[str, str]) -> Response:
+    """Answer one request synchronously, rendering in the calling thread if needed."""
+    key, error = _route(method, path)
+    if error is not None:
+        return error
+    try:
+        feed = cache.get(*key)
+    except Exception as exc:  # pylint: disable=broad-except
+        return _error_response(exc, path)
+    return feed_response(feed, method, headers)
+
+
+class AsyncFeedServer:
+    """
+    asyncio HTTP/1.1 server for a FeedCache.
+
+    Renders run on *executor* (the loop's default thread pool if None).
+    Requests that arrive while a feed is being rendered wait on that render
+    rather than starting their own.
+    """
+
+    def __init__(self, cache: FeedCache, executor: Optional[Executor] = None) -> None:
+        self.cache = cache
+        self.executor = executor
+        self._inflight: dict[FeedKey, asyncio.Future] = {}
+
+    async def get(self, team: str, year: str) -> RenderedFeed:
+        """The feed for *team*/*year*, rendering it at most once however many callers wait."""
+        key = (team, year)
+        try:
+            games_path, signature = self.cache.inputs(team, year, rescan=False)
+        except FileNotFoundError:
+            # Perhaps added since the last scan: look again, re-scanning off the loop
+            loop = asyncio.get_running_loop()
+            games_path, signature = await loop.run_in_executor(self.executor, self.cache.inputs, team, year)
+        feed = self.cache.fresh(key, signature)
+        if feed is not None:
+            return feed
+
+        flight = self._inflight.get(key)
+        if flight is None:
+            flight = asyncio.ensure_future(self._render(key, games_path, signature))
+            self._inflight[key] = flight
+            flight.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # shield: one client disconnecting must not cancel the render for the others
+        return await asyncio.shield(flight)
+
+    async def _render(self, key: FeedKey, games_path: Path, signature: tuple) -> RenderedFeed:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self.cache.update, key, games_path, signature)
+
+    async def respond(self, method: str, path: str, headers: Mapping[str, str]) -> Response:
+        key, error = _route(method, path)
+        if error is not None:
+            return error
+        try:
+            feed = await self.get(*key)
+        except Exception as exc:  # pylint: disable=broad-except
+            return _error_response(exc, path)
+        return feed_response(feed, method, headers)
+
+    async def handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Serve requests on one connection until the client closes it."""
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except asyncio.IncompleteReadError:
+                    break  # client closed the connection
+                except asyncio.LimitOverrunError:
+                    await self._write(writer, Response(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE),
+                                      keep_alive=False)
+                    break
+
+                request_line, _, header_bytes = head.partition(b"\r\n")
+                try:
+                    method, path, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    await self._write(writer, Response(HTTPStatus.BAD_REQUEST), keep_alive=False)
+                    break
+                headers = BytesParser(_class=http.client.HTTPMessage).parsebytes(header_bytes)
+
+                connection = (headers.get("Connection") or "").lower()
+                if version == "HTTP/1.1":
+                    keep_alive = connection != "close"
+                else:
+                    keep_alive = connection == "keep-alive"
+                await self._write(writer, await self.respond(method, path, headers), keep_alive)
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _write(writer: asyncio.StreamWriter, response: Response, keep_alive: bool) -> None:
+        headers = dict(response.headers)
+        headers.setdefault("Content-Length", "0")
+        headers["Connection"] = "keep-alive" if keep_alive else "close"
+        status = response.status
+        head = f"HTTP/1.1 {status.value} {status.phrase}\r\n" + "".join(
+            f"{name}: {value}\r\n" for name, value in headers.items()
+        ) + "\r\n"
+        writer.write(head.encode("latin-1") + response.body)
+        await writer.drain()
+
+    async def start(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> asyncio.Server:
+        """Start listening and return the asyncio.Server (port 0 picks a free port)."""
+        return await asyncio.start_server(self.handle_connection, host, port, limit=MAX_HEADER_BYTES)
+
+
+def serve(cache: FeedCache, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> None:
+    """Serve feeds from *cache* until interrupted."""
+
+    async def _serve() -> None:
+        server = await AsyncFeedServer(cache).start(host, port)
+        LOGGER.info("Serving calendars on http://%s:%d/<team>/<year>.ics", host, port)
+        async with server:
+            await server.serve_forever()
+
+    try:
+        asyncio.run(_serve())
+    except KeyboardInterrupt:
+        LOGGER.info("Server stopped")
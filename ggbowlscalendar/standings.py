@@ -0,0 +1,360 @@
+"""
+Division standings built from every team's games file.
+
+Each games file records one team's side of its fixtures. Feeding several
+files into a StandingsEngine gives a league table for every team they
+mention, opponents included:
+
+    engine = StandingsEngine()
+    for path in division_paths:
+        engine.update(path, League.from_dict(load_yaml(path)))
+    print_standings(engine.table(), registry)
+
+A fixture between two of our own teams (e.g. FALLSLE1 v FALLSLE2) appears in
+both files; it is keyed by (home, away, original date) and counted once.
+group_divisions() uses those shared fixtures to tell which files belong in
+one table.
+Teams are identified by (team ID, sub-team), since a club may enter several
+sides in one division.
+
+Running totals are kept per team, so update() after one file changes only
+adjusts the rows of the fixtures that file reports.
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+import logging
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Hashable, Mapping, Optional, TextIO, Union
+
+from .models import League, Match, TeamRegistry
+
+LOGGER = logging.getLogger(__name__)
+
+TeamKey = tuple[str, Optional[str]]           # (team ID, sub-team)
+FixtureKey = tuple[TeamKey, TeamKey, date]    # (home, away, original date)
+
+TIE_BREAKERS = ("shot_difference", "shots_for", "won", "head_to_head")
+DEFAULT_TIE_BREAKERS = ("shot_difference", "shots_for", "head_to_head")
+
+RECORD_FIELDS = (
+    "position", "team_id", "sub_team", "name", "played", "won", "drawn", "lost",
+    "shots_for", "shots_against", "shot_difference", "points",
+)
+
+
+@dataclass(frozen=True)
+class PointsRules:
+    """League points awarded for each result."""
+
+    win: int = 2
+    draw: int = 1
+    loss: int = 0
+
+
+@dataclass(frozen=True, slots=True)
+class Fixture:
+    """One fixture, seen from neither side: home team, away team and their scores."""
+
+    home: TeamKey
+    away: TeamKey
+    date: date
+    home_score: int = 0
+    away_score: int = 0
+
+    @property
+    def key(self) -> FixtureKey:
+        return self.home, self.away, self.date
+
+    @property
+    def played(self) -> bool:
+        """0-0 is the unplayed sentinel, as in Match.played."""
+        return not (self.home_score == 0 and self.away_score == 0)
+
+    @classmethod
+    def from_match(cls, league: League, match: Match) -> Fixture:
+        us: TeamKey = (league.my_team_id, None)
+        them: TeamKey = (match.opp_id, None if match.sub_team is None else str(match.sub_team))
+        if match.is_home:
+            return cls(us, them, match.date, match.our_score, match.opp_score)
+        return cls(them, us, match.date, match.opp_score, match.our_score)
+
+
+@dataclass
+class StandingsRow:
+    """Running totals for one team."""
+
+    team: TeamKey
+    played: int = 0
+    won: int = 0
+    drawn: int = 0
+    lost: int = 0
+    shots_for: int = 0
+    shots_against: int = 0
+    points: int = 0
+
+    @property
+    def team_id(self) -> str:
+        return self.team[0]
+
+    @property
+    def sub_team(self) -> Optional[str]:
+        return self.team[1]
+
+    @property
+    def shot_difference(self) -> int:
+        return self.shots_for - self.shots_against
+
+    def add(self, ours: int, theirs: int, rules: PointsRules, sign: int = 1) -> None:
+        """Count one played fixture (or take it back out with *sign* = -1)."""
+        self.played += sign
+        self.shots_for += sign * ours
+        self.shots_against += sign * theirs
+        if ours > theirs:
+            self.won += sign
+            self.points += sign * rules.win
+        elif ours < theirs:
+            self.lost += sign
+            self.points += sign * rules.loss
+        else:
+            self.drawn += sign
+            self.points += sign * rules.draw
+
+
+@dataclass
+class StandingsEngine:
+    """Incrementally maintained league tables for the fixtures of many games files."""
+
+    rules: PointsRules = field(default_factory=PointsRules)
+    tie_breakers: tuple[str, ...] = DEFAULT_TIE_BREAKERS
+
+    def __post_init__(self) -> None:
+        unknown = [name for name in self.tie_breakers if name not in TIE_BREAKERS]
+        if unknown:
+            raise ValueError(
+                f"Unknown tie-breaker(s) {', '.join(unknown)}; choose from {', '.join(TIE_BREAKERS)}"
+            )
+        # Every source's view of each fixture, and the view that is counted
+        self._reports: dict[FixtureKey, dict[str, Fixture]] = {}
+        self._counted: dict[FixtureKey, Fixture] = {}
+        self._sources: dict[str, set[FixtureKey]] = {}
+        self._team_fixtures: dict[TeamKey, set[FixtureKey]] = {}
+        self._rows: dict[TeamKey, StandingsRow] = {}
+
+    # ------------------------------------------------------------------
+    # Updates
+    # ------------------------------------------------------------------
+
+    def update(self, source: Hashable, league: League) -> None:
+        """Replace the fixtures reported by *source* (e.g. a games path) with *league*'s."""
+        source = str(source)
+        fixtures = {}
+        for match in league.matches:
+            fixture = Fixture.from_match(league, match)
+            fixtures[fixture.key] = fixture
+        old_keys = self._sources.get(source, set())
+        for key in old_keys - fixtures.keys():
+            del self._reports[key][source]
+        for key, fixture in fixtures.items():
+            self._reports.setdefault(key, {})[source] = fixture
+        self._sources[source] = set(fixtures)
+        for key in old_keys | fixtures.keys():
+            self._recount(key)
+
+    def remove(self, source: Hashable) -> None:
+        """Forget every fixture reported only by *source*."""
+        source = str(source)
+        for key in self._sources.pop(source, set()):
+            del self._reports[key][source]
+            self._recount(key)
+
+    def _recount(self, key: FixtureKey) -> None:
+        reports = self._reports.get(key)
+        chosen = _choose(key, reports) if reports else None
+        if not reports:
+            self._reports.pop(key, None)
+        previous = self._counted.get(key)
+        if chosen == previous:
+            return
+        if previous is not None:
+            self._apply(previous, -1)
+            del self._counted[key]
+        if chosen is not None:
+            self._apply(chosen, 1)
+            self._counted[key] = chosen
+
+    def _apply(self, fixture: Fixture, sign: int) -> None:
+        for team, ours, theirs in (
+            (fixture.home, fixture.home_score, fixture.away_score),
+            (fixture.away, fixture.away_score, fixture.home_score),
+        ):
+            keys = self._team_fixtures.setdefault(team, set())
+            row = self._rows.setdefault(team, StandingsRow(team))
+            if sign > 0:
+                keys.add(fixture.key)
+            else:
+                keys.discard(fixture.key)
+            if fixture.played:
+                row.add(ours, theirs, self.rules, sign)
+            if not keys:
+                del self._team_fixtures[team]
+                del self._rows[team]
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def fixtures(self) -> list[Fixture]:
+        """Every counted fixture, in date order."""
+        return sorted(self._counted.values(), key=lambda f: (f.date, f.home, f.away))
+
+    def table(self) -> list[StandingsRow]:
+        """Every team's row, ranked by points then the tie-breakers."""
+        return self._rank(list(self._rows.values()), ("points",) + tuple(self.tie_breakers))
+
+    def _rank(self, rows: list[StandingsRow], criteria: tuple[str, ...]) -> list[StandingsRow]:
+        if len(rows) < 2 or not criteria:
+            return sorted(rows, key=lambda row: _sort_key(row.team))
+        criterion, rest = criteria[0], criteria[1:]
+        if criterion == "head_to_head":
+            scores = self._head_to_head({row.team for row in rows})
+            value = lambda row: scores.get(row.team, 0)  # noqa: E731
+        else:
+            value = lambda row: getattr(row, criterion)  # noqa: E731
+        groups: dict[int, list[StandingsRow]] = {}
+        for row in rows:
+            groups.setdefault(value(row), []).append(row)
+        ranked = []
+        for score in sorted(groups, reverse=True):
+            ranked.extend(self._rank(groups[score], rest))
+        return ranked
+
+    def _head_to_head(self, teams: set[TeamKey]) -> dict[TeamKey, int]:
+        """Points each of *teams* took from played fixtures between themselves."""
+        mini = {team: StandingsRow(team) for team in teams}
+        keys = set().union(*(self._team_fixtures.get(team, set()) for team in teams))
+        for key in keys:
+            fixture = self._counted[key]
+            if fixture.played and fixture.home in teams and fixture.away in teams:
+                mini[fixture.home].add(fixture.home_score, fixture.away_score, self.rules)
+                mini[fixture.away].add(fixture.away_score, fixture.home_score, self.rules)
+        return {team: row.points for team, row in mini.items()}
+
+
+def group_divisions(leagues: dict[Hashable, League]) -> list[list[Hashable]]:
+    """
+    Group games files into divisions, one StandingsEngine each.
+
+    Files are in the same division when they report the same fixture, i.e.
+    when two of our teams play each other; otherwise each file is its own.
+    Opponents cannot be used to link files, as one club's ID (without a
+    sub-team) may play several of our teams in different divisions.
+    """
+    parent = {source: source for source in leagues}
+
+    def find(source):
+        while parent[source] != source:
+            parent[source] = parent[parent[source]]
+            source = parent[source]
+        return source
+
+    first_seen: dict[FixtureKey, Hashable] = {}
+    for source, league in leagues.items():
+        for match in league.matches:
+            key = Fixture.from_match(league, match).key
+            other = first_seen.setdefault(key, source)
+            parent[find(source)] = find(other)
+
+    groups: dict[Hashable, list[Hashable]] = {}
+    for source in leagues:
+        groups.setdefault(find(source), []).append(source)
+    return list(groups.values())
+
+
+def _choose(key: FixtureKey, reports: dict[str, Fixture]) -> Fixture:
+    """
+    Pick which report of a fixture to count: a played one over an unplayed one,
+    then the first source in name order. Disagreeing results are logged.
+    """
+    ordered = [reports[source] for source in sorted(reports)]
+    played = [fixture for fixture in ordered if fixture.played]
+    if len({(f.home_score, f.away_score) for f in played}) > 1:
+        home, away, when = key
+        LOGGER.warning(
+            "Conflicting results for %s v %s on %s: %s",
+            _team_label(home), _team_label(away), when,
+            ", ".join(f"{source}: {f.home_score}-{f.away_score}" for source, f in sorted(reports.items())),
+        )
+    return (played or ordered)[0]
+
+
+def _sort_key(team: TeamKey) -> tuple[str, str]:
+    return team[0], team[1] or ""
+
+
+def _team_label(team: TeamKey) -> str:
+    team_id, sub_team = team
+    return team_id if sub_team is None else f"{team_id} {sub_team}"
+
+
+# ---------------------------------------------------------------------------
+# Machine-readable output
+# ---------------------------------------------------------------------------
+
+def team_name(row: StandingsRow, registry: TeamRegistry) -> str:
+    """The team's name from teams.yml, followed by its sub-team if it has one."""
+    name = registry.get(row.team_id).name
+    return name if row.sub_team is None else f"{name} {row.sub_team}"
+
+
+def standings_records(rows: list[StandingsRow], registry: TeamRegistry) -> list[dict]:
+    """One plain dict per row (see RECORD_FIELDS), positions counted from 1."""
+    return [
+        {
+            "position": position,
+            "team_id": row.team_id,
+            "sub_team": row.sub_team,
+            "name": team_name(row, registry),
+            "played": row.played,
+            "won": row.won,
+            "drawn": row.drawn,
+            "lost": row.lost,
+            "shots_for": row.shots_for,
+            "shots_against": row.shots_against,
+            "shot_difference": row.shot_difference,
+            "points": row.points,
+        }
+        for position, row in enumerate(rows, start=1)
+    ]
+
+
+SeasonRegistries = Union[TeamRegistry, Mapping[str, TeamRegistry]]   # one for every season, or one each
+
+
+def _season_registry(registry: SeasonRegistries, season: str) -> TeamRegistry:
+    return registry[season] if isinstance(registry, Mapping) else registry
+
+
+def write_json(fh: TextIO, seasons: dict[str, list[list[StandingsRow]]], registry: SeasonRegistries) -> None:
+    """Write {season: [division, ...]} as JSON, each division a list of records."""
+    json.dump(
+        {
+            season: [standings_records(rows, _season_registry(registry, season)) for rows in tables]
+            for season, tables in seasons.items()
+        },
+        fh, indent=2,
+    )
+    fh.write("\n")
+
+
+def write_csv(fh: TextIO, seasons: dict[str, list[list[StandingsRow]]], registry: SeasonRegistries) -> None:
+    """Write {season: [division, ...]} as CSV, one row per team, divisions numbered from 1."""
+    writer = csv.DictWriter(fh, fieldnames=("season", "division") + RECORD_FIELDS, lineterminator="\n")
+    writer.writeheader()
+    for season, tables in seasons.items():
+        for division, rows in enumerate(tables, start=1):
+            for record in standings_records(rows, _season_registry(registry, season)):
+                writer.writerow({"season": season, "division": division, **record})
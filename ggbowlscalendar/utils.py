@@ -2,15 +2,26 @@
 File and path utilities for the bowls calendar generator.
 """
 
+import filecmp
 import logging
 import os
+from contextlib import contextmanager
 from pathlib import Path
+from typing import BinaryIO, Iterator, Optional
 
 import yaml
 from envparse import env
 
+from .models import TeamRegistry
+from .repository import DataFile, DataRepository, league_teams_path
+from .yamlcache import get_yaml_cache
+
 LOGGER = logging.getLogger(__name__)
 
+# Prefer the libyaml-backed loader; both share SafeLoader's resolver so
+# dates and times are typed identically either way.
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
 
 def get_output_dir() -> Path:
     """
@@ -29,16 +40,75 @@ def get_output_dir() -> Path:
     return output_dir
 
 
-def write_ical_file(filename: str, content: bytes) -> None:
-    """Write *content* to *filename* inside the configured output directory."""
+def write_ical_file(filename: str, content: bytes) -> bool:
+    """
+    Write *content* to *filename* inside the configured output directory.
+
+    The file is left untouched if it already holds exactly *content*, so
+    reproducible rebuilds do not trigger a sync. Returns True if written.
+    """
     dest = get_output_dir() / filename
+    try:
+        if dest.stat().st_size == len(content) and dest.read_bytes() == content:
+            LOGGER.info("Unchanged: %s", dest)
+            return False
+    except FileNotFoundError:
+        pass
     dest.write_bytes(content)
     LOGGER.info("Saved: %s", dest)
+    return True
+
+
+@contextmanager
+def open_ical_output(filename: str) -> Iterator[BinaryIO]:
+    """
+    Open *filename* in the output directory for streaming writes.
+
+    Content goes to a temporary file which replaces the destination only on
+    success, and only if its bytes differ from what is already there.
+    """
+    dest = get_output_dir() / filename
+    tmp = dest.with_name(f".{dest.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp, "wb") as fh:
+            yield fh
+        if dest.exists() and filecmp.cmp(tmp, dest, shallow=False):
+            LOGGER.info("Unchanged: %s", dest)
+        else:
+            os.replace(tmp, dest)
+            LOGGER.info("Saved: %s", dest)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+_REPOSITORY: Optional[DataRepository] = None
+
+
+def get_data_repository() -> DataRepository:
+    """
+    Return the index of the data tree under ICAL_DATAPATH (from env or .env file).
+
+    The environment is read and the tree scanned only on the first call.
+    Set ICAL_DATA_INDEX to a file path to persist the index between runs.
+    """
+    global _REPOSITORY  # pylint: disable=global-statement
+    if _REPOSITORY is None:
+        env.read_envfile()
+        base = Path(env.str("ICAL_DATAPATH"))
+        index_path = os.getenv("ICAL_DATA_INDEX")
+        _REPOSITORY = DataRepository.load(base, Path(index_path) if index_path else None)
+    return _REPOSITORY
+
+
+def reset_data_repository() -> None:
+    """Forget the cached data index so the next lookup re-reads the environment."""
+    global _REPOSITORY  # pylint: disable=global-statement
+    _REPOSITORY = None
 
 
 def find_data_file(filename: str, subfolder: str | None = None) -> Path:
     """
-    Locate a data file under ICAL_DATAPATH (from env or .env file).
+    Locate a data file under ICAL_DATAPATH.
 
     Args:
         filename:  The file name, e.g. "teams.yml".
@@ -47,21 +117,71 @@ def find_data_file(filename: str, subfolder: str | None = None) -> Path:
     Raises:
         FileNotFoundError: If the file does not exist.
     """
-    env.read_envfile()
-    base = Path(env.str("ICAL_DATAPATH"))
-    path = base / subfolder / filename if subfolder else base / filename
-
+    path = get_data_repository().find(filename, subfolder)
     LOGGER.debug("find_data_file: %s", path)
-
-    if not path.exists():
-        raise FileNotFoundError(f"Data file not found: {path}")
     return path
 
 
+def find_games_files(year: str = "*", team: str = "*") -> list[DataFile]:
+    """
+    Return every games file under ICAL_DATAPATH for *year* and *team*, sorted.
+
+    Both may be glob patterns (e.g. "202*"). Files in per-year folders
+    ("2026/fallsvets1_games_2026.yml"), per-club folders
+    ("fallsindoor/fallsindoor_games_2024-25.yml") and the older
+    '_matches_' naming are all included.
+    """
+    data_files = get_data_repository().glob(team=team, season=year)
+    LOGGER.debug("find_games_files: %d files for team=%s year=%s", len(data_files), team, year)
+    return data_files
+
+
 def load_yaml(path: Path) -> dict:
-    """Read and parse a YAML file, returning a dict."""
+    """
+    Read and parse a YAML file, returning a dict.
+
+    Parsed results are served from the on-disk YAML cache when the file is
+    unchanged (see yamlcache.py); set ICAL_YAML_CACHE=off to always parse.
+    """
+    cache = get_yaml_cache()
+    if cache is None:
+        return _parse_yaml(path)
+    return cache.load(Path(path), _parse_yaml)
+
+
+def _parse_yaml(path: Path, loader: type = YAML_LOADER) -> dict:
     with open(path, encoding="utf-8") as fh:
-        return yaml.safe_load(fh)
+        return yaml.load(fh, Loader=loader)
+
+
+# Per-league registries by teams file: (parent registry, file mtime, overlay)
+_LEAGUE_REGISTRIES: dict[Path, tuple[TeamRegistry, int, TeamRegistry]] = {}
+
+
+def league_registry(registry: TeamRegistry, games_path: Path) -> TeamRegistry:
+    """
+    *registry* with the league's own '<team>_teams.yml' layered over it, if
+    there is one next to *games_path*; otherwise *registry* itself.
+
+    The overlay is kept for the process until the teams file or *registry*
+    changes, and passing it back in returns it unchanged.
+    """
+    teams_path = league_teams_path(Path(games_path))
+    if teams_path is None:
+        return registry
+    try:
+        mtime_ns = teams_path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return registry
+    cached = _LEAGUE_REGISTRIES.get(teams_path)
+    if cached is not None:
+        parent, cached_mtime, overlay = cached
+        if registry is overlay or (registry is parent and mtime_ns == cached_mtime):
+            return overlay
+    overlay = registry.overlay(load_yaml(teams_path))
+    _LEAGUE_REGISTRIES[teams_path] = (registry, mtime_ns, overlay)
+    LOGGER.debug("league_registry: %s layered over the shared teams", teams_path.name)
+    return overlay
 
 
 def load_teams_data() -> dict:
@@ -71,4 +191,4 @@ def load_teams_data() -> dict:
 
 def load_games_data(club: str, year: int | str) -> dict:
     """Load the games YAML for *club* and *year*."""
-    return load_yaml(find_data_file(f"{club}_games_{year}.yml", subfolder=str(year)))
+    return load_yaml(get_data_repository().get(club, year).path)
@@ -0,0 +1,340 @@
+"""
+Watch mode — rebuild calendars as soon as their YAML changes.
+
+The data tree under ICAL_DATAPATH is watched with inotify on Linux (through
+ctypes, so no extra dependency) or by polling file mtimes elsewhere. A burst
+of saves is debounced into one set of changes, then only the affected
+calendars are rebuilt:
+
+    a games file changed      that league
+    teams.yml changed         every league that references a team ID whose
+                              entry was added, removed or edited
+    <team>_teams.yml changed  the leagues it is layered over (see
+                              utils.league_registry)
+
+The team registry and every parsed League stay in memory between rebuilds,
+so an edit costs one YAML parse and one render. Which leagues reference
+which teams is tracked in a DependencyIndex (see depindex.py).
+"""
+
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import struct
+import time
+from pathlib import Path
+from typing import Iterator, Optional, Protocol
+
+from .batch import BuildJob, BuildOptions, BuildResult, _safe_build_job, log_results
+from .depindex import DependencyIndex, changed_team_ids
+from .models import League, TeamRegistry
+from .repository import DataRepository, league_teams_path
+from .utils import load_yaml
+
+LOGGER = logging.getLogger(__name__)
+
+DEFAULT_DEBOUNCE = 0.3   # seconds of quiet before a burst of changes is handled
+DEFAULT_POLL_INTERVAL = 1.0
+
+
+# ---------------------------------------------------------------------------
+# Watchers
+# ---------------------------------------------------------------------------
+
+class Watcher(Protocol):
+    def changes(self, timeout: Optional[float]) -> set[Path]:
+        """YAML files changed since the last call; waits up to *timeout* (None = forever)."""
+
+    def close(self) -> None:
+        ...
+
+
+def _is_yaml(path: Path) -> bool:
+    return path.suffix == ".yml" and not path.name.startswith(".")
+
+
+def _walk_dirs(base: Path) -> Iterator[Path]:
+    for dirpath, dirnames, _ in os.walk(base):
+        dirnames[:] = [d for d in dirnames if not d.startswith(".")]
+        yield Path(dirpath)
+
+
+def _yaml_files(base: Path) -> Iterator[Path]:
+    for directory in _walk_dirs(base):
+        for entry in os.scandir(directory):
+            if entry.is_file() and _is_yaml(Path(entry.name)):
+                yield Path(entry.path)
+
+
+class PollingWatcher:
+    """Detects changes by comparing (mtime, size) snapshots of every YAML file."""
+
+    def __init__(self, base: Path, interval: float = DEFAULT_POLL_INTERVAL) -> None:
+        self.base = base
+        self.interval = interval
+        self._snapshot = self._scan()
+
+    def _scan(self) -> dict[Path, tuple[int, int]]:
+        snapshot = {}
+        for path in _yaml_files(self.base):
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                continue
+            snapshot[path] = (st.st_mtime_ns, st.st_size)
+        return snapshot
+
+    def changes(self, timeout: Optional[float]) -> set[Path]:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = self.interval if deadline is None else min(self.interval, deadline - time.monotonic())
+            time.sleep(max(wait, 0.0))
+            snapshot = self._scan()
+            changed = {
+                path for path in snapshot.keys() | self._snapshot.keys()
+                if snapshot.get(path) != self._snapshot.get(path)
+            }
+            self._snapshot = snapshot
+            if changed or (deadline is not None and time.monotonic() >= deadline):
+                return changed
+
+    def close(self) -> None:
+        pass
+
+
+# From <sys/inotify.h>
+_IN_MODIFY = 0x002
+_IN_CLOSE_WRITE = 0x008
+_IN_MOVED_FROM = 0x040
+_IN_MOVED_TO = 0x080
+_IN_CREATE = 0x100
+_IN_DELETE = 0x200
+_IN_Q_OVERFLOW = 0x4000
+_IN_ISDIR = 0x40000000
+_WATCH_MASK = _IN_MODIFY | _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+_EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, len
+
+
+class InotifyWatcher:
+    """
+    Linux inotify watcher over every directory under *base*.
+
+    Raises:
+        OSError: If inotify is not available.
+    """
+
+    def __init__(self, base: Path) -> None:
+        self.base = base
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        if not hasattr(libc, "inotify_init1"):
+            raise OSError("inotify is not available")
+        self._libc = libc
+        self._fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._dirs: dict[int, Path] = {}
+        for directory in _walk_dirs(base):
+            self._add_watch(directory)
+
+    def _add_watch(self, directory: Path) -> None:
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), _WATCH_MASK)
+        if wd < 0:
+            LOGGER.warning("Cannot watch %s: %s", directory, os.strerror(ctypes.get_errno()))
+            return
+        self._dirs[wd] = directory
+
+    def changes(self, timeout: Optional[float]) -> set[Path]:
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return set()
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+
+        changed: set[Path] = set()
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b"\0")
+            offset += length
+
+            if mask & _IN_Q_OVERFLOW:
+                LOGGER.warning("inotify queue overflowed; treating every file as changed")
+                changed.update(_yaml_files(self.base))
+                continue
+            directory = self._dirs.get(wd)
+            if directory is None or not name:
+                continue
+            path = directory / os.fsdecode(name)
+            if mask & _IN_ISDIR:
+                if mask & (_IN_CREATE | _IN_MOVED_TO) and not path.name.startswith("."):
+                    # A new folder (e.g. next season's): watch it and pick up its files
+                    for sub in _walk_dirs(path):
+                        self._add_watch(sub)
+                    changed.update(_yaml_files(path))
+            elif _is_yaml(path):
+                changed.add(path)
+        return changed
+
+    def close(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+def make_watcher(base: Path, poll: bool = False) -> Watcher:
+    """An inotify watcher where available, otherwise (or with *poll*) a polling one."""
+    if not poll:
+        try:
+            return InotifyWatcher(base)
+        except (OSError, AttributeError) as exc:
+            LOGGER.info("inotify unavailable (%s); polling for changes", exc)
+    return PollingWatcher(base)
+
+
+def debounced(watcher: Watcher, delay: float = DEFAULT_DEBOUNCE) -> Iterator[set[Path]]:
+    """Yield batches of changed files, each ending after *delay* seconds without a change."""
+    while True:
+        changed = watcher.changes(None)
+        while changed:
+            more = watcher.changes(delay)
+            if not more:
+                break
+            changed |= more
+        if changed:
+            yield changed
+
+
+# ---------------------------------------------------------------------------
+# Rebuilding
+# ---------------------------------------------------------------------------
+
+class WatchSession:
+    """The warm state of a watch run: the registry and every parsed league."""
+
+    def __init__(
+        self,
+        repository: DataRepository,
+        teams_path: Path,
+        options: Optional[BuildOptions] = None,
+        dependencies: Optional[DependencyIndex] = None,
+    ) -> None:
+        self.repository = repository
+        self.teams_path = teams_path
+        self.options = options or BuildOptions(shared_inputs={"teams": teams_path})
+        self.dependencies = dependencies if dependencies is not None else DependencyIndex()
+        self.teams_data: dict = {}
+        self.registry = TeamRegistry({})
+        self.leagues: dict[Path, League] = {}
+
+    def load(self) -> None:
+        """Parse teams.yml and every games file."""
+        self.teams_data = load_yaml(self.teams_path)
+        self.registry = TeamRegistry.from_dict(self.teams_data)
+        self.dependencies.set_teams(self.teams_data)
+        data_files = self.repository.list_files()
+        for data_file in data_files:
+            # Old-format files are expected to fail; only mention them in debug output
+            self._load_league(data_file.path, log_level=logging.DEBUG)
+        LOGGER.info(
+            "Watching %d leagues under %s (%d files not loadable)",
+            len(self.leagues), self.repository.base, len(data_files) - len(self.leagues),
+        )
+        self.dependencies.save()
+
+    def _load_league(self, path: Path, log_level: int = logging.WARNING) -> bool:
+        try:
+            league = League.from_dict(load_yaml(path))
+        except Exception as exc:  # pylint: disable=broad-except
+            if not isinstance(exc, FileNotFoundError):
+                LOGGER.log(log_level, "Cannot load %s: %s: %s", path.name, type(exc).__name__, exc)
+            self._drop_league(path)
+            return False
+        self.leagues[path] = league
+        self.dependencies.update(path, league)
+        return True
+
+    def _drop_league(self, path: Path) -> None:
+        self.leagues.pop(path, None)
+        self.dependencies.remove(path)
+
+    def apply(self, changed: set[Path]) -> list[BuildResult]:
+        """Reload what *changed* and rebuild every calendar that depends on it."""
+        started = time.perf_counter()
+        to_build: set[Path] = set()
+
+        if self.teams_path in changed:
+            to_build |= self._reload_teams()
+
+        by_teams_file = self._leagues_by_teams_file()
+        league_teams = changed & by_teams_file.keys()
+        for path in sorted(league_teams):
+            LOGGER.info("%s changed", path.name)
+            to_build |= by_teams_file[path]
+
+        games = {path for path in changed - league_teams if path != self.teams_path}
+        if any(path not in self.leagues and path.exists() for path in games):
+            self.repository.refresh()  # a new file — re-index so it can be found
+        indexed = {df.path for df in self.repository.list_files()}
+        for path in games:
+            if path in indexed and self._load_league(path):
+                to_build.add(path)
+            elif path in self.leagues:
+                LOGGER.info("Removed %s", path.name)
+                self._drop_league(path)
+
+        jobs = [self._job(path) for path in sorted(to_build) if path in self.leagues]
+        results = [
+            _safe_build_job(job, self.registry, self.options, league=self.leagues[job.path])
+            for job in jobs
+        ]
+        if results:
+            log_results(results, time.perf_counter() - started)
+        self.dependencies.save()
+        return results
+
+    def _reload_teams(self) -> set[Path]:
+        try:
+            teams_data = load_yaml(self.teams_path)
+            registry = TeamRegistry.from_dict(teams_data)
+        except Exception as exc:  # pylint: disable=broad-except
+            LOGGER.error("Cannot load %s: %s: %s", self.teams_path.name, type(exc).__name__, exc)
+            return set()
+        changed = changed_team_ids(self.teams_data, teams_data)
+        self.teams_data, self.registry = teams_data, registry
+        self.dependencies.set_teams(teams_data)
+        LOGGER.info("teams.yml changed: %s", ", ".join(sorted(changed)) or "no team entries")
+        return self.dependencies.leagues_for(changed)
+
+    def _leagues_by_teams_file(self) -> dict[Path, set[Path]]:
+        """The loaded leagues by their own teams file, whether or not it exists yet."""
+        found: dict[Path, set[Path]] = {}
+        for path in self.leagues:
+            teams_path = league_teams_path(path)
+            if teams_path is not None:
+                found.setdefault(teams_path, set()).add(path)
+        return found
+
+    def _job(self, path: Path) -> BuildJob:
+        for data_file in self.repository.list_files():
+            if data_file.path == path:
+                return BuildJob.from_data_file(data_file)
+        return BuildJob.from_path(path)
+
+
+def watch(session: WatchSession, watcher: Watcher, debounce: float = DEFAULT_DEBOUNCE) -> None:
+    """Rebuild affected calendars on every change until interrupted."""
+    try:
+        for changed in debounced(watcher, debounce):
+            LOGGER.debug("Changed: %s", ", ".join(sorted(p.name for p in changed)))
+            session.apply(changed)
+    except KeyboardInterrupt:
+        LOGGER.info("Watch stopped")
+    finally:
+        watcher.close()
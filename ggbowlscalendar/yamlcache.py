@@ -0,0 +1,186 @@
+"""
+On-disk cache of parsed YAML files.
+
+Each entry is a pickle of the parsed structure, keyed by the source file's
+resolved path and validated against its mtime and size (and, optionally, a
+SHA-256 of its content). Entries are touched on every hit so the oldest
+mtime marks the least recently used entry when the cache grows past its cap.
+If an entry cannot be written (e.g. a read-only home directory) the file is
+still loaded, just not cached.
+
+Environment variables:
+    ICAL_YAML_CACHE             set to "off" (or "0"/"false"/"no") to disable
+    ICAL_YAML_CACHE_DIR         cache directory (default ~/.cache/ggbowlscalendar/yaml)
+    ICAL_YAML_CACHE_MAX_MB      size cap in megabytes (default 64)
+    ICAL_YAML_CACHE_VERIFY      set to "1" to also check a content hash on every hit
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import pickle
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+LOGGER = logging.getLogger(__name__)
+
+CACHE_FORMAT = 1  # bump to invalidate every existing entry
+DEFAULT_MAX_MB = 64
+_ENTRY_SUFFIX = ".pickle"
+_FALSE_VALUES = {"0", "off", "false", "no"}
+
+
+@dataclass
+class _Entry:
+    """What is stored on disk for one source file."""
+
+    source: str
+    mtime_ns: int
+    size: int
+    digest: Optional[str]
+    data: Any
+    fmt: int = CACHE_FORMAT
+
+
+class YamlCache:
+    """A size-capped LRU directory of parsed YAML files."""
+
+    def __init__(self, cache_dir: Path, max_bytes: int, verify_hash: bool = False) -> None:
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.verify_hash = verify_hash
+        self.hits = 0
+        self.misses = 0
+
+    def load(self, path: Path, parse: Callable[[Path], Any]) -> Any:
+        """Return the parsed content of *path*, calling *parse* only on a miss."""
+        stat = path.stat()
+        entry_path = self._entry_path(path)
+        entry = self._read_entry(entry_path)
+
+        if entry is not None and self._is_fresh(entry, path, stat):
+            self.hits += 1
+            _touch(entry_path)
+            LOGGER.debug("yaml cache hit: %s", path)
+            return entry.data
+
+        self.misses += 1
+        LOGGER.debug("yaml cache miss: %s", path)
+        data = parse(path)
+        try:
+            self._write_entry(entry_path, _Entry(
+                source=str(path.resolve()),
+                mtime_ns=stat.st_mtime_ns,
+                size=stat.st_size,
+                digest=_file_digest(path) if self.verify_hash else None,
+                data=data,
+            ))
+            self.evict()
+        except OSError as exc:
+            # e.g. a read-only home directory: the load still succeeds, uncached
+            LOGGER.debug("yaml cache not written for %s: %s", path, exc)
+        return data
+
+    def evict(self) -> None:
+        """Delete least recently used entries until the cache fits its cap."""
+        entries = []
+        for entry_path in self.cache_dir.glob(f"*{_ENTRY_SUFFIX}"):
+            try:
+                st = entry_path.stat()
+            except FileNotFoundError:
+                continue  # removed by another process
+            entries.append((st.st_mtime_ns, st.st_size, entry_path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry_path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            entry_path.unlink(missing_ok=True)
+            total -= size
+            LOGGER.debug("yaml cache evicted: %s", entry_path.name)
+
+    def clear(self) -> None:
+        """Remove every cache entry."""
+        for entry_path in self.cache_dir.glob(f"*{_ENTRY_SUFFIX}"):
+            entry_path.unlink(missing_ok=True)
+
+    def _entry_path(self, path: Path) -> Path:
+        key = hashlib.sha1(str(path.resolve()).encode("utf-8")).hexdigest()
+        return self.cache_dir / f"{key}{_ENTRY_SUFFIX}"
+
+    def _is_fresh(self, entry: _Entry, path: Path, stat: os.stat_result) -> bool:
+        if (
+            entry.fmt != CACHE_FORMAT
+            or entry.source != str(path.resolve())
+            or entry.mtime_ns != stat.st_mtime_ns
+            or entry.size != stat.st_size
+        ):
+            return False
+        return not self.verify_hash or entry.digest == _file_digest(path)
+
+    @staticmethod
+    def _read_entry(entry_path: Path) -> Optional[_Entry]:
+        try:
+            with open(entry_path, "rb") as fh:
+                entry = pickle.load(fh)
+        except FileNotFoundError:
+            return None
+        except Exception:  # pylint: disable=broad-except
+            # A corrupt or foreign entry is just a miss; it will be overwritten.
+            LOGGER.debug("yaml cache unreadable: %s", entry_path)
+            return None
+        return entry if isinstance(entry, _Entry) else None
+
+    def _write_entry(self, entry_path: Path, entry: _Entry) -> None:
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        # Write then rename so concurrent readers never see a partial entry
+        tmp_path = entry_path.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            with open(tmp_path, "wb") as fh:
+                pickle.dump(entry, fh, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, entry_path)
+        except OSError:
+            tmp_path.unlink(missing_ok=True)
+            raise
+
+
+def _file_digest(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def _touch(entry_path: Path) -> None:
+    try:
+        os.utime(entry_path)
+    except OSError:
+        pass  # recency is best-effort
+
+
+def cache_root() -> Path:
+    """The per-user cache directory for this app (honours $XDG_CACHE_HOME)."""
+    return Path(os.getenv("XDG_CACHE_HOME") or Path.home() / ".cache") / "ggbowlscalendar"
+
+
+_CACHES: dict[tuple, YamlCache] = {}
+
+
+def get_yaml_cache() -> Optional[YamlCache]:
+    """
+    Return the YamlCache configured by the environment, or None when disabled.
+
+    One instance is kept per distinct configuration so hit/miss counters
+    accumulate over a run.
+    """
+    if os.getenv("ICAL_YAML_CACHE", "on").lower() in _FALSE_VALUES:
+        return None
+
+    cache_dir = Path(os.getenv("ICAL_YAML_CACHE_DIR") or cache_root() / "yaml")
+    max_bytes = int(float(os.getenv("ICAL_YAML_CACHE_MAX_MB", DEFAULT_MAX_MB)) * 1024 * 1024)
+    verify = os.getenv("ICAL_YAML_CACHE_VERIFY", "0").lower() not in _FALSE_VALUES
+
+    key = (cache_dir, max_bytes, verify)
+    if key not in _CACHES:
+        _CACHES[key] = YamlCache(cache_dir, max_bytes, verify)
+    return _CACHES[key]
@@ -3,14 +3,40 @@ Bowls Calendar Generator
 
 Usage:
     python main.py --team <team-name> --year <year>
+    python main.py --team <team-name> [<team-name> ...] --year <year>
+    python main.py --all [--year <year-or-glob>]
+    python main.py --serve [--host <host>] [--port <port>]
+    python main.py --watch [--poll]
+    python main.py --standings [table|json|csv] (--all | --team <team-name> ...) [--year <year>]
+    python main.py --clashes (--all | --team <team-name> ...) [--year <year>]
+    python main.py --occupancy [--week <date>] [--freebusy] (--all | --team <team-name> ...) [--year <year>]
+    python main.py --merge <name> [--merge-home] [--merge-venue <team-id> ...] (--all | --team ...) --year <year>
 
 Arguments can also be supplied via environment variables:
     ICAL_TEAM   equivalent to --team
     ICAL_YEAR   equivalent to --year
+    ICAL_WORKERS equivalent to --workers
+    ICAL_HOST   equivalent to --host
+    ICAL_PORT   equivalent to --port
+    ICAL_WINDOW_DAYS equivalent to --window
+    ICAL_SEASON_DB the database file for --season-db
 
 Example:
     python main.py --team fallsindoor --year 2024
     ICAL_TEAM=fallsindoor ICAL_YEAR=2024 python main.py
+    python main.py --all --year 2026
+    python main.py --all --year "202*"
+    python main.py --all --workers 0
+    python main.py --all --year 2026 --window 14
+    python main.py --all --year 2026 --diff
+    python main.py --clashes --all --season-db
+    python main.py --serve --port 5000
+    python main.py --watch --reproducible
+    python main.py --standings --all --year 2026
+    python main.py --standings csv --team fallsladiese1 fallsladiese2 --year 2026
+    python main.py --merge falls_all --merge-home --all --year 2026
+    python main.py --clashes --all --year 2026
+    python main.py --occupancy --week 2026-06-01 --freebusy --all --year 2026
 """
 
 import argparse
@@ -18,14 +44,51 @@ import logging
 import logging.config
 import os
 import sys
+from contextlib import ExitStack
+from datetime import date, datetime, timedelta, timezone
+from itertools import groupby
 from pathlib import Path
+from typing import Optional
 
 import yaml
 
-from ggbowlscalendar.calendar import build_calendar
+from ggbowlscalendar.batch import (
+    BACKEND_ICALENDAR,
+    BACKENDS,
+    BuildJob,
+    BuildOptions,
+    build_job,
+    log_changes,
+    run_batch,
+)
+from ggbowlscalendar.calendar import EventWindow, reproducible_dtstamp
+from ggbowlscalendar.clashes import Booking, find_clashes, league_bookings
+from ggbowlscalendar.depindex import DEPENDENCY_INDEX_FILENAME, DependencyIndex
+from ggbowlscalendar.event_cache import default_event_cache_dir
+from ggbowlscalendar.manifest import MANIFEST_FILENAME, BuildManifest
+from ggbowlscalendar.merge import MergeSource, at_venue, home_only, merge_events, write_merged
 from ggbowlscalendar.models import League, TeamRegistry
-from ggbowlscalendar.printer import print_results
-from ggbowlscalendar.utils import load_games_data, load_teams_data, write_ical_file
+from ggbowlscalendar.occupancy import OccupancyIndex, venue_slug, write_freebusy
+from ggbowlscalendar.printer import print_clashes, print_results, print_standings, print_week
+from ggbowlscalendar.repository import league_teams_path
+from ggbowlscalendar.seasondb import SeasonDB, default_season_db_path, shared_season_db
+from ggbowlscalendar.server import DEFAULT_HOST, DEFAULT_PORT, FeedCache, serve
+from ggbowlscalendar.standings import StandingsEngine, group_divisions, write_csv, write_json
+from ggbowlscalendar.utils import (
+    YAML_LOADER,
+    find_data_file,
+    find_games_files,
+    get_data_repository,
+    get_output_dir,
+    league_registry,
+    load_games_data,
+    load_teams_data,
+    load_yaml,
+    open_ical_output,
+)
+from ggbowlscalendar.watch import WatchSession, make_watcher, watch
+
+_GLOB_CHARS = set("*?[")
 
 
 def _setup_logging() -> None:
@@ -33,7 +96,7 @@ def _setup_logging() -> None:
     config_path = Path("logging.yml")
     if config_path.exists():
         with open(config_path, encoding="utf-8") as fh:
-            logging.config.dictConfig(yaml.safe_load(fh))
+            logging.config.dictConfig(yaml.load(fh, Loader=YAML_LOADER))
     else:
         logging.basicConfig(
             level=logging.INFO,
@@ -49,24 +112,182 @@ def _parse_args() -> argparse.Namespace:
             "Each argument can also be set via an environment variable:\n"
             "  --team  →  ICAL_TEAM\n"
             "  --year  →  ICAL_YEAR\n"
+            "  --workers  →  ICAL_WORKERS\n"
+            "  --backend  →  ICAL_BACKEND\n"
+            "  --host  →  ICAL_HOST\n"
+            "  --port  →  ICAL_PORT\n"
+            "  --window  →  ICAL_WINDOW_DAYS\n"
         ),
     )
+    env_team = os.getenv("ICAL_TEAM")
     parser.add_argument(
         "--team",
-        default=os.getenv("ICAL_TEAM"),
+        nargs="+",
+        default=[env_team] if env_team else None,
         metavar="TEAM_NAME",
-        help="Team name used to locate the games YAML file (e.g. 'fallsindoor'). "
+        help="Team name(s) used to locate the games YAML file (e.g. 'fallsindoor'). "
+             "Give several names to build them all in one run. "
              "Falls back to $ICAL_TEAM if not supplied.",
     )
     parser.add_argument(
         "--year",
         default=os.getenv("ICAL_YEAR"),
         metavar="YEAR",
-        help="Season year (e.g. '2024'). Falls back to $ICAL_YEAR if not supplied.",
+        help="Season year (e.g. '2024'), or a glob such as '202*' in batch mode. "
+             "Falls back to $ICAL_YEAR if not supplied.",
+    )
+    parser.add_argument(
+        "--all",
+        action="store_true",
+        help="Build every '<team>_games_<year>.yml' file found under $ICAL_DATAPATH. "
+             "--year defaults to every season.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=int(os.getenv("ICAL_WORKERS", "1")),
+        metavar="N",
+        help="Number of worker processes for batch mode (0 = one per CPU). "
+             "Falls back to $ICAL_WORKERS, default 1.",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="In batch mode, rebuild every calendar even if its inputs are unchanged.",
+    )
+    parser.add_argument(
+        "--reproducible",
+        action="store_true",
+        default=bool(os.getenv("SOURCE_DATE_EPOCH")),
+        help="Stamp events from $SOURCE_DATE_EPOCH, a 'dtstamp' in the games file or "
+             "the newest input file time, so identical data gives identical .ics bytes. "
+             "On by default when $SOURCE_DATE_EPOCH is set.",
+    )
+    parser.add_argument(
+        "--backend",
+        choices=BACKENDS,
+        default=os.getenv("ICAL_BACKEND", BACKEND_ICALENDAR),
+        help="How the .ics file is written: 'icalendar' builds the whole calendar in memory, "
+             "'stream' writes one event at a time. Output is identical. "
+             "Falls back to $ICAL_BACKEND, default 'icalendar'.",
+    )
+    parser.add_argument(
+        "--window",
+        type=int,
+        default=int(os.environ["ICAL_WINDOW_DAYS"]) if os.getenv("ICAL_WINDOW_DAYS") else None,
+        metavar="DAYS",
+        help="Keep only events from the last DAYS days (from the Monday before) and the future "
+             "in each .ics; older ones go to '<team>_games_<year>_archive.ics'. "
+             "Falls back to $ICAL_WINDOW_DAYS; default off.",
+    )
+    parser.add_argument(
+        "--diff",
+        action="store_true",
+        help="Compare each .ics with its previous build: unchanged events keep their bytes, "
+             "changed ones get a higher SEQUENCE and LAST-MODIFIED, and the changes are "
+             "logged. Takes precedence over --event-cache.",
+    )
+    parser.add_argument(
+        "--event-cache",
+        action="store_true",
+        help="In batch mode, reuse the serialized events of unchanged matches from the "
+             "previous run ($ICAL_EVENT_CACHE_DIR), with this run's DTSTAMP. Implies --backend stream.",
+    )
+    parser.add_argument(
+        "--season-db",
+        action="store_true",
+        help="Compile the data tree into an SQLite season database ($ICAL_SEASON_DB) first, "
+             "re-reading only changed files, and load the selected leagues from it.",
+    )
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="Serve every calendar over HTTP at /<team>/<year>.ics instead of writing files.",
+    )
+    parser.add_argument(
+        "--host",
+        default=os.getenv("ICAL_HOST", DEFAULT_HOST),
+        help=f"Address for --serve to listen on. Falls back to $ICAL_HOST, default {DEFAULT_HOST}.",
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=int(os.getenv("ICAL_PORT", str(DEFAULT_PORT))),
+        help=f"Port for --serve. Falls back to $ICAL_PORT, default {DEFAULT_PORT}.",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keep running and rebuild each calendar as soon as its YAML (or a team it "
+             "references in teams.yml) changes.",
+    )
+    parser.add_argument(
+        "--poll",
+        action="store_true",
+        help="With --watch, poll for changes instead of using inotify.",
+    )
+    parser.add_argument(
+        "--standings",
+        nargs="?",
+        const="table",
+        choices=("table", "json", "csv"),
+        metavar="FORMAT",
+        help="Instead of calendars, print the league table of every division the selected "
+             "games files cover, as a 'table' (default), 'json' or 'csv'.",
+    )
+    parser.add_argument(
+        "--clashes",
+        action="store_true",
+        help="Instead of calendars, list every pair of the selected teams' matches that "
+             "overlap at the same venue.",
+    )
+    parser.add_argument(
+        "--occupancy",
+        action="store_true",
+        help="Instead of calendars, print which teams use each home ground on each day of "
+             "--week.",
+    )
+    parser.add_argument(
+        "--week",
+        type=date.fromisoformat,
+        default=date.today(),
+        metavar="DATE",
+        help="With --occupancy, a date (YYYY-MM-DD) in the week to show; default this week.",
+    )
+    parser.add_argument(
+        "--freebusy",
+        action="store_true",
+        help="With --occupancy, also write 'freebusy_<venue>.ics' per ground (named from its location).",
+    )
+    parser.add_argument(
+        "--merge",
+        metavar="NAME",
+        help="Instead of one calendar per team, write the selected teams' matches into a "
+             "single '<NAME>_<year>.ics', each summary prefixed with the team.",
+    )
+    parser.add_argument(
+        "--merge-home",
+        action="store_true",
+        help="With --merge, also write '<NAME>_home_<year>.ics' with only home matches.",
+    )
+    parser.add_argument(
+        "--merge-venue",
+        action="append",
+        default=[],
+        metavar="TEAM_ID",
+        help="With --merge, also write '<NAME>_<team_id>_<year>.ics' with only the matches "
+             "at that team's ground. May be repeated.",
     )
 
     args = parser.parse_args()
 
+    if args.serve or args.watch:
+        return args
+
+    if args.all:
+        args.year = args.year or "*"
+        return args
+
     missing = [
         flag
         for flag, value in (("--team (or $ICAL_TEAM)", args.team),
@@ -79,12 +300,289 @@ def _parse_args() -> argparse.Namespace:
     return args
 
 
+def _window(args: argparse.Namespace) -> Optional[EventWindow]:
+    return None if args.window is None else EventWindow.recent(args.window)
+
+
+def _is_batch(args: argparse.Namespace) -> bool:
+    """True when the arguments select more than a single team/year pair."""
+    return args.all or len(args.team) > 1 or bool(_GLOB_CHARS & set(args.year))
+
+
+def _season_db(args: argparse.Namespace) -> Optional[SeasonDB]:
+    """With --season-db, the season database brought up to date with the data tree."""
+    if not args.season_db:
+        return None
+    path = default_season_db_path()
+    db = shared_season_db(path)
+    stats = db.refresh(get_data_repository())
+    logging.getLogger(__name__).info(
+        "Season database %s: %d added, %d updated, %d removed, %d unchanged",
+        path, stats.added, stats.updated, stats.removed, stats.unchanged,
+    )
+    return db
+
+
+def _batch_jobs(args: argparse.Namespace) -> list[BuildJob]:
+    """Find the games files selected by --all / --team / --year."""
+    data_files = find_games_files(args.year)
+    if not args.all:
+        wanted = set(args.team)
+        data_files = [df for df in data_files if df.team in wanted]
+    return [BuildJob.from_data_file(df) for df in data_files]
+
+
+def _run_batch(args: argparse.Namespace) -> None:
+    logger = logging.getLogger(__name__)
+
+    jobs = _batch_jobs(args)
+    if not jobs:
+        logger.warning("No games files found for year=%s", args.year)
+        return
+
+    logger.info("Generating %d calendars for year=%s", len(jobs), args.year)
+    _season_db(args)
+    teams_path = find_data_file("teams.yml")
+    teams_data = load_yaml(teams_path)
+    registry = TeamRegistry.from_dict(teams_data)
+    manifest = None if args.force else BuildManifest.load(get_output_dir() / MANIFEST_FILENAME)
+    dependencies = DependencyIndex.load(get_output_dir() / DEPENDENCY_INDEX_FILENAME)
+    dependencies.set_teams(teams_data)
+    results = run_batch(
+        jobs, registry,
+        workers=args.workers,
+        manifest=manifest,
+        options=BuildOptions(
+            shared_inputs={"teams": teams_path},
+            reproducible=args.reproducible,
+            backend=args.backend,
+            event_cache_dir=default_event_cache_dir() if args.event_cache else None,
+            window=_window(args),
+            diff=args.diff,
+            season_db=default_season_db_path() if args.season_db else None,
+        ),
+        dependencies=dependencies,
+    )
+    if not all(r.ok for r in results):
+        sys.exit(1)
+
+
+def _run_standings(args: argparse.Namespace) -> None:
+    logger = logging.getLogger(__name__)
+
+    jobs = _batch_jobs(args)
+    if not jobs:
+        logger.warning("No games files found for year=%s", args.year)
+        return
+
+    registry = TeamRegistry.from_dict(load_teams_data())
+    db = _season_db(args)
+    seasons, registries, ours = {}, {}, set()
+    for year, season_jobs in groupby(sorted(jobs, key=lambda j: (j.year, j.team)), key=lambda j: j.year):
+        leagues = _load_leagues(list(season_jobs), db)
+        registries[year] = _layered_registry(registry, leagues)
+        ours |= {league.my_team_id for league in leagues.values()}
+        tables = []
+        for paths in group_divisions(leagues):
+            engine = StandingsEngine()
+            for path in paths:
+                engine.update(path, leagues[path])
+            tables.append(engine.table())
+        seasons[year] = tables
+
+    if args.standings == "json":
+        write_json(sys.stdout, seasons, registries)
+    elif args.standings == "csv":
+        write_csv(sys.stdout, seasons, registries)
+    else:
+        for year, tables in seasons.items():
+            logger.info("Standings for %s: %d divisions", year, len(tables))
+            for rows in tables:
+                print_standings(rows, registries[year], highlight=frozenset(ours))
+
+
+def _layered_registry(registry: TeamRegistry, leagues: dict[Path, League]) -> TeamRegistry:
+    """
+    *registry* with the own teams file of every one of *leagues* layered over
+    it, for naming the teams of tables built from several leagues. Where two
+    files define one ID, the later games path wins.
+    """
+    for path in sorted(leagues):
+        for teams_path in _own_teams(path):
+            registry = registry.overlay(load_yaml(teams_path))
+    return registry
+
+
+def _own_teams(games_path: Path) -> list[Path]:
+    """The league's own teams file, if it has one, as a list of inputs."""
+    teams_path = league_teams_path(games_path)
+    return [teams_path] if teams_path is not None and teams_path.is_file() else []
+
+
+def _league_bookings(leagues: dict[Path, League], registry: TeamRegistry) -> list[Booking]:
+    """The bookings of *leagues*, each resolved with its own teams file (see league_registry)."""
+    return [
+        booking
+        for path, league in leagues.items()
+        for booking in league_bookings([league], league_registry(registry, path))
+    ]
+
+
+def _load_leagues(jobs: list[BuildJob], db: Optional[SeasonDB] = None) -> dict[Path, League]:
+    """
+    Parse each job's games file, skipping (with a warning) any that fail.
+
+    Leagues in the season database *db* are loaded from it instead.
+    """
+    logger = logging.getLogger(__name__)
+    leagues = {}
+    for job in jobs:
+        league = db.league(job.team, job.year) if db is not None else None
+        if league is not None:
+            leagues[job.path] = league
+            continue
+        try:
+            leagues[job.path] = League.from_dict(load_yaml(job.path))
+        except Exception as exc:  # pylint: disable=broad-except
+            logger.warning("Skipping %s: %s: %s", job.path.name, type(exc).__name__, exc)
+    return leagues
+
+
+def _run_clashes(args: argparse.Namespace) -> None:
+    logger = logging.getLogger(__name__)
+
+    jobs = _batch_jobs(args)
+    if not jobs:
+        logger.warning("No games files found for year=%s", args.year)
+        return
+
+    registry = TeamRegistry.from_dict(load_teams_data())
+    leagues = _load_leagues(jobs, _season_db(args))
+    bookings = _league_bookings(leagues, registry)
+    clashes = find_clashes(bookings)
+    logger.info("%d clashes among %d matches in %d leagues", len(clashes), len(bookings), len(leagues))
+    print_clashes(clashes, registry)
+
+
+def _run_occupancy(args: argparse.Namespace) -> None:
+    logger = logging.getLogger(__name__)
+
+    jobs = _batch_jobs(args)
+    if not jobs:
+        logger.warning("No games files found for year=%s", args.year)
+        return
+
+    teams_path = find_data_file("teams.yml")
+    registry = TeamRegistry.from_dict(load_yaml(teams_path))
+    leagues = _load_leagues(jobs, _season_db(args))
+    index = OccupancyIndex.from_bookings(_league_bookings(leagues, registry))
+    print_week(index, args.week - timedelta(days=args.week.weekday()), registry)
+
+    if not args.freebusy:
+        return
+    if args.reproducible:
+        dtstamp = max(
+            reproducible_dtstamp(league, [teams_path, path, *_own_teams(path)]) for path, league in leagues.items()
+        )
+    else:
+        dtstamp = datetime.now(timezone.utc)
+    for venue in index.venues:
+        with open_ical_output(f"freebusy_{venue_slug(venue)}.ics") as fh:
+            write_freebusy(fh, venue, index.busy(venue), dtstamp, comment=", ".join(index.team_ids(venue)))
+
+
+def _within(window: EventWindow, event_filter):
+    """*event_filter*, restricted to the events inside *window*."""
+    return lambda event: window.includes(event.data.end) and (event_filter is None or event_filter(event))
+
+
+def _run_merge(args: argparse.Namespace) -> None:
+    logger = logging.getLogger(__name__)
+
+    jobs = _batch_jobs(args)
+    if not jobs:
+        logger.warning("No games files found for year=%s", args.year)
+        return
+
+    teams_path = find_data_file("teams.yml")
+    registry = TeamRegistry.from_dict(load_yaml(teams_path))
+    variants = [("", None)]
+    if args.merge_home:
+        variants.append(("_home", home_only))
+    for team_id in args.merge_venue:
+        variants.append((f"_{team_id.lower()}", at_venue(registry.get(team_id).location)))
+    window = _window(args)
+    if window is not None:
+        variants = [(suffix, _within(window, event_filter)) for suffix, event_filter in variants]
+        variants.append(("_archive", _within(window.archived(), None)))
+
+    db = _season_db(args)
+    for year, season_jobs in groupby(sorted(jobs, key=lambda j: (j.year, j.team)), key=lambda j: j.year):
+        season_jobs = list(season_jobs)
+        leagues = _load_leagues(season_jobs, db)
+        sources = []
+        for job in season_jobs:
+            league = leagues.get(job.path)
+            if league is None:
+                continue
+            inputs = [teams_path, job.path, *_own_teams(job.path)]
+            dtstamp = reproducible_dtstamp(league, inputs) if args.reproducible else None
+            sources.append(MergeSource(job.team, league, dtstamp, league_registry(registry, job.path)))
+        with ExitStack() as stack:
+            outputs = [
+                (stack.enter_context(open_ical_output(f"{args.merge}{suffix}_{year}.ics")), event_filter)
+                for suffix, event_filter in variants
+            ]
+            counts = write_merged(merge_events(sources, registry), outputs)
+        logger.info(
+            "Merged %d teams for %s: %s", len(sources), year,
+            ", ".join(f"{args.merge}{suffix}_{year}.ics ({count})" for (suffix, _), count in zip(variants, counts)),
+        )
+
+
+def _run_watch(args: argparse.Namespace) -> None:
+    repository = get_data_repository()
+    teams_path = find_data_file("teams.yml")
+    session = WatchSession(repository, teams_path, BuildOptions(
+        shared_inputs={"teams": teams_path},
+        reproducible=args.reproducible,
+        backend=args.backend,
+        event_cache_dir=default_event_cache_dir() if args.event_cache else None,
+        window=_window(args),
+        diff=args.diff,
+    ), DependencyIndex.load(get_output_dir() / DEPENDENCY_INDEX_FILENAME))
+    session.load()
+    watch(session, make_watcher(repository.base, poll=args.poll))
+
+
 def main() -> None:
     _setup_logging()
     logger = logging.getLogger(__name__)
 
     args = _parse_args()
-    team = args.team
+    if args.serve:
+        serve(FeedCache(get_data_repository(), find_data_file("teams.yml")), args.host, args.port)
+        return
+    if args.watch:
+        _run_watch(args)
+        return
+    if args.standings:
+        _run_standings(args)
+        return
+    if args.merge:
+        _run_merge(args)
+        return
+    if args.clashes:
+        _run_clashes(args)
+        return
+    if args.occupancy:
+        _run_occupancy(args)
+        return
+    if _is_batch(args):
+        _run_batch(args)
+        return
+
+    team = args.team[0]
     year = args.year
 
     logger.info("Generating calendar for team=%s year=%s", team, year)
@@ -94,19 +592,26 @@ def main() -> None:
     games_data = load_games_data(club=team, year=year)
 
     # Build models
-    registry = TeamRegistry.from_dict(teams_data)
+    job = BuildJob.from_data_file(get_data_repository().get(team, year))
+    registry = league_registry(TeamRegistry.from_dict(teams_data), job.path)
     league = League.from_dict(games_data)
 
     # Print results table to console
     print_results(league, registry)
 
-    # Generate and save the .ics file
-    calendar = build_calendar(league, registry)
-    ics_filename = f"{team}_games_{year}.ics"
-    write_ical_file(ics_filename, calendar.to_ical())
-
-    logger.info("Done — written %s", ics_filename)
+    # Generate and save the .ics file(s)
+    result = build_job(job, registry, BuildOptions(
+        shared_inputs={"teams": find_data_file("teams.yml")},
+        reproducible=args.reproducible,
+        backend=args.backend,
+        window=_window(args),
+        diff=args.diff,
+    ), league=league)
+    log_changes(result)
+    if registry.unknown_ids:
+        logger.warning("Team IDs not in teams.yml: %s", ", ".join(registry.unknown_ids))
+    logger.info("Done — written %s", job.ics_filename)
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
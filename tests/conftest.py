@@ -141,6 +141,21 @@ def make_league(matches: list[Match] | None = None) -> League:
 # Fixtures
 # ---------------------------------------------------------------------------
 
+@pytest.fixture(autouse=True)
+def _no_yaml_cache(monkeypatch):
+    """Keep the on-disk YAML cache out of tests unless a test opts back in."""
+    monkeypatch.setenv("ICAL_YAML_CACHE", "off")
+
+
+@pytest.fixture(autouse=True)
+def _fresh_data_repository():
+    """Each test resolves ICAL_DATAPATH afresh rather than reusing a cached index."""
+    from ggbowlscalendar.utils import reset_data_repository
+    reset_data_repository()
+    yield
+    reset_data_repository()
+
+
 @pytest.fixture
 def registry() -> TeamRegistry:
     return TeamRegistry.from_dict({
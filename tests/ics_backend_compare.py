@@ -0,0 +1,102 @@
+"""
+Compare the icalendar and streaming (ics_writer) backends byte-for-byte.
+
+Run as a script (by test_ics_writer.py) so that the real icalendar package
+is used rather than the stubs registered in conftest.py. Every games file
+under data/ that parses is rendered with both backends, plus a synthetic
+league exercising escaping and line folding. Exits non-zero on any
+difference, or with 77 if icalendar is not installed.
+"""
+
+from __future__ import annotations
+
+import io
+import sys
+from dataclasses import replace
+from datetime import date, datetime, time, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+try:
+    from icalendar import Calendar
+except ImportError:
+    sys.exit(77)
+
+from ggbowlscalendar.calendar import (  # noqa: E402
+    _add_calendar_headers,
+    _build_event,
+    build_calendar,
+    iter_event_data,
+)
+from ggbowlscalendar.ics_writer import write_calendar  # noqa: E402
+from ggbowlscalendar.models import League, Match, TeamRegistry  # noqa: E402
+from ggbowlscalendar.utils import _parse_yaml  # noqa: E402
+
+DTSTAMP = datetime(2024, 1, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def _synthetic() -> tuple[League, TeamRegistry]:
+    registry = TeamRegistry.from_dict({
+        "ME": {"name": "Mé; Club, \\ Ltd", "location": "1 Road, Town; County"},
+        "LONG": {"name": "A" * 60 + "é" * 30, "location": "x\\" * 80},
+        "NL": {"name": "Line\nBreak", "location": "€" * 40 + ", end"},
+    })
+    matches = [
+        Match(venue="home" if i % 2 else "away", opp_id=opp, date=date(2024, 5, 1 + i),
+              start_time=time(18, 30), our_score=i, opp_score=1, label=label)
+        for i, (opp, label) in enumerate([
+            ("LONG", ""), ("NL", "Cup, Final; replay"), ("UNKNOWN", "ü" * 70), ("ClubComp", ""),
+        ])
+    ]
+    league = League(my_team_id="ME", duration_hours=3, default_day="Wed",
+                    default_time=time(18, 30), matches=matches)
+    return league, registry
+
+
+def _both(league: League, registry: TeamRegistry) -> tuple[bytes, bytes]:
+    tree = build_calendar(league, registry, DTSTAMP).to_ical()
+    buf = io.BytesIO()
+    write_calendar(buf, iter_event_data(league, registry, DTSTAMP))
+    return tree, buf.getvalue()
+
+
+def _revised(league: League, registry: TeamRegistry) -> tuple[bytes, bytes]:
+    """As _both, with SEQUENCE and LAST-MODIFIED set as ics_diff does for changed events."""
+    events = [
+        replace(data, sequence=i + 1, last_modified=DTSTAMP)
+        for i, data in enumerate(iter_event_data(league, registry, DTSTAMP))
+    ]
+    cal = Calendar()
+    _add_calendar_headers(cal)
+    for data in events:
+        cal.add_component(_build_event(data))
+    buf = io.BytesIO()
+    write_calendar(buf, events)
+    return cal.to_ical(), buf.getvalue()
+
+
+def main() -> int:
+    data_dir = ROOT / "data"
+    registry = TeamRegistry.from_dict(_parse_yaml(data_dir / "teams.yml"))
+    cases = [("synthetic", *_synthetic())]
+    for path in sorted(data_dir.rglob("*.yml")):
+        try:
+            cases.append((str(path.relative_to(ROOT)), League.from_dict(_parse_yaml(path)), registry))
+        except (KeyError, TypeError, ValueError, AttributeError):
+            continue  # not a games file in the current format
+
+    failures = 0
+    checks = [(name, _both(league, reg)) for name, league, reg in cases]
+    checks.append(("synthetic (revised)", _revised(*_synthetic())))
+    for name, (tree, streamed) in checks:
+        if tree != streamed:
+            failures += 1
+            print(f"DIFFERENT: {name}")
+    print(f"{len(checks) - failures}/{len(checks)} calendars identical")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
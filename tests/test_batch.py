@@ -0,0 +1,402 @@
+"""
+Tests for batch.py — building many calendars in one process.
+"""
+
+from __future__ import annotations
+
+import logging
+from datetime import datetime
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+import yaml
+
+from ggbowlscalendar.batch import (
+    BACKEND_STREAM,
+    BuildJob,
+    BuildOptions,
+    build_job,
+    log_results,
+    resolve_workers,
+    run_batch,
+)
+from ggbowlscalendar.calendar import EventWindow
+from ggbowlscalendar.depindex import DependencyIndex
+from ggbowlscalendar.manifest import BuildManifest
+from ggbowlscalendar.repository import DataRepository
+from ggbowlscalendar.seasondb import SeasonDB
+from ggbowlscalendar.utils import get_output_dir
+
+GAMES_YAML = """\
+me: MYTEAM
+day: Tue
+start_time: '18:00'
+duration: 3
+matches:
+- home: OPP1
+  date: 2024-05-14
+  our_score: 0
+  opp_score: 0
+- away: OPP1
+  date: 2024-05-21
+  newdate: tbd
+  our_score: 0
+  opp_score: 0
+"""
+
+
+class _FakeIcal:
+    def to_ical(self) -> bytes:
+        return b"BEGIN:VCALENDAR\r\nEND:VCALENDAR\r\n"
+
+
+@pytest.fixture
+def games_file(tmp_path) -> Path:
+    path = tmp_path / "2024" / "myclub_games_2024.yml"
+    path.parent.mkdir()
+    path.write_text(GAMES_YAML)
+    return path
+
+
+# ===========================================================================
+# BuildJob
+# ===========================================================================
+
+class TestBuildJob:
+
+    def test_from_path_splits_team_and_year(self):
+        job = BuildJob.from_path(Path("data/2026/fallsvets1_games_2026.yml"))
+        assert (job.team, job.year) == ("fallsvets1", "2026")
+
+    def test_from_path_handles_split_season(self):
+        job = BuildJob.from_path(Path("data/stcolmans/stcolmans_games_2024-25.yml"))
+        assert (job.team, job.year) == ("stcolmans", "2024-25")
+
+    def test_ics_filename(self):
+        job = BuildJob.from_path(Path("fallsvets1_games_2026.yml"))
+        assert job.ics_filename == "fallsvets1_games_2026.ics"
+
+    def test_archive_filename(self):
+        job = BuildJob.from_path(Path("fallsvets1_games_2026.yml"))
+        assert job.archive_filename == "fallsvets1_games_2026_archive.ics"
+
+
+# ===========================================================================
+# build_job / run_batch
+# ===========================================================================
+
+class TestBuildJobRun:
+
+    def test_writes_calendar_for_job(self, registry, games_file):
+        with patch("ggbowlscalendar.batch.build_calendar", return_value=_FakeIcal()), \
+             patch("ggbowlscalendar.batch.write_ical_file") as mock_write:
+            build_job(BuildJob.from_path(games_file), registry)
+        mock_write.assert_called_once_with("myclub_games_2024.ics", _FakeIcal().to_ical())
+
+    def test_event_count_excludes_tbd_matches(self, registry, games_file):
+        with patch("ggbowlscalendar.batch.build_calendar", return_value=_FakeIcal()), \
+             patch("ggbowlscalendar.batch.write_ical_file"):
+            result = build_job(BuildJob.from_path(games_file), registry)
+        assert result.event_count == 1
+
+    def test_run_batch_preserves_job_order(self, registry, games_file, tmp_path):
+        other = tmp_path / "2024" / "another_games_2024.yml"
+        other.write_text(GAMES_YAML)
+        jobs = [BuildJob.from_path(games_file), BuildJob.from_path(other)]
+        with patch("ggbowlscalendar.batch.build_calendar", return_value=_FakeIcal()), \
+             patch("ggbowlscalendar.batch.write_ical_file"):
+            results = run_batch(jobs, registry)
+        assert [r.job for r in results] == jobs
+
+    def test_run_batch_shares_one_registry(self, registry, games_file):
+        jobs = [BuildJob.from_path(games_file)] * 3
+        with patch("ggbowlscalendar.batch.build_calendar", return_value=_FakeIcal()) as mock_build, \
+             patch("ggbowlscalendar.batch.write_ical_file"):
+            run_batch(jobs, registry)
+        assert all(call.args[1] is registry for call in mock_build.call_args_list)
+
+    def test_failing_job_reported_without_stopping_run(self, registry, games_file, tmp_path):
+        missing = BuildJob.from_path(tmp_path / "2024" / "missing_games_2024.yml")
+        jobs = [missing, BuildJob.from_path(games_file)]
+        with patch("ggbowlscalendar.batch.build_calendar", return_value=_FakeIcal()), \
+             patch("ggbowlscalendar.batch.write_ical_file"):
+            results = run_batch(jobs, registry)
+        assert not results[0].ok
+        assert "FileNotFoundError" in results[0].error
+        assert results[1].ok
+
+
+class TestRollingWindow:
+
+    GAMES = GAMES_YAML.replace("  newdate: tbd\n", "")   # events on 14th and 21st May
+
+    @pytest.fixture
+    def output_dir(self, monkeypatch, tmp_path) -> Path:
+        monkeypatch.setenv("ICAL_OUTPUT", str(tmp_path / "out"))
+        return tmp_path / "out" / "Apps" / "icalendar"
+
+    @pytest.mark.parametrize("options", [
+        BuildOptions(backend=BACKEND_STREAM),
+        BuildOptions(backend=BACKEND_STREAM, event_cache_dir=Path("events")),
+    ], ids=["stream", "event-cache"])
+    def test_writes_current_and_archive(self, registry, games_file, output_dir, tmp_path, options):
+        games_file.write_text(self.GAMES)
+        window = EventWindow(datetime(2024, 5, 20))
+        if options.event_cache_dir is not None:
+            options.event_cache_dir = tmp_path / "events"
+        options.window = window
+        result = build_job(BuildJob.from_path(games_file), registry, options)
+        assert result.event_count == 1
+        current = (output_dir / "myclub_games_2024.ics").read_bytes()
+        archive = (output_dir / "myclub_games_2024_archive.ics").read_bytes()
+        assert b"DTSTART:20240521T" in current and b"20240514" not in current
+        assert b"DTSTART:20240514T" in archive and b"20240521" not in archive
+
+    def test_icalendar_backend(self, registry, games_file):
+        games_file.write_text(self.GAMES)
+        window = EventWindow(datetime(2024, 5, 20))
+        with patch("ggbowlscalendar.batch.build_calendar", return_value=_FakeIcal()) as mock_build, \
+             patch("ggbowlscalendar.batch.write_ical_file") as mock_write:
+            result = build_job(BuildJob.from_path(games_file), registry, BuildOptions(window=window))
+        assert [call.args[3] for call in mock_build.call_args_list] == [window, window.archived()]
+        assert [call.args[0] for call in mock_write.call_args_list] == [
+            "myclub_games_2024.ics", "myclub_games_2024_archive.ics",
+        ]
+        assert result.event_count == 1
+
+    def test_icalendar_backend_counts_resolved_starts(self, registry, games_file):
+        games_file.write_text(self.GAMES)
+        games_file.with_name("myclub_teams.yml").write_text(
+            "teams:\n  MYTEAM:\n    name: Me\n    location: Here\n    start_time: '20:00'\n"
+        )
+        window = EventWindow(datetime(2024, 5, 14, 22, 0))   # after 18:00 + 3h, before 20:00 + 3h
+        with patch("ggbowlscalendar.batch.build_calendar", return_value=_FakeIcal()), \
+             patch("ggbowlscalendar.batch.write_ical_file"):
+            result = build_job(BuildJob.from_path(games_file), registry, BuildOptions(window=window))
+        assert result.event_count == 2
+
+    def test_no_window_no_archive(self, registry, games_file, output_dir):
+        build_job(BuildJob.from_path(games_file), registry, BuildOptions(backend=BACKEND_STREAM))
+        assert not (output_dir / "myclub_games_2024_archive.ics").exists()
+
+    def test_league_teams_file_layered(self, registry, games_file, output_dir):
+        games_file.with_name("myclub_teams.yml").write_text(
+            "me: MYTEAM\nteams:\n  OPP1:\n    name: League Opp\n    location: League Ground\n"
+            "    start_time: '14:00'\n"
+        )
+        build_job(BuildJob.from_path(games_file), registry, BuildOptions(backend=BACKEND_STREAM))
+        ics = (output_dir / "myclub_games_2024.ics").read_bytes()
+        assert b"(League Opp)" in ics
+        assert b"DTSTART:20240514T175000" in ics   # a home match: our start time, not theirs
+        assert registry.get("OPP1").name == "Opponents FC"
+
+    def test_cutoff_in_signature(self):
+        assert "window" not in BuildOptions().signature()
+        options = BuildOptions(window=EventWindow(datetime(2024, 5, 20)))
+        assert "window=2024-05-20" in options.signature()
+
+
+class TestDiffOutput:
+
+    @pytest.fixture
+    def output_dir(self, monkeypatch, tmp_path) -> Path:
+        monkeypatch.setenv("ICAL_OUTPUT", str(tmp_path / "out"))
+        return tmp_path / "out" / "Apps" / "icalendar"
+
+    def test_changes_recorded_and_logged(self, registry, games_file, output_dir, caplog):
+        job = BuildJob.from_path(games_file)
+        options = BuildOptions(diff=True)
+        first = build_job(job, registry, options)
+        assert first.changes == {}
+        before = (output_dir / job.ics_filename).read_bytes()
+
+        games_file.write_text(GAMES_YAML.replace("our_score: 0\n  opp_score: 0", "our_score: 21\n  opp_score: 9", 1))
+        result = build_job(job, registry, options)
+        (change,) = result.changes[job.ics_filename]
+        assert change.kind == "rescored"
+        after = (output_dir / job.ics_filename).read_bytes()
+        assert b"SEQUENCE:1\r\n" in after and after != before
+
+        caplog.set_level(logging.INFO, logger="ggbowlscalendar.batch")
+        log_results([result], 0.1)
+        assert "Changed myclub_games_2024.ics: 1 rescored" in caplog.text
+
+    def test_unchanged_rebuild_keeps_bytes(self, registry, games_file, output_dir):
+        job = BuildJob.from_path(games_file)
+        build_job(job, registry, BuildOptions(diff=True))
+        before = (output_dir / job.ics_filename).read_bytes()
+        result = build_job(job, registry, BuildOptions(diff=True))   # a new DTSTAMP
+        assert result.changes == {}
+        assert (output_dir / job.ics_filename).read_bytes() == before
+
+    def test_diff_in_signature(self):
+        assert "diff" not in BuildOptions().signature()
+        assert "diff=True" in BuildOptions(diff=True).signature()
+
+
+class TestUnknownTeams:
+
+    @pytest.fixture(autouse=True)
+    def output_dir(self, monkeypatch, tmp_path):
+        monkeypatch.setenv("ICAL_OUTPUT", str(tmp_path / "out"))
+
+    def test_reported_once_per_run(self, registry, games_file, tmp_path, caplog):
+        games_file.write_text(GAMES_YAML.replace("- away: OPP1", "- away: NEWCLUB"))
+        other = tmp_path / "2024" / "otherclub_games_2024.yml"
+        other.write_text(GAMES_YAML.replace("- home: OPP1", "- home: NEWCLUB").replace("- away: OPP1", "- away: GONE"))
+        jobs = [BuildJob.from_path(games_file), BuildJob.from_path(other)]
+        options = BuildOptions(backend=BACKEND_STREAM)
+        caplog.set_level(logging.INFO, logger="ggbowlscalendar.batch")
+        results = run_batch(jobs, registry, options=options)
+        assert [r.unknown_team_ids for r in results] == [["NEWCLUB"], ["GONE"]]
+        assert "Team IDs not in teams.yml: NEWCLUB, GONE" in caplog.text
+
+    def test_none_unknown(self, registry, games_file, caplog):
+        run_batch([BuildJob.from_path(games_file)], registry, options=BuildOptions(backend=BACKEND_STREAM))
+        assert "not in teams.yml" not in caplog.text
+
+
+class TestSeasonDatabase:
+
+    @pytest.fixture(autouse=True)
+    def output_dir(self, monkeypatch, tmp_path):
+        monkeypatch.setenv("ICAL_OUTPUT", str(tmp_path / "out"))
+
+    @pytest.fixture
+    def season_db(self, games_file, tmp_path):
+        (tmp_path / "teams.yml").write_text("MYTEAM:\n  name: Me\n  location: Here\n")
+        path = tmp_path / "seasons.sqlite3"
+        with SeasonDB.open(path) as db:
+            db.refresh(DataRepository.scan(tmp_path))
+        return path
+
+    def test_league_loaded_from_database(self, registry, games_file, season_db):
+        options = BuildOptions(backend=BACKEND_STREAM, season_db=season_db)
+        with patch("ggbowlscalendar.batch.load_yaml") as load:
+            result = build_job(BuildJob.from_path(games_file), registry, options)
+        assert result.ok and result.event_count == 1
+        load.assert_not_called()
+
+    def test_league_not_in_database_parsed(self, registry, games_file, season_db):
+        other = games_file.with_name("otherclub_games_2024.yml")
+        other.write_text(GAMES_YAML)
+        options = BuildOptions(backend=BACKEND_STREAM, season_db=season_db)
+        result = build_job(BuildJob.from_path(other), registry, options)
+        assert result.ok and result.event_count == 1
+
+
+# ===========================================================================
+# Process pool
+# ===========================================================================
+
+class TestParallelBatch:
+
+    @pytest.mark.parametrize("requested, expected", [(1, 1), (4, 4)])
+    def test_resolve_explicit_workers(self, requested, expected):
+        assert resolve_workers(requested) == expected
+
+    def test_resolve_zero_means_cpu_count(self):
+        with patch("ggbowlscalendar.batch.os.cpu_count", return_value=8):
+            assert resolve_workers(0) == 8
+
+    def test_pool_results_in_job_order(self, registry, tmp_path):
+        jobs = [BuildJob.from_path(tmp_path / f"team{i}_games_2024.yml") for i in range(4)]
+        results = run_batch(jobs, registry, workers=2)
+        assert [r.job for r in results] == jobs
+        assert not any(r.ok for r in results)
+
+
+# ===========================================================================
+# Incremental rebuilds
+# ===========================================================================
+
+class TestIncrementalBatch:
+
+    @pytest.fixture
+    def env(self, monkeypatch, tmp_path, games_file):
+        monkeypatch.setenv("ICAL_OUTPUT", str(tmp_path / "out"))
+        teams = tmp_path / "teams.yml"
+        teams.write_text("OPP1: {name: Opp, location: There}\n")
+        return {"teams": teams}
+
+    def _run(self, registry, games_file, shared, manifest_path, dependencies=None, window=None):
+        manifest = BuildManifest.load(manifest_path)
+        with patch("ggbowlscalendar.batch.build_calendar", return_value=_FakeIcal()):
+            return run_batch([BuildJob.from_path(games_file)], registry,
+                             manifest=manifest, options=BuildOptions(shared_inputs=shared, window=window),
+                             dependencies=dependencies)
+
+    def _dependencies(self, teams_path, index_path) -> DependencyIndex:
+        dependencies = DependencyIndex.load(index_path)
+        dependencies.set_teams(yaml.safe_load(teams_path.read_text()))
+        return dependencies
+
+    def test_second_run_skips_unchanged(self, registry, games_file, env, tmp_path):
+        manifest_path = tmp_path / "manifest.json"
+        first = self._run(registry, games_file, env, manifest_path)
+        second = self._run(registry, games_file, env, manifest_path)
+        assert not first[0].skipped
+        assert second[0].skipped
+
+    def test_missing_archive_triggers_rebuild(self, registry, games_file, env, tmp_path):
+        manifest_path = tmp_path / "manifest.json"
+        window = EventWindow(datetime(2024, 5, 20))
+        self._run(registry, games_file, env, manifest_path, window=window)
+        assert self._run(registry, games_file, env, manifest_path, window=window)[0].skipped
+        archive = get_output_dir() / BuildJob.from_path(games_file).archive_filename
+        archive.unlink()
+        assert not self._run(registry, games_file, env, manifest_path, window=window)[0].skipped
+        assert archive.exists()
+
+    def test_games_change_triggers_rebuild(self, registry, games_file, env, tmp_path):
+        manifest_path = tmp_path / "manifest.json"
+        self._run(registry, games_file, env, manifest_path)
+        games_file.write_text(GAMES_YAML.replace("our_score: 0", "our_score: 2", 1))
+        assert not self._run(registry, games_file, env, manifest_path)[0].skipped
+
+    def test_league_teams_change_triggers_rebuild(self, registry, games_file, env, tmp_path):
+        manifest_path = tmp_path / "manifest.json"
+        league_teams = games_file.with_name("myclub_teams.yml")
+        league_teams.write_text("teams:\n  OPP1: {name: Opp, location: There}\n")
+        self._run(registry, games_file, env, manifest_path)
+        assert self._run(registry, games_file, env, manifest_path)[0].skipped
+        league_teams.write_text("teams:\n  OPP1: {name: Opp, location: Elsewhere}\n")
+        assert not self._run(registry, games_file, env, manifest_path)[0].skipped
+
+    def test_teams_change_triggers_rebuild(self, registry, games_file, env, tmp_path):
+        manifest_path = tmp_path / "manifest.json"
+        self._run(registry, games_file, env, manifest_path)
+        env["teams"].write_text("OPP1: {name: Opp, location: Elsewhere}\n")
+        assert not self._run(registry, games_file, env, manifest_path)[0].skipped
+
+    def test_unrelated_teams_change_skips_with_dependencies(self, registry, games_file, env,
+                                                            tmp_path):
+        manifest_path = tmp_path / "manifest.json"
+        index_path = tmp_path / "deps.json"
+        self._run(registry, games_file, env, manifest_path,
+                  self._dependencies(env["teams"], index_path))
+        env["teams"].write_text("OPP1: {name: Opp, location: There}\n"
+                                "OTHER: {name: Other, location: Far}\n")
+        second = self._run(registry, games_file, env, manifest_path,
+                           self._dependencies(env["teams"], index_path))
+        assert second[0].skipped
+
+    def test_referenced_teams_change_rebuilds_with_dependencies(self, registry, games_file, env,
+                                                                tmp_path):
+        manifest_path = tmp_path / "manifest.json"
+        index_path = tmp_path / "deps.json"
+        self._run(registry, games_file, env, manifest_path,
+                  self._dependencies(env["teams"], index_path))
+        env["teams"].write_text("OPP1: {name: Opp, location: Elsewhere}\n")
+        second = self._run(registry, games_file, env, manifest_path,
+                           self._dependencies(env["teams"], index_path))
+        assert not second[0].skipped
+
+    def test_failed_build_not_recorded(self, registry, games_file, env, tmp_path):
+        manifest_path = tmp_path / "manifest.json"
+        with patch("ggbowlscalendar.batch.build_calendar", side_effect=ValueError("boom")):
+            run_batch([BuildJob.from_path(games_file)], registry,
+                      manifest=BuildManifest.load(manifest_path),
+                      options=BuildOptions(shared_inputs=env))
+        assert not self._run(registry, games_file, env, manifest_path)[0].skipped
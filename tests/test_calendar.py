@@ -4,6 +4,7 @@ Tests for calendar.py — iCalendar generation.
 
 from __future__ import annotations
 
+from dataclasses import replace
 from datetime import date, datetime, time, timedelta, timezone
 from unittest.mock import patch
 
@@ -20,12 +21,12 @@ from ggbowlscalendar.calendar import (
     CALENDAR_PRODID,
     CALENDAR_TIMEZONE,
     EVENT_PRE_START_BUFFER,
+    EventWindow,
     _build_description,
     _build_summary,
-    _calendar_uid,
-    _resolve_location,
-    _resolve_opp_name,
     build_calendar,
+    iter_event_data,
+    reproducible_dtstamp,
 )
 from ggbowlscalendar.models import TBD, VENUE_AWAY, VENUE_HOME
 
@@ -47,49 +48,6 @@ def _events(cal) -> list:
     return [c for c in cal.get("_components", []) if isinstance(c, FakeEvent)]
 
 
-# ===========================================================================
-# _resolve_opp_name
-# ===========================================================================
-
-class TestResolveOppName:
-
-    def test_normal_team_returned_unchanged(self):
-        assert _resolve_opp_name(make_match(), "Opponents FC") == "Opponents FC"
-
-    def test_stars_stripped_from_unknown_team(self):
-        assert _resolve_opp_name(make_match(), "***UNKNOWN***") == "UNKNOWN"
-
-    def test_club_comp_returns_opp_id(self):
-        m = make_match(opp_id="ClubKnockout")
-        assert _resolve_opp_name(m, "Club Championship") == "ClubKnockout"
-
-    def test_sub_team_appended(self):
-        m = make_match(sub_team="A")
-        assert _resolve_opp_name(m, "Opponents FC") == "Opponents FC A"
-
-    def test_no_sub_team_suffix_when_none(self):
-        assert _resolve_opp_name(make_match(), "Opponents FC") == "Opponents FC"
-
-
-# ===========================================================================
-# _resolve_location
-# ===========================================================================
-
-class TestResolveLocation:
-
-    def test_home_match_uses_my_location(self, registry):
-        m = make_match(venue=VENUE_HOME)
-        assert _resolve_location(m, registry, "My Ground, Town", "Their Ground, City") == "My Ground, Town"
-
-    def test_away_match_uses_opp_location(self, registry):
-        m = make_match(venue=VENUE_AWAY)
-        assert _resolve_location(m, registry, "My Ground, Town", "Their Ground, City") == "Their Ground, City"
-
-    def test_neutral_venue_overrides_both(self, registry):
-        m = make_match(neutral_venue_id="NEUTRAL")
-        assert _resolve_location(m, registry, "My Ground, Town", "Their Ground, City") == "Neutral Ground, Village"
-
-
 # ===========================================================================
 # _build_summary
 # ===========================================================================
@@ -157,40 +115,6 @@ class TestBuildDescription:
         assert d == d.strip()
 
 
-# ===========================================================================
-# _calendar_uid
-# ===========================================================================
-
-class TestCalendarUid:
-
-    def test_format(self):
-        m = make_match(match_date=date(2024, 5, 14), start_time=time(18, 0))
-        assert _calendar_uid(m, "MYTEAM") == f"MYTEAM-202405141800@{CALENDAR_DOMAIN}"
-
-    def test_uses_original_date_not_rescheduled(self):
-        m = make_match(
-            match_date=date(2024, 5, 14), start_time=time(18, 0),
-            rescheduled_date=date(2024, 6, 1), rescheduled_time=time(10, 0),
-        )
-        uid = _calendar_uid(m, "MYTEAM")
-        assert "202405141800" in uid
-        assert "202406011000" not in uid
-
-    def test_label_included_without_spaces(self):
-        m = make_match(match_date=date(2024, 5, 14), start_time=time(18, 0), label="Cup Final")
-        assert "CupFinal" in _calendar_uid(m, "MYTEAM")
-
-    def test_spaces_stripped_from_team_id(self):
-        m = make_match(match_date=date(2024, 5, 14), start_time=time(18, 0))
-        uid = _calendar_uid(m, "MY TEAM")
-        assert "MYTEAM-" in uid
-        assert " " not in uid
-
-    def test_ends_with_domain(self):
-        m = make_match(match_date=date(2024, 5, 14), start_time=time(18, 0))
-        assert _calendar_uid(m, "MYTEAM").endswith(f"@{CALENDAR_DOMAIN}")
-
-
 # ===========================================================================
 # build_calendar — calendar headers
 # ===========================================================================
@@ -311,4 +235,94 @@ class TestBuildCalendarAlarm:
         assert alarm["trigger"] == timedelta(hours=-1)
 
     def test_alarm_description(self, alarm):
-        assert alarm["description"] == "Reminder"
\ No newline at end of file
+        assert alarm["description"] == "Reminder"
+
+
+# ===========================================================================
+# Reproducible DTSTAMP
+# ===========================================================================
+
+class TestReproducibleDtstamp:
+
+    def test_explicit_dtstamp_used_for_every_event(self, registry):
+        stamp = datetime(2023, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+        matches = [make_match(match_date=date(2024, 5, 14)), make_match(match_date=date(2024, 5, 21))]
+        cal = build_calendar(make_league(matches), registry, stamp)
+        assert [e["dtstamp"] for e in _events(cal)] == [stamp, stamp]
+
+    def test_source_date_epoch_preferred(self, monkeypatch):
+        monkeypatch.setenv("SOURCE_DATE_EPOCH", "1700000000")
+        league = replace(make_league(), dtstamp=datetime(2020, 1, 1))
+        assert reproducible_dtstamp(league) == datetime.fromtimestamp(1700000000, timezone.utc)
+
+    def test_league_dtstamp_taken_as_utc(self, monkeypatch):
+        monkeypatch.delenv("SOURCE_DATE_EPOCH", raising=False)
+        league = replace(make_league(), dtstamp=datetime(2020, 1, 1, 9, 30))
+        assert reproducible_dtstamp(league) == datetime(2020, 1, 1, 9, 30, tzinfo=timezone.utc)
+
+    def test_newest_input_mtime_used(self, monkeypatch, tmp_path):
+        import os
+        monkeypatch.delenv("SOURCE_DATE_EPOCH", raising=False)
+        old, new = tmp_path / "old.yml", tmp_path / "new.yml"
+        old.touch()
+        new.touch()
+        os.utime(old, (1_000_000, 1_000_000))
+        os.utime(new, (2_000_000, 2_000_000))
+        stamp = reproducible_dtstamp(make_league(), [old, new])
+        assert stamp == datetime.fromtimestamp(2_000_000, timezone.utc)
+
+    def test_no_source_raises(self, monkeypatch):
+        monkeypatch.delenv("SOURCE_DATE_EPOCH", raising=False)
+        with pytest.raises(ValueError):
+            reproducible_dtstamp(make_league())
+
+
+# ===========================================================================
+# EventWindow
+# ===========================================================================
+
+class TestEventWindow:
+
+    @pytest.fixture
+    def matches(self):
+        # Events run 17:50-21:00 (3 hours from 18:00)
+        return [
+            make_match(match_date=date(2024, 5, 7)),
+            make_match(match_date=date(2024, 5, 14)),
+            make_match(match_date=date(2024, 5, 21), rescheduled_date=date(2024, 6, 4)),
+            make_match(match_date=date(2024, 5, 28), rescheduled_date=TBD),
+        ]
+
+    @pytest.mark.parametrize("today, cutoff", [
+        (date(2024, 5, 29), date(2024, 5, 13)),   # Wed: 14 days back is Wed 15th -> Mon 13th
+        (date(2024, 5, 27), date(2024, 5, 13)),   # Mon: 14 days back is already a Monday
+        (date(2024, 6, 2), date(2024, 5, 13)),    # Sun: still the same cutoff all week
+        (date(2024, 6, 3), date(2024, 5, 20)),
+    ])
+    def test_recent_cuts_at_a_monday(self, today, cutoff):
+        assert EventWindow.recent(14, today).cutoff == datetime.combine(cutoff, time())
+
+    def test_includes_by_event_end(self):
+        window = EventWindow(datetime(2024, 5, 14, 21, 0))
+        assert window.includes(datetime(2024, 5, 14, 21, 0))
+        assert not window.includes(datetime(2024, 5, 14, 20, 59))
+        assert window.archived().includes(datetime(2024, 5, 14, 20, 59))
+        assert window.archived().archived() == window
+
+    def test_current_and_archive_split_the_events(self, matches, registry):
+        league = make_league(matches)
+        window = EventWindow.recent(7, date(2024, 5, 22))   # cutoff Mon 13th
+        every = [e.uid for e in iter_event_data(league, registry, FIXED_NOW)]
+        current = [e.uid for e in iter_event_data(league, registry, FIXED_NOW, window)]
+        archive = [e.uid for e in iter_event_data(league, registry, FIXED_NOW, window.archived())]
+        assert len(current) == 2 and len(archive) == 1
+        assert sorted(current + archive) == sorted(every)
+
+    def test_window_uses_rescheduled_date(self, matches, registry):
+        window = EventWindow(datetime(2024, 6, 1))
+        (event,) = iter_event_data(make_league(matches), registry, FIXED_NOW, window)
+        assert event.start.date() == date(2024, 6, 4)
+
+    def test_build_calendar_with_window(self, matches, registry):
+        cal = build_calendar(make_league(matches), registry, FIXED_NOW, EventWindow(datetime(2024, 5, 13)))
+        assert len(_events(cal)) == 2
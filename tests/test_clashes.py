@@ -0,0 +1,214 @@
+"""
+Tests for clashes.py — venue clash detection.
+"""
+
+from __future__ import annotations
+
+import itertools
+import random
+from dataclasses import replace
+from datetime import date, datetime, time, timedelta
+from unittest.mock import patch
+
+import pytest
+
+from conftest import make_league, make_match, _FakeConsole, _FakeTable
+from ggbowlscalendar.calendar import EVENT_PRE_START_BUFFER
+from ggbowlscalendar.clashes import Booking, find_clashes, league_bookings
+from ggbowlscalendar.models import TBD, VENUE_AWAY, VENUE_HOME, League, TeamRegistry
+from ggbowlscalendar.printer import print_clashes
+
+MY_GROUND = "My Ground, Town"
+TUESDAY = date(2024, 5, 14)
+
+
+def league_for(team_id: str, matches, duration: int = 3) -> League:
+    return replace(make_league(matches), my_team_id=team_id, duration_hours=duration)
+
+
+@pytest.fixture
+def club_registry() -> TeamRegistry:
+    return TeamRegistry.from_dict({
+        "MYTEAM":  {"name": "My Bowls Club",  "location": MY_GROUND},
+        "MYVETS":  {"name": "My Bowls Vets",  "location": MY_GROUND},
+        "OPP1":    {"name": "Opponents FC",   "location": "Their Ground, City"},
+        "OPP2":    {"name": "Other Club",     "location": "Other Ground, City"},
+        "NEUTRAL": {"name": "Neutral Club",   "location": "Neutral Ground, Village"},
+    })
+
+
+def overlapping_pairs(bookings):
+    """The obvious O(n^2) answer, to check the sweep against."""
+    return {
+        frozenset((id(a), id(b)))
+        for a, b in itertools.combinations(bookings, 2)
+        if a.venue == b.venue and a.start < b.end and b.start < a.end and a.fixture != b.fixture
+    }
+
+
+# ===========================================================================
+# league_bookings
+# ===========================================================================
+
+class TestLeagueBookings:
+
+    def test_interval_matches_calendar_event(self, club_registry):
+        league = league_for("MYTEAM", [make_match(match_date=TUESDAY, start_time=time(18, 0))], duration=3)
+        (booking,) = league_bookings([league], club_registry)
+        assert booking.start == datetime(2024, 5, 14, 18, 0) - EVENT_PRE_START_BUFFER
+        assert booking.end == datetime(2024, 5, 14, 21, 0)
+
+    @pytest.mark.parametrize("match, venue", [
+        (make_match(venue=VENUE_HOME), MY_GROUND),
+        (make_match(venue=VENUE_AWAY), "Their Ground, City"),
+        (make_match(venue=VENUE_AWAY, neutral_venue_id="NEUTRAL"), "Neutral Ground, Village"),
+    ])
+    def test_location_resolved_like_calendar(self, club_registry, match, venue):
+        (booking,) = league_bookings([league_for("MYTEAM", [match])], club_registry)
+        assert booking.venue == venue
+
+    def test_rescheduled_date_used(self, club_registry):
+        match = make_match(match_date=TUESDAY, rescheduled_date=date(2024, 5, 16))
+        (booking,) = league_bookings([league_for("MYTEAM", [match])], club_registry)
+        assert booking.start.date() == date(2024, 5, 16)
+
+    def test_tbd_skipped(self, club_registry):
+        league = league_for("MYTEAM", [make_match(rescheduled_date=TBD)])
+        assert league_bookings([league], club_registry) == []
+
+    def test_teams_as_resolved(self, club_registry):
+        own = club_registry.overlay({"teams": {"OPP3": {"name": "Visitors", "location": "Far Ground"}}})
+        match = make_match(venue=VENUE_AWAY, opp_id="OPP3")
+        (booking,) = league_bookings([league_for("MYTEAM", [match])], own)
+        assert (booking.team.name, booking.opp.name, booking.venue) == ("My Bowls Club", "Visitors", "Far Ground")
+
+
+# ===========================================================================
+# find_clashes
+# ===========================================================================
+
+class TestFindClashes:
+
+    def test_two_home_matches_same_evening(self, club_registry):
+        first = league_for("MYTEAM", [make_match(opp_id="OPP1", match_date=TUESDAY, start_time=time(18, 0))])
+        second = league_for("MYVETS", [make_match(opp_id="OPP2", match_date=TUESDAY, start_time=time(19, 30))])
+        (clash,) = find_clashes(league_bookings([first, second], club_registry))
+        assert clash.venue == MY_GROUND
+        assert (clash.first.team_id, clash.second.team_id) == ("MYTEAM", "MYVETS")
+        assert clash.overlap == (datetime(2024, 5, 14, 19, 20), datetime(2024, 5, 14, 21, 0))
+
+    def test_back_to_back_is_not_a_clash(self, club_registry):
+        # 3 hours from 14:00 ends at 17:00; the next booking starts at 17:00 (17:10 less 10 minutes)
+        first = league_for("MYTEAM", [make_match(match_date=TUESDAY, start_time=time(14, 0))])
+        second = league_for("MYVETS", [make_match(match_date=TUESDAY, start_time=time(17, 10))])
+        assert find_clashes(league_bookings([first, second], club_registry)) == []
+
+    def test_different_venues_do_not_clash(self, club_registry):
+        first = league_for("MYTEAM", [make_match(venue=VENUE_HOME, match_date=TUESDAY)])
+        second = league_for("MYVETS", [make_match(venue=VENUE_AWAY, match_date=TUESDAY)])
+        assert find_clashes(league_bookings([first, second], club_registry)) == []
+
+    def test_fixture_between_our_teams_is_not_a_clash(self, club_registry):
+        home = league_for("MYTEAM", [make_match(venue=VENUE_HOME, opp_id="MYVETS", match_date=TUESDAY)])
+        away = league_for("MYVETS", [make_match(venue=VENUE_AWAY, opp_id="MYTEAM", match_date=TUESDAY)])
+        assert find_clashes(league_bookings([home, away], club_registry)) == []
+
+    def test_shared_fixture_clashes_once_with_a_third_match(self, club_registry):
+        home = league_for("MYTEAM", [make_match(venue=VENUE_HOME, opp_id="MYVETS", match_date=TUESDAY)])
+        away = league_for("MYVETS", [make_match(venue=VENUE_AWAY, opp_id="MYTEAM", match_date=TUESDAY)])
+        third = league_for("OPP2", [make_match(venue=VENUE_AWAY, opp_id="MYTEAM", match_date=TUESDAY)])
+        assert len(find_clashes(league_bookings([home, away, third], club_registry))) == 1
+
+    def test_three_way_overlap_gives_every_pair(self, club_registry):
+        leagues = [
+            league_for(team, [make_match(opp_id=opp, match_date=TUESDAY, start_time=time(18, minute))])
+            for team, opp, minute in (("MYTEAM", "OPP1", 0), ("MYVETS", "OPP2", 15), ("MYTEAM", "OPP2", 30))
+        ]
+        assert len(find_clashes(league_bookings(leagues, club_registry))) == 3
+
+    def test_ordered_by_venue_then_time(self, club_registry):
+        leagues = [
+            league_for("MYTEAM", [
+                make_match(venue=VENUE_HOME, opp_id="OPP1", match_date=TUESDAY + timedelta(days=7)),
+                make_match(venue=VENUE_AWAY, opp_id="OPP1", match_date=TUESDAY),
+            ]),
+            league_for("MYVETS", [
+                make_match(venue=VENUE_HOME, opp_id="OPP2", match_date=TUESDAY + timedelta(days=7)),
+                make_match(venue=VENUE_AWAY, opp_id="OPP1", match_date=TUESDAY),
+            ]),
+        ]
+        assert [c.venue for c in find_clashes(league_bookings(leagues, club_registry))] == [
+            MY_GROUND, "Their Ground, City",
+        ]
+
+    def test_agrees_with_pairwise_check(self):
+        rng = random.Random(7)
+        base = datetime(2024, 5, 1, 14, 0)
+        bookings = []
+        for i in range(400):
+            start = base + timedelta(days=rng.randrange(30), minutes=15 * rng.randrange(24))
+            bookings.append(Booking(
+                venue=f"V{rng.randrange(3)}",
+                start=start,
+                end=start + timedelta(hours=rng.choice((1, 2, 3))),
+                team_id=f"T{i}",
+                match=make_match(),
+                fixture=((f"T{i}", None), ("X", None), start.date()),
+            ))
+        found = {frozenset((id(c.first), id(c.second))) for c in find_clashes(bookings)}
+        assert found == overlapping_pairs(bookings)
+        assert found
+
+
+# ===========================================================================
+# print_clashes
+# ===========================================================================
+
+class TestPrintClashes:
+
+    def test_table(self, club_registry):
+        first = league_for("MYTEAM", [make_match(opp_id="OPP1", match_date=TUESDAY)])
+        second = league_for("MYVETS", [make_match(opp_id="OPP2", match_date=TUESDAY, sub_team="B")])
+        console, table = _FakeConsole(), _FakeTable()
+        with patch("ggbowlscalendar.printer.Console", return_value=console), \
+             patch("ggbowlscalendar.printer.Table", return_value=table):
+            print_clashes(find_clashes(league_bookings([first, second], club_registry)), club_registry)
+        assert table.columns == ["Venue", "Date", "First", "Second", "Overlap"]
+        (row,) = table.rows
+        assert row[1] == "Tue 14-May-2024"
+        assert row[2].startswith("My Bowls Club v Opponents FC")
+        assert row[3].startswith("My Bowls Vets v Other Club B")
+
+    def test_names_from_booking(self, club_registry):
+        own = club_registry.overlay({"teams": {"OPP3": {"name": "Visitors", "location": "Far Ground"}}})
+        league = league_for("MYTEAM", [make_match(opp_id="OPP3", match_date=TUESDAY)])
+        visitors = league_for("MYVETS", [make_match(opp_id="OPP2", match_date=TUESDAY)])
+        bookings = league_bookings([league], own) + league_bookings([visitors], club_registry)
+        console, table = _FakeConsole(), _FakeTable()
+        with patch("ggbowlscalendar.printer.Console", return_value=console), \
+             patch("ggbowlscalendar.printer.Table", return_value=table):
+            print_clashes(find_clashes(bookings), club_registry)
+        (row,) = table.rows
+        assert row[2].startswith("My Bowls Club v Visitors")
+
+    def test_times_are_resolved_starts(self, club_registry):
+        own = club_registry.overlay({"teams": {"OPP2": {
+            "name": "Other Club", "location": MY_GROUND, "start_time": "14:00",
+        }}})
+        first = league_for("MYTEAM", [make_match(venue=VENUE_AWAY, opp_id="OPP2", match_date=TUESDAY,
+                                                 start_time=time(10, 0))])
+        second = league_for("MYVETS", [make_match(opp_id="OPP1", match_date=TUESDAY, start_time=time(13, 0))])
+        bookings = league_bookings([first], own) + league_bookings([second], club_registry)
+        console, table = _FakeConsole(), _FakeTable()
+        with patch("ggbowlscalendar.printer.Console", return_value=console), \
+             patch("ggbowlscalendar.printer.Table", return_value=table):
+            print_clashes(find_clashes(bookings), club_registry)
+        (row,) = table.rows
+        assert row[4] == "13:50-16:00"
+        assert row[2].endswith("13:00") and row[3].endswith("14:00")
+
+    def test_no_clashes(self, club_registry):
+        console = _FakeConsole()
+        with patch("ggbowlscalendar.printer.Console", return_value=console):
+            print_clashes([], club_registry)
+        assert any("No clashes" in str(p) for p in console.printed)
@@ -0,0 +1,129 @@
+"""
+Tests for columns.py — the NumPy MatchFrame.
+"""
+
+from __future__ import annotations
+
+from dataclasses import replace
+from datetime import date, time
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from ggbowlscalendar.columns import MatchFrame  # noqa: E402
+from ggbowlscalendar.models import TBD, VENUE_AWAY, VENUE_HOME, League  # noqa: E402
+
+from conftest import make_league, make_match  # noqa: E402
+
+
+@pytest.fixture
+def matches():
+    return [
+        make_match(venue=VENUE_HOME, opp_id="OPP1", our_score=12, opp_score=8),
+        make_match(venue=VENUE_AWAY, opp_id="OPP2", our_score=5, opp_score=15,
+                   match_date=date(2024, 5, 21), label="Cup"),
+        make_match(venue=VENUE_HOME, opp_id="OPP1", our_score=10, opp_score=10,
+                   match_date=date(2024, 5, 28), sub_team="B"),
+        make_match(venue=VENUE_AWAY, opp_id="OPP3", match_date=date(2024, 6, 4),
+                   rescheduled_date=date(2024, 6, 11), rescheduled_time=time(14, 30),
+                   neutral_venue_id="VENUE"),
+        make_match(venue=VENUE_HOME, opp_id="OPP2", match_date=date(2024, 6, 18),
+                   rescheduled_date=TBD),
+    ]
+
+
+@pytest.fixture
+def frame(matches) -> MatchFrame:
+    return make_league(matches).to_columns()
+
+
+# ===========================================================================
+# Conversion
+# ===========================================================================
+
+class TestConversion:
+
+    def test_round_trip(self, matches, frame):
+        assert frame.to_matches() == matches
+
+    def test_round_trip_preserves_derived_values(self, matches, frame):
+        restored = frame.to_matches()
+        assert [m.result for m in restored] == [m.result for m in matches]
+        assert [m.scheduled_datetime() for m in restored] == [m.scheduled_datetime() for m in matches]
+
+    def test_round_trip_fixed_start(self):
+        # A home team's start_time (see resolve._scheduled) must not replace a match's own time
+        matches = [replace(make_match(start_time=time(11, 0)), fixed_start=True), make_match()]
+        restored = MatchFrame.from_matches(matches).to_matches()
+        assert restored == matches and [m.fixed_start for m in restored] == [True, False]
+
+    def test_opponents_are_interned(self, frame):
+        assert frame.team_ids == ["OPP1", "OPP2", "OPP3", "VENUE"]
+        assert frame.opp_code.tolist() == [0, 1, 0, 2, 1]
+
+    def test_effective_columns(self, frame):
+        assert frame.effective_ordinal[3] == date(2024, 6, 11).toordinal()
+        assert frame.effective_minutes[3] == 14 * 60 + 30
+        assert frame.effective_ordinal[4] == -1
+
+    def test_seconds_rejected(self):
+        with pytest.raises(ValueError):
+            MatchFrame.from_matches([make_match(start_time=time(18, 0, 30))])
+
+    def test_from_league_yaml(self):
+        league = League.from_dict({
+            "me": "ME", "day": "Tue", "start_time": "18:00", "duration": 3,
+            "matches": [{"home": "OPP1", "date": date(2024, 5, 14), "our_score": 3, "opp_score": 1}],
+        })
+        assert league.to_columns().to_matches() == league.matches
+
+    def test_concat_recodes_strings(self, matches):
+        first = MatchFrame.from_matches(matches[:2])
+        second = MatchFrame.from_matches(matches[2:])
+        joined = MatchFrame.concat([first, second])
+        assert joined.to_matches() == matches
+
+    def test_concat_nothing(self):
+        assert len(MatchFrame.concat([])) == 0
+
+    def test_select(self, frame, matches):
+        assert frame.select(frame.home).to_matches() == [matches[0], matches[2], matches[4]]
+
+
+# ===========================================================================
+# Queries and aggregates
+# ===========================================================================
+
+class TestQueries:
+
+    def test_masks_match_model(self, frame, matches):
+        assert frame.played.tolist() == [m.played for m in matches]
+        assert frame.won.tolist() == [m.result == "W" for m in matches]
+        assert frame.lost.tolist() == [m.result == "L" for m in matches]
+        assert frame.drawn.tolist() == [m.result == "D" for m in matches]
+        assert frame.scheduled.tolist() == [m.scheduled_datetime() is not None for m in matches]
+
+    def test_rescheduled(self, frame):
+        assert frame.rescheduled.tolist() == [False, False, False, True, True]
+
+    def test_against(self, frame):
+        assert frame.against("OPP1").tolist() == [True, False, True, False, False]
+        assert not frame.against("NOBODY").any()
+
+    def test_upcoming_window(self, frame):
+        window = frame.upcoming(date(2024, 6, 1), date(2024, 6, 15))
+        assert window.tolist() == [False, False, False, True, False]
+
+    def test_summary(self, frame):
+        assert frame.summary() == {
+            "matches": 5, "played": 3, "won": 1, "lost": 1, "drawn": 1,
+            "shots_for": 27, "shots_against": 33,
+        }
+
+    def test_splits(self, frame):
+        splits = frame.splits()
+        assert splits["home"]["played"] == 2
+        assert splits["home"]["won"] == 1
+        assert splits["away"]["lost"] == 1
+        assert splits["away"]["matches"] == 2
@@ -0,0 +1,135 @@
+"""
+Tests for depindex.py — the team ID → league dependency index.
+"""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+import pytest
+
+from ggbowlscalendar.depindex import DependencyIndex, changed_team_ids, league_team_ids
+
+from conftest import make_league, make_match
+
+
+def _games_yaml(*opp_ids: str, neutral: str = "") -> str:
+    matches = "".join(
+        f"- home: {opp}\n  date: 2024-05-14\n  our_score: 0\n  opp_score: 0\n"
+        + (f"  location: {neutral}\n" if neutral else "")
+        for opp in opp_ids
+    )
+    return f"me: MYTEAM\nday: Tue\nstart_time: '18:00'\nduration: 3\nmatches:\n{matches}"
+
+
+@pytest.fixture
+def games(tmp_path) -> dict[str, Path]:
+    paths = {
+        "one": tmp_path / "one_games_2024.yml",
+        "two": tmp_path / "two_games_2024.yml",
+    }
+    paths["one"].write_text(_games_yaml("OPP1"))
+    paths["two"].write_text(_games_yaml("OPP2", "OPP3"))
+    return paths
+
+
+@pytest.fixture
+def index(games) -> DependencyIndex:
+    index = DependencyIndex()
+    index.refresh(games.values())
+    return index
+
+
+# ===========================================================================
+# Team references
+# ===========================================================================
+
+class TestTeamIds:
+
+    def test_league_team_ids(self):
+        league = make_league([make_match(opp_id="OPP1"),
+                              make_match(opp_id="OPP2", neutral_venue_id="NEUTRAL")])
+        assert league_team_ids(league) == {"MYTEAM", "OPP1", "OPP2", "NEUTRAL"}
+
+    def test_club_comp_depends_on_alias(self):
+        league = make_league([make_match(opp_id="ClubPairs")])
+        assert "CLUBCOMP" in league_team_ids(league)
+
+    def test_changed_team_ids(self):
+        old = {"A": {"name": "A"}, "B": {"name": "B"}, "C": {"name": "C"}}
+        new = {"A": {"name": "A"}, "B": {"name": "B2"}, "D": {"name": "D"}}
+        assert changed_team_ids(old, new) == {"B", "C", "D"}
+
+
+# ===========================================================================
+# DependencyIndex
+# ===========================================================================
+
+class TestDependencyIndex:
+
+    def test_leagues_for(self, index, games):
+        assert index.leagues_for({"OPP1"}) == {games["one"]}
+        assert index.leagues_for({"OPP3", "OPP1"}) == {games["one"], games["two"]}
+        assert index.leagues_for({"MYTEAM"}) == {games["one"], games["two"]}
+        assert index.leagues_for({"NOBODY"}) == set()
+
+    def test_affected_by_teams_diff(self, index, games):
+        old = {"OPP1": {"location": "A"}, "OPP2": {"location": "B"}}
+        new = {"OPP1": {"location": "A"}, "OPP2": {"location": "Moved"}}
+        assert index.affected_by(old, new) == {games["two"]}
+
+    def test_refresh_parses_only_changed_files(self, index, games):
+        assert index.refresh(games.values()) == []
+        st = games["one"].stat()
+        games["one"].write_text(_games_yaml("OPP2"))
+        os.utime(games["one"], ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+        assert index.refresh(games.values()) == [games["one"]]
+        assert index.leagues_for({"OPP1"}) == set()
+        assert index.leagues_for({"OPP2"}) == {games["one"], games["two"]}
+
+    def test_refresh_drops_missing_and_broken_files(self, index, games):
+        games["one"].unlink()
+        games["two"].write_text("me: MYTEAM\n")
+        index.refresh(games.values())
+        assert len(index) == 0
+        assert index.leagues_for({"MYTEAM"}) == set()
+
+    def test_neutral_venue_is_a_dependency(self, tmp_path):
+        path = tmp_path / "cup_games_2024.yml"
+        path.write_text(_games_yaml("OPP1", neutral="VENUE"))
+        index = DependencyIndex()
+        index.refresh([path])
+        assert index.leagues_for({"VENUE"}) == {path}
+
+    def test_persisted_round_trip(self, index, games, tmp_path):
+        index.path = tmp_path / "out" / ".dependency-index.json"
+        index.save()
+        loaded = DependencyIndex.load(index.path)
+        assert loaded.team_ids(games["two"]) == index.team_ids(games["two"])
+        assert loaded.refresh(games.values()) == []
+
+    def test_unreadable_file_gives_empty_index(self, tmp_path):
+        path = tmp_path / ".dependency-index.json"
+        path.write_text("not json")
+        assert len(DependencyIndex.load(path)) == 0
+
+
+class TestTeamsDigest:
+
+    def test_only_referenced_entries_count(self, index, games):
+        teams = {"MYTEAM": {"name": "Me"}, "OPP1": {"name": "One"}, "OPP2": {"name": "Two"}}
+        index.set_teams(teams)
+        before = {key: index.teams_digest(path) for key, path in games.items()}
+        index.set_teams({**teams, "OPP2": {"name": "Renamed"}})
+        assert index.teams_digest(games["one"]) == before["one"]
+        assert index.teams_digest(games["two"]) != before["two"]
+
+    def test_adding_unknown_team_changes_digest(self, index, games):
+        index.set_teams({"OPP2": {"name": "Two"}})
+        before = index.teams_digest(games["two"])
+        index.set_teams({"OPP2": {"name": "Two"}, "OPP3": {"name": "Three"}})
+        assert index.teams_digest(games["two"]) != before
+
+    def test_unindexed_file_has_no_digest(self, index, tmp_path):
+        assert index.teams_digest(tmp_path / "other_games_2024.yml") is None
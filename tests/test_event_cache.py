@@ -0,0 +1,104 @@
+"""
+Tests for event_cache.py — the per-event serialization cache.
+"""
+
+from __future__ import annotations
+
+from datetime import date, datetime, timezone
+
+import pytest
+
+from conftest import make_league, make_match
+from ggbowlscalendar.calendar import iter_event_data
+from ggbowlscalendar.event_cache import EventCache
+from ggbowlscalendar.ics_writer import serialize_event
+from ggbowlscalendar.models import TBD, TeamRegistry
+
+STAMP = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def cache_path(tmp_path):
+    return tmp_path / "league.events"
+
+
+def _matches():
+    return [
+        make_match(match_date=date(2024, 5, 14)),
+        make_match(match_date=date(2024, 5, 21), our_score=3, opp_score=1),
+        make_match(match_date=date(2024, 5, 28), rescheduled_date=TBD),
+    ]
+
+
+def _run(cache_path, league, registry, stamp=STAMP):
+    cache = EventCache(cache_path)
+    events = list(cache.render(league, registry, stamp))
+    cache.save()
+    return cache, events
+
+
+class TestEventCache:
+
+    def test_output_matches_fresh_serialization(self, cache_path, registry):
+        league = make_league(_matches())
+        _, events = _run(cache_path, league, registry)
+        assert events == [serialize_event(d) for d in iter_event_data(league, registry, STAMP)]
+
+    def test_first_run_all_misses(self, cache_path, registry):
+        cache, _ = _run(cache_path, make_league(_matches()), registry)
+        assert (cache.hits, cache.misses) == (0, 2)
+
+    def test_second_run_all_hits(self, cache_path, registry):
+        league = make_league(_matches())
+        _run(cache_path, league, registry)
+        cache, events = _run(cache_path, league, registry)
+        assert (cache.hits, cache.misses) == (2, 0)
+        assert events == [serialize_event(d) for d in iter_event_data(league, registry, STAMP)]
+
+    def test_changed_score_misses_only_that_match(self, cache_path, registry):
+        _run(cache_path, make_league(_matches()), registry)
+        changed = _matches()
+        changed[0] = make_match(match_date=date(2024, 5, 14), our_score=4, opp_score=2)
+        cache, _ = _run(cache_path, make_league(changed), registry)
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_changed_team_data_misses(self, cache_path, registry):
+        league = make_league(_matches())
+        _run(cache_path, league, registry)
+        moved = TeamRegistry.from_dict({
+            "MYTEAM": {"name": "My Bowls Club", "location": "My Ground, Town"},
+            "OPP1": {"name": "Opponents FC", "location": "New Ground, City"},
+        })
+        cache, _ = _run(cache_path, league, moved)
+        assert cache.misses == 2
+
+    def test_changed_dtstamp_still_hits(self, cache_path, registry):
+        league = make_league(_matches())
+        _run(cache_path, league, registry)
+        later = datetime(2025, 1, 1, tzinfo=timezone.utc)
+        cache, events = _run(cache_path, league, registry, later)
+        assert (cache.hits, cache.misses) == (2, 0)
+        assert events == [serialize_event(d) for d in iter_event_data(league, registry, later)]
+
+    def test_edited_match_with_new_dtstamp_misses_only_that_match(self, cache_path, registry):
+        # As under --reproducible, where the edit also moves DTSTAMP on to the file's mtime
+        _run(cache_path, make_league(_matches()), registry)
+        changed = _matches()
+        changed[1] = make_match(match_date=date(2024, 5, 21), our_score=5, opp_score=1)
+        later = datetime(2025, 1, 1, tzinfo=timezone.utc)
+        cache, events = _run(cache_path, make_league(changed), registry, later)
+        assert (cache.hits, cache.misses) == (1, 1)
+        assert events == [serialize_event(d) for d in iter_event_data(make_league(changed), registry, later)]
+
+    def test_removed_matches_evicted(self, cache_path, registry):
+        _run(cache_path, make_league(_matches()), registry)
+        cache, _ = _run(cache_path, make_league(_matches()[:1]), registry)
+        assert cache.evicted == 1
+        cache, _ = _run(cache_path, make_league(_matches()), registry)
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_corrupt_cache_file_ignored(self, cache_path, registry):
+        cache_path.write_bytes(b"garbage")
+        cache, events = _run(cache_path, make_league(_matches()), registry)
+        assert cache.misses == 2
+        assert len(events) == 2
@@ -0,0 +1,182 @@
+"""
+Tests for ics_diff.py — comparing a build with the previous one.
+"""
+
+from __future__ import annotations
+
+import io
+from dataclasses import replace
+from datetime import date, datetime, time, timezone
+
+import pytest
+
+from conftest import make_league, make_match
+from ggbowlscalendar.calendar import iter_event_data
+from ggbowlscalendar.ics_diff import (
+    ADDED,
+    MOVED,
+    REMOVED,
+    RESCORED,
+    UPDATED,
+    CalendarDiff,
+    EventChange,
+    format_change,
+    read_events,
+    summarize_changes,
+)
+from ggbowlscalendar.ics_writer import IcsWriter, write_calendar
+
+BUILT = datetime(2024, 1, 1, tzinfo=timezone.utc)
+REBUILT = datetime(2024, 5, 20, 9, 30, tzinfo=timezone.utc)
+
+
+def _matches():
+    return [
+        make_match(match_date=date(2024, 5, 14)),
+        make_match(match_date=date(2024, 5, 21)),
+        make_match(match_date=date(2024, 5, 28), label="Cup, semi-final; replay"),
+    ]
+
+
+def _ics(matches, registry, dtstamp=BUILT) -> bytes:
+    buf = io.BytesIO()
+    write_calendar(buf, iter_event_data(make_league(matches), registry, dtstamp))
+    return buf.getvalue()
+
+
+def _rebuild(previous, matches, registry) -> tuple[bytes, CalendarDiff]:
+    diff = CalendarDiff(previous, modified=REBUILT)
+    buf = io.BytesIO()
+    with IcsWriter(buf) as writer:
+        for event_bytes in diff.render(iter_event_data(make_league(matches), registry, REBUILT)):
+            writer.write_raw_event(event_bytes)
+    return buf.getvalue(), diff
+
+
+# ===========================================================================
+# Reader
+# ===========================================================================
+
+class TestReadEvents:
+
+    def test_indexed_by_uid(self, registry):
+        events = read_events(_ics(_matches(), registry))
+        assert list(events) == [d.uid for d in iter_event_data(make_league(_matches()), registry, BUILT)]
+
+    def test_round_trips_event_values(self, registry):
+        (data, *_) = [d for d in iter_event_data(make_league(_matches()), registry, BUILT) if d.description]
+        event = read_events(_ics(_matches(), registry))[data.uid]
+        assert (event.summary, event.description, event.location, event.start, event.end) == (
+            data.summary, data.description, data.location, data.start, data.end,
+        )
+        assert event.sequence == 0
+
+    def test_escaped_and_folded_text(self, registry):
+        long_label = "Cup, semi-final; replay " + "x" * 80
+        events = read_events(_ics([make_match(label=long_label)], registry))
+        (event,) = events.values()
+        assert event.summary.endswith(long_label)
+
+    def test_alarm_properties_ignored(self, registry):
+        (event,) = read_events(_ics(_matches()[:1], registry)).values()
+        assert event.description != "Reminder"
+
+    def test_raw_bytes_are_the_whole_vevent(self, registry):
+        ics = _ics(_matches(), registry)
+        events = read_events(ics)
+        assert b"".join(e.raw for e in events.values()) in ics
+
+    def test_truncated_file(self, registry):
+        ics = _ics(_matches(), registry)
+        assert len(read_events(ics[: ics.rfind(b"END:VEVENT")])) == 2
+
+    def test_not_a_calendar(self):
+        assert read_events(b"") == {}
+
+
+# ===========================================================================
+# Diff
+# ===========================================================================
+
+class TestCalendarDiff:
+
+    def test_unchanged_keeps_previous_bytes(self, registry):
+        previous = _ics(_matches(), registry)
+        rebuilt, diff = _rebuild(previous, _matches(), registry)
+        assert rebuilt == previous   # old DTSTAMPs and all
+        assert diff.changes == []
+
+    def test_moved(self, registry):
+        matches = _matches()
+        matches[1] = replace(matches[1], rescheduled_date=date(2024, 6, 4), rescheduled_time=time(14, 0))
+        rebuilt, diff = _rebuild(_ics(_matches(), registry), matches, registry)
+        (change,) = diff.changes
+        assert change.kind == MOVED
+        assert change.previous_start == datetime(2024, 5, 21, 17, 50)
+        assert change.start == datetime(2024, 6, 4, 13, 50)
+        event = read_events(rebuilt)[change.uid]
+        assert event.sequence == 1
+        assert b"LAST-MODIFIED:20240520T093000Z\r\n" in event.raw
+        assert b"DTSTAMP:20240520T093000Z\r\n" in event.raw
+
+    def test_rescored(self, registry):
+        matches = _matches()
+        matches[0] = replace(matches[0], our_score=21, opp_score=14)
+        _, diff = _rebuild(_ics(_matches(), registry), matches, registry)
+        assert [c.kind for c in diff.changes] == [RESCORED]
+
+    def test_other_change_is_updated(self, registry):
+        matches = _matches()
+        matches[2] = replace(matches[2], sub_team="2")   # the UID does not change
+        _, diff = _rebuild(_ics(_matches(), registry), matches, registry)
+        assert [c.kind for c in diff.changes] == [UPDATED]
+
+    def test_added_and_removed(self, registry):
+        matches = _matches()[1:] + [make_match(match_date=date(2024, 6, 11))]
+        rebuilt, diff = _rebuild(_ics(_matches(), registry), matches, registry)
+        assert [c.kind for c in diff.changes] == [ADDED, REMOVED]
+        assert diff.changes[1].start == datetime(2024, 5, 14, 17, 50)
+        assert all(e.sequence == 0 for e in read_events(rebuilt).values())
+
+    def test_sequence_keeps_counting(self, registry):
+        matches = _matches()
+        previous = _ics(matches, registry)
+        for day in (4, 5):
+            matches[0] = replace(matches[0], rescheduled_date=date(2024, 6, day))
+            previous, _ = _rebuild(previous, matches, registry)
+        assert read_events(previous)[next(iter(read_events(previous)))].sequence == 2
+
+    def test_first_build_reports_nothing(self, registry):
+        rebuilt, diff = _rebuild(None, _matches(), registry)
+        assert diff.changes == []
+        assert b"SEQUENCE" not in rebuilt
+
+    def test_load_missing_file(self, tmp_path, registry):
+        diff = CalendarDiff.load(tmp_path / "missing.ics")
+        list(diff.render(iter_event_data(make_league(_matches()), registry, BUILT)))
+        assert diff.changes == []
+
+
+# ===========================================================================
+# Report
+# ===========================================================================
+
+class TestReport:
+
+    def test_summary_in_kind_order(self):
+        changes = [EventChange(kind, "uid", "x", None) for kind in (REMOVED, MOVED, REMOVED)]
+        assert summarize_changes(changes) == "1 moved, 2 removed"
+
+    def test_no_changes(self):
+        assert summarize_changes([]) == ""
+
+    @pytest.mark.parametrize("change, expected", [
+        (EventChange(MOVED, "u", "A v B", datetime(2024, 6, 4, 13, 50), datetime(2024, 5, 21, 17, 50)),
+         "moved     Tue 04 Jun 13:50 (was Tue 21 May 17:50)  A v B"),
+        (EventChange(RESCORED, "u", "A v B W (2 - 1)", datetime(2024, 5, 14, 17, 50), datetime(2024, 5, 14, 17, 50)),
+         "rescored  Tue 14 May 17:50  A v B W (2 - 1)"),
+        (EventChange(REMOVED, "u", "A v B", datetime(2024, 5, 14, 17, 50)),
+         "removed   Tue 14 May 17:50  A v B"),
+    ])
+    def test_format_change(self, change, expected):
+        assert format_change(change) == expected
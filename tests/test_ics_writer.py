@@ -0,0 +1,194 @@
+"""
+Tests for ics_writer.py — the streaming iCalendar serializer.
+"""
+
+from __future__ import annotations
+
+import io
+import subprocess
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+from conftest import make_league, make_match
+from ggbowlscalendar.calendar import EventData, iter_event_data
+from ggbowlscalendar.ics_writer import (
+    IcsWriter,
+    content_line,
+    escape_text,
+    fold_line,
+    format_datetime,
+    format_duration,
+    restamp_event,
+    serialize_event,
+    text_line,
+    write_calendar,
+)
+
+SKIP_EXIT_CODE = 77  # returned by ics_backend_compare.py when icalendar is missing
+STAMP = datetime(2024, 1, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def _event(**overrides) -> EventData:
+    values = dict(
+        uid="MYTEAM-202405141800@mc-williams.co.uk",
+        summary="My Bowls Club v (Opponents FC)",
+        description="home (Opponents FC)",
+        location="Their Ground, City",
+        start=datetime(2024, 5, 14, 17, 50),
+        end=datetime(2024, 5, 14, 21, 0),
+        dtstamp=STAMP,
+    )
+    values.update(overrides)
+    return EventData(**values)
+
+
+# ===========================================================================
+# Value formatting
+# ===========================================================================
+
+class TestEscapeText:
+
+    @pytest.mark.parametrize("raw, expected", [
+        ("plain", "plain"),
+        ("a, b", r"a\, b"),
+        ("a; b", r"a\; b"),
+        ("back\\slash", r"back\\slash"),
+        ("two\nlines", r"two\nlines"),
+        ("crlf\r\nend", r"crlf\nend"),
+    ])
+    def test_escapes(self, raw, expected):
+        assert escape_text(raw) == expected
+
+
+class TestFoldLine:
+
+    def test_short_line_unchanged(self):
+        assert fold_line("SUMMARY:short") == "SUMMARY:short"
+
+    def test_74_octets_not_folded(self):
+        assert "\r\n" not in fold_line("X" * 74)
+
+    def test_75_octets_folded(self):
+        assert fold_line("X" * 75) == "X" * 74 + "\r\n X"
+
+    def test_folded_lines_within_limit(self):
+        for part in fold_line("L:" + "é" * 200).split("\r\n "):
+            assert len(part.encode("utf-8")) < 75
+
+    def test_multibyte_char_not_split(self):
+        folded = fold_line("A" * 73 + "€")
+        assert folded == "A" * 73 + "\r\n €"
+
+    def test_escape_backslash_moves_with_escaped_char(self):
+        folded = fold_line("A" * 73 + "\\,")
+        assert folded == "A" * 73 + "\r\n \\,"
+
+    def test_content_lines(self):
+        assert content_line("DTSTART", "20240514T180000") == "DTSTART:20240514T180000\r\n"
+        assert text_line("COMMENT", "Ground, Town") == "COMMENT:Ground\\, Town\r\n"
+        assert text_line("COMMENT", "x" * 80).count("\r\n") == 2
+
+
+class TestFormatting:
+
+    def test_naive_datetime_is_floating(self):
+        assert format_datetime(datetime(2024, 5, 14, 17, 50)) == "20240514T175000"
+
+    def test_aware_datetime_is_utc(self):
+        bst = timezone(timedelta(hours=1))
+        assert format_datetime(datetime(2024, 5, 14, 13, 0, tzinfo=bst)) == "20240514T120000Z"
+
+    @pytest.mark.parametrize("delta, expected", [
+        (timedelta(hours=-1), "-PT1H"),
+        (timedelta(minutes=30), "PT30M"),
+        (timedelta(hours=1, seconds=5), "PT1H0M5S"),
+        (timedelta(days=2), "P2D"),
+        (timedelta(days=-1, hours=-2), "-P1DT2H"),
+    ])
+    def test_duration(self, delta, expected):
+        assert format_duration(delta) == expected
+
+
+# ===========================================================================
+# Events and calendars
+# ===========================================================================
+
+class TestSerializeEvent:
+
+    def test_property_order(self):
+        names = [
+            line.split(":", 1)[0]
+            for line in serialize_event(_event()).decode().split("\r\n")
+            if line and not line.startswith(" ")
+        ]
+        assert names == [
+            "BEGIN", "SUMMARY", "DTSTART", "DTEND", "DTSTAMP", "UID",
+            "DESCRIPTION", "LOCATION", "PRIORITY",
+            "BEGIN", "ACTION", "DESCRIPTION", "TRIGGER", "END",
+            "END",
+        ]
+
+    def test_revision_property_order(self):
+        names = [
+            line.split(":", 1)[0]
+            for line in serialize_event(_event(sequence=2, last_modified=STAMP)).decode().split("\r\n")
+            if line and not line.startswith(" ")
+        ]
+        assert names[:10] == [
+            "BEGIN", "SUMMARY", "DTSTART", "DTEND", "DTSTAMP", "UID", "SEQUENCE",
+            "DESCRIPTION", "LAST-MODIFIED", "LOCATION",
+        ]
+
+    def test_location_escaped(self):
+        assert b"LOCATION:Their Ground\\, City\r\n" in serialize_event(_event())
+
+    def test_naive_dtstamp_treated_as_utc(self):
+        assert b"DTSTAMP:20240101T120000Z" in serialize_event(_event(dtstamp=datetime(2024, 1, 1, 12)))
+
+    def test_alarm_trigger(self):
+        assert b"TRIGGER:-PT1H\r\n" in serialize_event(_event())
+
+    def test_restamp(self):
+        later = datetime(2025, 6, 1, 9, 30, tzinfo=timezone.utc)
+        assert restamp_event(serialize_event(_event()), later) == serialize_event(_event(dtstamp=later))
+
+
+class TestWriteCalendar:
+
+    def test_empty_calendar(self):
+        buf = io.BytesIO()
+        assert write_calendar(buf, []) == 0
+        assert buf.getvalue().startswith(b"BEGIN:VCALENDAR\r\nVERSION:2.0\r\n")
+        assert buf.getvalue().endswith(b"END:VCALENDAR\r\n")
+
+    def test_events_written_in_order(self, registry):
+        league = make_league([
+            make_match(match_date=datetime(2024, 5, 14).date()),
+            make_match(match_date=datetime(2024, 5, 21).date()),
+        ])
+        buf = io.BytesIO()
+        assert write_calendar(buf, iter_event_data(league, registry, STAMP)) == 2
+        body = buf.getvalue()
+        assert body.index(b"202405141800") < body.index(b"202405211800")
+
+    def test_no_footer_written_on_error(self):
+        buf = io.BytesIO()
+        with pytest.raises(RuntimeError):
+            with IcsWriter(buf):
+                raise RuntimeError("boom")
+        assert b"END:VCALENDAR" not in buf.getvalue()
+
+
+# ===========================================================================
+# Byte-identity with the icalendar backend over the whole data tree
+# ===========================================================================
+
+def test_stream_backend_matches_icalendar_over_data_tree():
+    script = Path(__file__).with_name("ics_backend_compare.py")
+    proc = subprocess.run([sys.executable, str(script)], capture_output=True, text=True)
+    if proc.returncode == SKIP_EXIT_CODE:
+        pytest.skip("icalendar is not installed")
+    assert proc.returncode == 0, proc.stdout + proc.stderr
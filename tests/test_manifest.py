@@ -0,0 +1,82 @@
+"""
+Tests for manifest.py — the incremental build manifest.
+"""
+
+from __future__ import annotations
+
+import pytest
+
+from ggbowlscalendar import __version__
+from ggbowlscalendar.manifest import BuildManifest, file_digest, input_digests
+
+
+@pytest.fixture
+def games(tmp_path):
+    path = tmp_path / "games.yml"
+    path.write_text("me: MYTEAM\n")
+    return path
+
+
+@pytest.fixture
+def output(tmp_path):
+    path = tmp_path / "out.ics"
+    path.write_bytes(b"BEGIN:VCALENDAR")
+    return path
+
+
+class TestInputDigests:
+
+    def test_includes_generator_version(self, games):
+        assert input_digests(games=games)["generator"] == __version__
+
+    def test_digest_changes_with_content(self, games):
+        before = file_digest(games)
+        games.write_text("me: OTHER\n")
+        assert file_digest(games) != before
+
+
+class TestBuildManifest:
+
+    def test_missing_file_gives_empty_manifest(self, tmp_path, output):
+        manifest = BuildManifest.load(tmp_path / "none.json")
+        assert not manifest.is_current(output, {"games": "x"})
+
+    def test_round_trip(self, tmp_path, games, output):
+        inputs = input_digests(games=games)
+        manifest = BuildManifest.load(tmp_path / "m.json")
+        manifest.record(output, inputs)
+        manifest.save()
+        assert BuildManifest.load(tmp_path / "m.json").is_current(output, inputs)
+
+    def test_changed_input_not_current(self, tmp_path, games, output):
+        manifest = BuildManifest.load(tmp_path / "m.json")
+        manifest.record(output, input_digests(games=games))
+        games.write_text("me: CHANGED\n")
+        assert not manifest.is_current(output, input_digests(games=games))
+
+    def test_missing_output_not_current(self, tmp_path, games, output):
+        inputs = input_digests(games=games)
+        manifest = BuildManifest.load(tmp_path / "m.json")
+        manifest.record(output, inputs)
+        output.unlink()
+        assert not manifest.is_current(output, inputs)
+
+    def test_missing_companion_output_not_current(self, tmp_path, games, output):
+        archive = output.with_name("out_archive.ics")
+        archive.write_bytes(b"BEGIN:VCALENDAR")
+        inputs = input_digests(games=games)
+        manifest = BuildManifest.load(tmp_path / "m.json")
+        manifest.record(output, inputs, [archive])
+        assert manifest.is_current(output, inputs)
+        archive.unlink()
+        assert not manifest.is_current(output, inputs)
+
+    def test_old_format_ignored(self, tmp_path, games, output):
+        path = tmp_path / "m.json"
+        path.write_text('{"format": 1, "outputs": {"out.ics": {}}}')
+        assert not BuildManifest.load(path).is_current(output, {})
+
+    def test_corrupt_manifest_ignored(self, tmp_path, output):
+        path = tmp_path / "m.json"
+        path.write_text("{not json")
+        assert not BuildManifest.load(path).is_current(output, {})
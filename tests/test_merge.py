@@ -0,0 +1,139 @@
+"""
+Tests for merge.py — the merged club calendar.
+"""
+
+from __future__ import annotations
+
+import io
+from dataclasses import replace
+from datetime import date, datetime, time, timezone
+
+import pytest
+
+from conftest import make_league, make_match
+from ggbowlscalendar.calendar import iter_event_data
+from ggbowlscalendar.ics_writer import write_calendar
+from ggbowlscalendar.merge import (
+    MergeSource,
+    at_venue,
+    home_only,
+    merge_events,
+    write_merged,
+)
+from ggbowlscalendar.models import TBD, VENUE_AWAY, VENUE_HOME
+
+DTSTAMP = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def sources() -> list[MergeSource]:
+    vets = replace(make_league([
+        make_match(venue=VENUE_HOME, match_date=date(2024, 5, 14)),
+        # moved back a week, so out of order in the file
+        make_match(venue=VENUE_AWAY, match_date=date(2024, 5, 21), rescheduled_date=date(2024, 6, 4)),
+        make_match(venue=VENUE_HOME, match_date=date(2024, 5, 28)),
+        make_match(venue=VENUE_HOME, match_date=date(2024, 6, 11), rescheduled_date=TBD),
+    ]), my_team_id="MYTEAM")
+    ladies = replace(make_league([
+        make_match(venue=VENUE_AWAY, match_date=date(2024, 5, 15)),
+        make_match(venue=VENUE_HOME, match_date=date(2024, 5, 28), neutral_venue_id="NEUTRAL"),
+    ]), my_team_id="OPP1")
+    return [MergeSource("Vets", vets), MergeSource("Ladies", ladies)]
+
+
+def merged_bytes(sources, registry, event_filters=(None,)) -> list[bytes]:
+    buffers = [io.BytesIO() for _ in event_filters]
+    write_merged(merge_events(sources, registry, DTSTAMP), list(zip(buffers, event_filters)))
+    return [buf.getvalue() for buf in buffers]
+
+
+# ===========================================================================
+# merge_events
+# ===========================================================================
+
+class TestMergeEvents:
+
+    def test_start_order_across_sources(self, sources, registry):
+        starts = [event.data.start for event in merge_events(sources, registry, DTSTAMP)]
+        assert starts == sorted(starts)
+        assert len(starts) == 5  # the TBD match is skipped
+
+    def test_ties_keep_source_order(self, sources, registry):
+        events = [e for e in merge_events(sources, registry, DTSTAMP) if e.match.date == date(2024, 5, 28)]
+        assert [e.source.prefix for e in events] == ["Vets", "Ladies"]
+
+    def test_summary_prefixed(self, sources, registry):
+        first = next(iter(merge_events(sources, registry, DTSTAMP)))
+        assert first.data.summary == "Vets: My Bowls Club v (Opponents FC)"
+
+    def test_uids_are_per_team(self, sources, registry):
+        uids = [e.data.uid for e in merge_events(sources, registry, DTSTAMP)]
+        assert len(set(uids)) == len(uids)
+        expected = {d.uid for s in sources for d in iter_event_data(s.league, registry, DTSTAMP)}
+        assert set(uids) == expected
+
+    def test_source_dtstamp_wins(self, sources, registry):
+        own = datetime(2023, 6, 1, tzinfo=timezone.utc)
+        sources[1] = replace(sources[1], dtstamp=own)
+        stamps = {e.source.prefix: e.data.dtstamp for e in merge_events(sources, registry, DTSTAMP)}
+        assert stamps == {"Vets": DTSTAMP, "Ladies": own}
+
+    def test_source_registry_wins(self, sources, registry):
+        own = registry.overlay({"teams": {"OPP1": {"name": "Renamed", "location": "Elsewhere"}}})
+        sources[0] = replace(sources[0], registry=own)
+        first = next(iter(merge_events(sources, registry, DTSTAMP)))
+        assert first.data.summary == "Vets: My Bowls Club v (Renamed)"
+
+    def test_no_sources(self, registry):
+        assert list(merge_events([], registry, DTSTAMP)) == []
+
+
+# ===========================================================================
+# write_merged
+# ===========================================================================
+
+class TestWriteMerged:
+
+    def test_same_bytes_as_one_calendar_of_the_merged_events(self, sources, registry):
+        events = [e.data for e in merge_events(sources, registry, DTSTAMP)]
+        expected = io.BytesIO()
+        write_calendar(expected, events)
+        assert merged_bytes(sources, registry) == [expected.getvalue()]
+
+    def test_variants_written_in_one_pass(self, sources, registry):
+        consumed = []
+
+        def once():
+            for event in merge_events(sources, registry, DTSTAMP):
+                consumed.append(event)
+                yield event
+
+        buffers = [io.BytesIO(), io.BytesIO(), io.BytesIO()]
+        counts = write_merged(once(), [
+            (buffers[0], None),
+            (buffers[1], home_only),
+            (buffers[2], at_venue("Neutral Ground, Village")),
+        ])
+        assert counts == [5, 2, 1]
+        assert len(consumed) == 5
+        assert all(buf.getvalue().endswith(b"END:VCALENDAR\r\n") for buf in buffers)
+
+    def test_home_only_excludes_neutral_venues(self, sources, registry):
+        home = [e for e in merge_events(sources, registry, DTSTAMP) if home_only(e)]
+        assert all(e.match.neutral_venue_id is None and e.match.is_home for e in home)
+
+    def test_at_venue(self, sources, registry):
+        ics = merged_bytes(sources, registry, [at_venue("My Ground, Town")])[0]
+        assert ics.count(b"BEGIN:VEVENT") == 2
+        assert b"Ladies" not in ics
+
+    def test_empty_variant_is_a_valid_calendar(self, sources, registry):
+        ics = merged_bytes(sources, registry, [at_venue("Nowhere")])[0]
+        assert ics.startswith(b"BEGIN:VCALENDAR")
+        assert b"BEGIN:VEVENT" not in ics
+
+    def test_start_times_ordered_in_output(self, sources, registry):
+        ics = merged_bytes(sources, registry)[0].decode()
+        starts = [line for line in ics.split("\r\n") if line.startswith("DTSTART")]
+        assert starts == sorted(starts)
+        assert starts[0] == f"DTSTART:{datetime.combine(date(2024, 5, 14), time(17, 50)):%Y%m%dT%H%M%S}"
@@ -4,6 +4,8 @@ Tests for models.py — _parse_time, Team, TeamRegistry, Match, League.
 
 from __future__ import annotations
 
+import pickle
+from dataclasses import FrozenInstanceError, replace
 from datetime import date, datetime, time
 
 import pytest
@@ -89,6 +91,87 @@ class TestTeamRegistry:
         assert reg.get("A").name == "Team A"
         assert reg.get("B").name == "Team B"
 
+    def test_placeholder_is_memoized(self, registry):
+        assert registry.get("UNKNOWN") is registry.get("UNKNOWN")
+
+    def test_club_prefix_without_clubcomp_is_unknown(self):
+        reg = TeamRegistry.from_dict({"A": {"name": "Team A", "location": "Loc A"}})
+        assert reg.get("ClubPairs").name == "***ClubPairs***"
+        assert reg.unknown_ids == ["ClubPairs"]
+
+    def test_unknown_ids_recorded_once_in_order(self, registry):
+        for team_id in ("NOPE2", "OPP1", "NOPE1", "NOPE2", "ClubSingles"):
+            registry.get(team_id)
+        assert registry.unknown_ids == ["NOPE2", "NOPE1"]
+
+    def test_get_many(self, registry):
+        ids = ["OPP1", "UNKNOWN", "ClubSingles", "OPP1", "UNKNOWN"]
+        teams = registry.get_many(ids)
+        assert teams == [registry.get(team_id) for team_id in ids]
+        assert teams[1] is teams[4]
+        assert registry.unknown_ids == ["UNKNOWN"]
+
+    def test_ids_are_interned(self, registry):
+        team_id = "".join(["OP", "P1"])   # built at run time, so not the literal's object
+        assert registry.get(team_id).team_id is registry.get("OPP1").team_id
+        match = _match_from_dict(
+            {"home": team_id, "date": MATCH_DATE, "our_score": 0, "opp_score": 0}, MATCH_TIME
+        )
+        assert match.opp_id is registry.get("OPP1").team_id
+
+    def test_start_time(self):
+        reg = TeamRegistry.from_dict({
+            "A": {"name": "Team A", "location": "Loc A", "start_time": "14:00"},
+            "B": {"name": "Team B", "location": "Loc B"},
+        })
+        assert reg.get("A").start_time == time(14, 0)
+        assert reg.get("B").start_time is None
+
+    def test_pickles_with_its_lookups(self, registry):
+        registry.get("UNKNOWN")
+        copy = pickle.loads(pickle.dumps(registry))
+        assert copy.get("OPP1") == registry.get("OPP1")
+        assert copy.unknown_ids == ["UNKNOWN"]
+
+
+class TestLayeredRegistry:
+
+    LEAGUE_TEAMS = {
+        "me": "COMP",
+        "start_time": "19:30",
+        "teams": {
+            "COMP": {"name": "Me", "location": "somewhere"},
+            "OPP1": {"name": "Opponents (league)", "location": "Their Ground", "start_time": "13:00"},
+        },
+    }
+
+    def test_nested_teams_shape(self):
+        reg = TeamRegistry.from_dict(self.LEAGUE_TEAMS)
+        assert reg.get("COMP").name == "Me"
+        assert reg.get("OPP1").start_time == time(13, 0)
+        assert reg.get("me").name == "***me***"
+
+    def test_overlay_first(self, registry):
+        overlay = registry.overlay(self.LEAGUE_TEAMS)
+        assert overlay.get("OPP1").name == "Opponents (league)"
+        assert registry.get("OPP1").name == "Opponents FC"
+
+    def test_falls_back_to_parent(self, registry):
+        overlay = registry.overlay(self.LEAGUE_TEAMS)
+        assert overlay.get("NEUTRAL") is registry.get("NEUTRAL")
+        assert overlay.get("ClubSingles") is registry.get("CLUBCOMP")
+
+    def test_overlay_holds_only_its_own_teams(self, registry):
+        overlay = registry.overlay(self.LEAGUE_TEAMS)
+        assert [team.team_id for team in overlay.teams()] == ["COMP", "OPP1"]
+        assert overlay._parent is registry
+
+    def test_unknown_ids_recorded_with_the_root(self, registry):
+        first = registry.overlay(self.LEAGUE_TEAMS)
+        second = registry.overlay({"teams": {}})
+        assert first.get("NOPE") is second.get("NOPE")
+        assert registry.unknown_ids == first.unknown_ids == ["NOPE"]
+
 
 # ===========================================================================
 # Match — is_home / notes
@@ -208,6 +291,40 @@ class TestMatchScheduling:
         assert m.original_datetime() == datetime(2024, 5, 14, 18, 0)
 
 
+# ===========================================================================
+# Immutability and layout
+# ===========================================================================
+
+class TestFrozenModels:
+
+    @pytest.mark.parametrize("obj, attr", [
+        (Team(team_id="T", name="Team", location="Here"), "location"),
+        (make_match(), "our_score"),
+        (make_league(), "dtstamp"),
+    ])
+    def test_slotted_and_frozen(self, obj, attr):
+        assert not hasattr(obj, "__dict__")
+        with pytest.raises(FrozenInstanceError):
+            setattr(obj, attr, None)
+
+    def test_replace_recomputes_derived_values(self):
+        m = replace(make_match(our_score=0, opp_score=0), our_score=10, opp_score=4,
+                    rescheduled_date=date(2024, 6, 1))
+        assert m.result == "W"
+        assert m.scheduled_datetime() == datetime(2024, 6, 1, 18, 0)
+
+    def test_derived_values_ignored_by_equality(self):
+        assert make_match() == make_match()
+        assert "result" not in repr(make_match())
+
+    def test_pickle_round_trip(self):
+        m = make_match(our_score=3, opp_score=9, rescheduled_date=date(2024, 6, 1))
+        restored = pickle.loads(pickle.dumps(make_league([m])))
+        assert restored.matches[0] == m
+        assert restored.matches[0].result == "L"
+        assert restored.matches[0].scheduled_datetime() == m.scheduled_datetime()
+
+
 # ===========================================================================
 # _match_from_dict
 # ===========================================================================
@@ -237,6 +354,10 @@ class TestMatchFromDict:
     def test_per_match_start_time_overrides_default(self):
         assert self._parse({**BASE_DICT, "start_time": "10:00"}).start_time == time(10, 0)
 
+    def test_per_match_start_time_is_fixed(self):
+        assert not self._parse(BASE_DICT).fixed_start
+        assert self._parse({**BASE_DICT, "start_time": "18:00"}).fixed_start
+
     def test_scores_parsed_as_ints(self):
         m = self._parse({**BASE_DICT, "our_score": 5, "opp_score": 3})
         assert isinstance(m.our_score, int)
@@ -313,3 +434,14 @@ class TestLeagueFromDict:
         second = League.from_dict(LEAGUE_DICT).matches[1]
         assert second.played is True
         assert second.result == "W"
+
+    def test_dtstamp_defaults_to_none(self):
+        assert League.from_dict(LEAGUE_DICT).dtstamp is None
+
+    @pytest.mark.parametrize("raw, expected", [
+        (datetime(2024, 1, 1, 12, 0), datetime(2024, 1, 1, 12, 0)),
+        (date(2024, 1, 1), datetime(2024, 1, 1, 0, 0)),
+        ("2024-01-01T12:30:00", datetime(2024, 1, 1, 12, 30)),
+    ])
+    def test_dtstamp_parsed(self, raw, expected):
+        assert League.from_dict({**LEAGUE_DICT, "dtstamp": raw}).dtstamp == expected
@@ -0,0 +1,224 @@
+"""
+Tests for occupancy.py — venue bookings, free/busy and the weekly grid.
+"""
+
+from __future__ import annotations
+
+import io
+import random
+from dataclasses import replace
+from datetime import date, datetime, time, timedelta, timezone
+from unittest.mock import patch
+
+import pytest
+
+from conftest import make_league, make_match, _FakeConsole, _FakeTable
+from ggbowlscalendar.clashes import Booking, league_bookings
+from ggbowlscalendar.models import VENUE_AWAY, VENUE_HOME, League, TeamRegistry
+from ggbowlscalendar.occupancy import OccupancyIndex, venue_slug, write_freebusy
+from ggbowlscalendar.printer import print_week
+
+MY_GROUND = "My Ground, Town"
+MONDAY = date(2024, 5, 13)
+
+
+def league_for(team_id: str, matches) -> League:
+    return replace(make_league(matches), my_team_id=team_id)
+
+
+def at(day: int, hour: int, minute: int = 0) -> datetime:
+    return datetime.combine(MONDAY + timedelta(days=day), time(hour, minute))
+
+
+@pytest.fixture
+def club_registry() -> TeamRegistry:
+    return TeamRegistry.from_dict({
+        "MYTEAM":  {"name": "My Bowls Club", "location": MY_GROUND},
+        "MYVETS":  {"name": "My Bowls Vets", "location": MY_GROUND},
+        "OPP1":    {"name": "Opponents FC",  "location": "Their Ground, City"},
+        "NEUTRAL": {"name": "Neutral Club",  "location": "Neutral Ground, Village"},
+    })
+
+
+@pytest.fixture
+def index(club_registry) -> OccupancyIndex:
+    return OccupancyIndex.from_leagues([
+        league_for("MYTEAM", [
+            make_match(venue=VENUE_HOME, match_date=MONDAY + timedelta(days=1), start_time=time(18, 0)),
+            make_match(venue=VENUE_AWAY, match_date=MONDAY + timedelta(days=2), start_time=time(18, 0)),
+            make_match(venue=VENUE_HOME, match_date=MONDAY + timedelta(days=8), start_time=time(18, 0)),
+        ]),
+        league_for("MYVETS", [
+            make_match(venue=VENUE_HOME, match_date=MONDAY + timedelta(days=3), start_time=time(14, 0)),
+            make_match(venue=VENUE_HOME, match_date=MONDAY + timedelta(days=1), start_time=time(14, 0),
+                       neutral_venue_id="NEUTRAL"),
+        ]),
+    ], club_registry)
+
+
+# ===========================================================================
+# OccupancyIndex
+# ===========================================================================
+
+class TestOccupancyIndex:
+
+    def test_only_home_matches_indexed(self, index):
+        assert index.venues == [MY_GROUND, "Neutral Ground, Village"]
+        assert index.is_free("Their Ground, City", at(2, 17), at(2, 22))
+
+    def test_from_bookings_keeps_home_matches(self, club_registry):
+        league = league_for("MYTEAM", [
+            make_match(venue=VENUE_HOME, match_date=MONDAY + timedelta(days=1)),
+            make_match(venue=VENUE_AWAY, match_date=MONDAY + timedelta(days=2)),
+        ])
+        index = OccupancyIndex.from_bookings(league_bookings([league], club_registry))
+        assert index.venues == [MY_GROUND]
+        assert len(index.bookings(MY_GROUND, at(0, 0), at(7, 0))) == 1
+
+    def test_team_ids(self, index):
+        assert index.team_ids(MY_GROUND) == ["MYTEAM", "MYVETS"]
+
+    @pytest.mark.parametrize("start, end, free", [
+        (at(1, 12), at(1, 17, 50), True),    # ends as the booking (17:50-21:00) starts
+        (at(1, 12), at(1, 18), False),
+        (at(1, 20), at(1, 23), False),
+        (at(1, 21), at(1, 23), True),        # starts as it ends
+        (at(0, 0), at(7, 0), False),
+        (at(4, 0), at(5, 0), True),
+    ])
+    def test_is_free(self, index, start, end, free):
+        assert index.is_free(MY_GROUND, start, end) is free
+
+    def test_unknown_venue_is_free(self, index):
+        assert index.is_free("Nowhere", at(0, 0), at(7, 0))
+
+    def test_bookings_between(self, index):
+        found = index.bookings(MY_GROUND, at(0, 0), at(7, 0))
+        assert [(b.team_id, b.start.date()) for b in found] == [
+            ("MYTEAM", MONDAY + timedelta(days=1)),
+            ("MYVETS", MONDAY + timedelta(days=3)),
+        ]
+
+    def test_bookings_unknown_venue(self, index):
+        with pytest.raises(KeyError, match="Nowhere"):
+            index.bookings("Nowhere", at(0, 0), at(7, 0))
+
+    def test_long_booking_found_after_shorter_ones(self):
+        # A long booking that starts first must still be found past later, shorter ones
+        long = Booking("V", at(0, 9), at(0, 22), "A", make_match(), (("A", None), ("X", None), MONDAY))
+        short = [
+            Booking("V", at(0, h), at(0, h, 30), "B", make_match(), (("B", None), ("X", None), MONDAY))
+            for h in (10, 12, 14)
+        ]
+        index = OccupancyIndex([long, *short])
+        assert not index.is_free("V", at(0, 18), at(0, 19))
+        assert index.bookings("V", at(0, 18), at(0, 19)) == [long]
+
+    def test_agrees_with_linear_scan(self):
+        rng = random.Random(3)
+        bookings = []
+        for i in range(300):
+            start = at(rng.randrange(60), rng.randrange(9, 20))
+            bookings.append(Booking(
+                "V", start, start + timedelta(minutes=rng.choice((60, 180, 600))), f"T{i}",
+                make_match(), ((f"T{i}", None), ("X", None), start.date()),
+            ))
+        index = OccupancyIndex(bookings)
+        for _ in range(200):
+            start = at(rng.randrange(60), rng.randrange(24))
+            end = start + timedelta(minutes=rng.choice((30, 120, 720)))
+            expected = [b for b in bookings if b.start < end and start < b.end]
+            assert index.is_free("V", start, end) is (not expected)
+            assert sorted(map(id, index.bookings("V", start, end))) == sorted(map(id, expected))
+
+    def test_busy_merges_overlapping_and_touching(self):
+        def booking(start, end):
+            return Booking("V", start, end, "A", make_match(), (("A", None), ("X", None), start.date()))
+        index = OccupancyIndex([
+            booking(at(0, 10), at(0, 12)),
+            booking(at(0, 11), at(0, 13)),
+            booking(at(0, 13), at(0, 14)),
+            booking(at(1, 10), at(1, 11)),
+        ])
+        assert index.busy("V") == [(at(0, 10), at(0, 14)), (at(1, 10), at(1, 11))]
+
+    def test_week(self, index):
+        grid = index.week(MONDAY)
+        assert [len(day) for day in grid[MY_GROUND]] == [0, 1, 0, 1, 0, 0, 0]
+        assert [len(day) for day in grid["Neutral Ground, Village"]] == [0, 1, 0, 0, 0, 0, 0]
+        assert [len(day) for day in index.week(MONDAY + timedelta(days=7))[MY_GROUND]] == [0, 1, 0, 0, 0, 0, 0]
+
+
+# ===========================================================================
+# write_freebusy
+# ===========================================================================
+
+class TestWriteFreebusy:
+
+    def freebusy(self, index, venue=MY_GROUND, **kwargs) -> str:
+        buf = io.BytesIO()
+        write_freebusy(buf, venue, index.busy(venue), datetime(2024, 1, 1, tzinfo=timezone.utc), **kwargs)
+        return buf.getvalue().decode()
+
+    def test_periods_in_utc(self, index):
+        ics = self.freebusy(index)
+        # 17:50 BST is 16:50 UTC
+        assert "FREEBUSY;FBTYPE=BUSY:20240514T165000Z/20240514T200000Z\r\n" in ics
+        assert ics.count("FREEBUSY;FBTYPE=BUSY:") == 3
+
+    def test_structure(self, index):
+        lines = self.freebusy(index, comment="MYTEAM, MYVETS").split("\r\n")
+        assert lines[0] == "BEGIN:VCALENDAR"
+        assert lines[-2:] == ["END:VCALENDAR", ""]
+        assert "BEGIN:VFREEBUSY" in lines
+        assert "DTSTAMP:20240101T000000Z" in lines
+        assert "DTSTART:20240514T165000Z" in lines
+        assert "COMMENT:My Ground\\, Town" in lines
+        assert "COMMENT:MYTEAM\\, MYVETS" in lines
+        assert f"UID:freebusy-{venue_slug(MY_GROUND)}@mc-williams.co.uk" in lines
+
+    def test_winter_time(self):
+        start = datetime(2024, 1, 9, 18, 0)
+        buf = io.BytesIO()
+        write_freebusy(buf, "V", [(start, start + timedelta(hours=2))], datetime(2024, 1, 1, tzinfo=timezone.utc))
+        assert b"FREEBUSY;FBTYPE=BUSY:20240109T180000Z/20240109T200000Z" in buf.getvalue()
+
+    def test_slug(self):
+        assert venue_slug("My Ground, Town") == "my-ground-town"
+
+
+# ===========================================================================
+# print_week
+# ===========================================================================
+
+class TestPrintWeek:
+
+    def test_grid(self, index, club_registry):
+        console, table = _FakeConsole(), _FakeTable()
+        with patch("ggbowlscalendar.printer.Console", return_value=console), \
+             patch("ggbowlscalendar.printer.Table", return_value=table):
+            print_week(index, MONDAY, club_registry)
+        assert table.columns[0] == "Venue"
+        assert table.columns[1] == "Mon 13-May"
+        assert [row[0] for row in table.rows] == ["My Ground", "Neutral Ground"]
+        assert table.rows[0][2] == "18:00 My Bowls Club"
+        assert table.rows[0][4] == "14:00 My Bowls Vets"
+
+    def test_resolved_start_shown(self, club_registry):
+        own = club_registry.overlay({"teams": {"MYTEAM": {
+            "name": "My Bowls Club", "location": MY_GROUND, "start_time": "14:00",
+        }}})
+        league = league_for("MYTEAM", [
+            make_match(venue=VENUE_HOME, match_date=MONDAY + timedelta(days=1), start_time=time(10, 0)),
+        ])
+        console, table = _FakeConsole(), _FakeTable()
+        with patch("ggbowlscalendar.printer.Console", return_value=console), \
+             patch("ggbowlscalendar.printer.Table", return_value=table):
+            print_week(OccupancyIndex.from_leagues([league], own), MONDAY, own)
+        assert table.rows[0][2] == "14:00 My Bowls Club"
+
+    def test_empty_week(self, index, club_registry):
+        console = _FakeConsole()
+        with patch("ggbowlscalendar.printer.Console", return_value=console):
+            print_week(index, MONDAY - timedelta(days=70), club_registry)
+        assert any("No bookings" in str(p) for p in console.printed)
@@ -252,6 +252,65 @@ class TestFindDataFile:
             assert utils.find_data_file("myclub_games_2024.yml", subfolder="myclub") == target
 
 
+class TestFindGamesFiles:
+
+    def _find(self, base, year="*"):
+        from ggbowlscalendar import utils
+        with patch("ggbowlscalendar.utils.env") as mock_env:
+            mock_env.read_envfile = lambda: None
+            mock_env.str = lambda k: str(base)
+            return [df.path for df in utils.find_games_files(year)]
+
+    def test_finds_both_layouts(self, tmp_path):
+        (tmp_path / "2026").mkdir()
+        (tmp_path / "stcolmans").mkdir()
+        a = tmp_path / "2026" / "fallsvets1_games_2026.yml"
+        b = tmp_path / "stcolmans" / "stcolmans_games_2024-25.yml"
+        a.touch()
+        b.touch()
+        assert self._find(tmp_path) == sorted([a, b])
+
+    def test_year_filters_files(self, tmp_path):
+        (tmp_path / "2026").mkdir()
+        wanted = tmp_path / "2026" / "fallsvets1_games_2026.yml"
+        wanted.touch()
+        (tmp_path / "2026" / "fallsvets1_games_2025.yml").touch()
+        assert self._find(tmp_path, "2026") == [wanted]
+
+    def test_teams_file_not_matched(self, tmp_path):
+        (tmp_path / "teams.yml").touch()
+        assert self._find(tmp_path) == []
+
+    def test_matches_naming_included(self, tmp_path):
+        (tmp_path / "competitions").mkdir()
+        f = tmp_path / "competitions" / "competitions_matches_2019-20.yml"
+        f.touch()
+        assert self._find(tmp_path, "2019-20") == [f]
+
+
+class TestLoadGamesData:
+
+    def test_loads_file_from_club_folder(self, tmp_path):
+        from ggbowlscalendar import utils
+        (tmp_path / "stcolmans").mkdir()
+        (tmp_path / "stcolmans" / "stcolmans_games_2024-25.yml").write_text("me: STCOL\n")
+        with patch("ggbowlscalendar.utils.env") as mock_env:
+            mock_env.read_envfile = lambda: None
+            mock_env.str = lambda k: str(tmp_path)
+            assert utils.load_games_data("stcolmans", "2024-25") == {"me": "STCOL"}
+
+    def test_env_read_once(self, tmp_path):
+        from ggbowlscalendar import utils
+        (tmp_path / "teams.yml").touch()
+        calls = []
+        with patch("ggbowlscalendar.utils.env") as mock_env:
+            mock_env.read_envfile = lambda: calls.append(1)
+            mock_env.str = lambda k: str(tmp_path)
+            utils.find_data_file("teams.yml")
+            utils.find_data_file("teams.yml")
+        assert len(calls) == 1
+
+
 class TestLoadYaml:
 
     def test_parses_yaml_file(self, tmp_path):
@@ -262,6 +321,52 @@ class TestLoadYaml:
         assert result["key"] == "value"
         assert result["number"] == 42
 
+    def test_prefers_c_loader_when_available(self):
+        import yaml
+        from ggbowlscalendar import utils
+        assert utils.YAML_LOADER is getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+    def test_loaders_type_dates_and_times_identically(self, tmp_path):
+        import yaml
+        from ggbowlscalendar import utils
+        f = tmp_path / "games.yml"
+        f.write_text("date: 2024-05-14\nnewdate: tbd\nstart_time: '18:00'\nstamp: 2024-05-14 18:00:00\n")
+        fast = utils._parse_yaml(f, utils.YAML_LOADER)
+        slow = utils._parse_yaml(f, yaml.SafeLoader)
+        assert fast == slow
+        assert {k: type(v) for k, v in fast.items()} == {k: type(v) for k, v in slow.items()}
+        assert fast["date"] == date(2024, 5, 14)
+
+
+class TestLeagueRegistry:
+
+    @pytest.fixture
+    def games_path(self, tmp_path) -> Path:
+        (tmp_path / "comps_teams.yml").write_text(
+            "me: COMP\nteams:\n  COMP:\n    name: Me\n    location: somewhere\n"
+        )
+        return tmp_path / "comps_games_2025-26.yml"
+
+    def test_overlays_the_league_teams(self, registry, games_path):
+        from ggbowlscalendar import utils
+        overlay = utils.league_registry(registry, games_path)
+        assert overlay.get("COMP").name == "Me"
+        assert overlay.get("OPP1") is registry.get("OPP1")
+
+    def test_no_teams_file(self, registry, tmp_path):
+        from ggbowlscalendar import utils
+        assert utils.league_registry(registry, tmp_path / "other_games_2026.yml") is registry
+
+    def test_kept_until_the_file_changes(self, registry, games_path):
+        from ggbowlscalendar import utils
+        overlay = utils.league_registry(registry, games_path)
+        assert utils.league_registry(registry, games_path) is overlay
+        assert utils.league_registry(overlay, games_path) is overlay   # not layered twice
+        teams_path = games_path.with_name("comps_teams.yml")
+        teams_path.write_text("teams:\n  COMP:\n    name: Renamed\n    location: somewhere\n")
+        os.utime(teams_path, ns=(0, 0))
+        assert utils.league_registry(registry, games_path).get("COMP").name == "Renamed"
+
 
 class TestWriteIcalFile:
 
@@ -273,3 +378,20 @@ class TestWriteIcalFile:
         written = tmp_path / "Apps" / "icalendar" / "test.ics"
         assert written.exists()
         assert written.read_bytes() == content
+
+    def test_identical_content_not_rewritten(self, tmp_path):
+        from ggbowlscalendar import utils
+        content = b"BEGIN:VCALENDAR\nEND:VCALENDAR"
+        with patch.dict("os.environ", {"ICAL_OUTPUT": str(tmp_path)}):
+            assert utils.write_ical_file("test.ics", content) is True
+            written = tmp_path / "Apps" / "icalendar" / "test.ics"
+            os.utime(written, ns=(0, 0))
+            assert utils.write_ical_file("test.ics", content) is False
+        assert written.stat().st_mtime_ns == 0
+
+    def test_changed_content_rewritten(self, tmp_path):
+        from ggbowlscalendar import utils
+        with patch.dict("os.environ", {"ICAL_OUTPUT": str(tmp_path)}):
+            utils.write_ical_file("test.ics", b"one")
+            assert utils.write_ical_file("test.ics", b"two") is True
+        assert (tmp_path / "Apps" / "icalendar" / "test.ics").read_bytes() == b"two"
@@ -0,0 +1,156 @@
+"""
+Tests for repository.py — the data-tree index.
+"""
+
+from __future__ import annotations
+
+import os
+
+import pytest
+
+from pathlib import Path
+
+from ggbowlscalendar.repository import KIND_GAMES, KIND_MATCHES, DataRepository, league_teams_path
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    layout = [
+        "teams.yml",
+        "2026/fallsvets1_games_2026.yml",
+        "2026/fallsvets2_games_2026.yml",
+        "fallsindoor/fallsindoor_games_2024-25.yml",
+        "competitions/competitions_matches_2019-20.yml",
+        "competitions/competitions_teams.yml",
+        ".git/ignored_games_2026.yml",
+    ]
+    for rel in layout:
+        path = tmp_path / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.touch()
+    return tmp_path
+
+
+# ===========================================================================
+# Lookup
+# ===========================================================================
+
+class TestDataRepositoryLookup:
+
+    def test_per_year_layout(self, data_dir):
+        repo = DataRepository.scan(data_dir)
+        assert repo.get("fallsvets1", 2026).path == data_dir / "2026" / "fallsvets1_games_2026.yml"
+
+    def test_per_club_layout(self, data_dir):
+        repo = DataRepository.scan(data_dir)
+        assert repo.get("fallsindoor", "2024-25").path.parent.name == "fallsindoor"
+
+    def test_matches_naming(self, data_dir):
+        df = DataRepository.scan(data_dir).get("competitions", "2019-20")
+        assert df.kind == KIND_MATCHES
+
+    def test_missing_team_raises(self, data_dir):
+        with pytest.raises(FileNotFoundError):
+            DataRepository.scan(data_dir).get("nobody", "2026")
+
+    def test_find_plain_file(self, data_dir):
+        assert DataRepository.scan(data_dir).find("teams.yml") == data_dir / "teams.yml"
+
+    def test_find_in_subfolder(self, data_dir):
+        repo = DataRepository.scan(data_dir)
+        assert repo.find("competitions_teams.yml", "competitions").exists()
+
+    def test_find_missing_raises(self, data_dir):
+        with pytest.raises(FileNotFoundError):
+            DataRepository.scan(data_dir).find("nope.yml")
+
+    def test_hidden_directories_skipped(self, data_dir):
+        assert "ignored" not in DataRepository.scan(data_dir).teams()
+
+    def test_games_preferred_over_matches(self, data_dir):
+        (data_dir / "competitions" / "competitions_games_2019-20.yml").touch()
+        assert DataRepository.scan(data_dir).get("competitions", "2019-20").kind == KIND_GAMES
+
+
+# ===========================================================================
+# Listing / glob
+# ===========================================================================
+
+class TestDataRepositoryQueries:
+
+    def test_list_files_by_season(self, data_dir):
+        teams = [df.team for df in DataRepository.scan(data_dir).list_files(season="2026")]
+        assert teams == ["fallsvets1", "fallsvets2"]
+
+    def test_glob_team_pattern(self, data_dir):
+        teams = [df.team for df in DataRepository.scan(data_dir).glob(team="falls*")]
+        assert teams == ["fallsindoor", "fallsvets1", "fallsvets2"]
+
+    def test_glob_season_pattern(self, data_dir):
+        seasons = [df.season for df in DataRepository.scan(data_dir).glob(season="20??-*")]
+        assert seasons == ["2019-20", "2024-25"]
+
+    def test_seasons_for_team(self, data_dir):
+        assert DataRepository.scan(data_dir).seasons("fallsvets1") == ["2026"]
+
+
+# ===========================================================================
+# Persisted index
+# ===========================================================================
+
+class TestPersistedIndex:
+
+    def test_index_reused_when_tree_unchanged(self, data_dir, tmp_path_factory):
+        index = tmp_path_factory.mktemp("idx") / "index.json"
+        DataRepository.load(data_dir, index)
+        # A file created without touching its directory's mtime is invisible
+        # to a trusted index — proving the tree was not re-scanned.
+        sub = data_dir / "2026"
+        st = sub.stat()
+        (sub / "ghost_games_2026.yml").touch()
+        os.utime(sub, ns=(st.st_atime_ns, st.st_mtime_ns))
+        assert "ghost" not in DataRepository.load(data_dir, index).teams()
+
+    def test_index_rebuilt_when_directory_changes(self, data_dir, tmp_path_factory):
+        index = tmp_path_factory.mktemp("idx") / "index.json"
+        DataRepository.load(data_dir, index)
+        sub = data_dir / "2026"
+        (sub / "newteam_games_2026.yml").touch()
+        st = sub.stat()
+        os.utime(sub, ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+        assert "newteam" in DataRepository.load(data_dir, index).teams()
+
+    def test_refresh_picks_up_new_files(self, data_dir):
+        repo = DataRepository.scan(data_dir)
+        (data_dir / "2026" / "later_games_2026.yml").touch()
+        repo.refresh()
+        assert repo.get("later", "2026")
+
+    def test_is_current_until_a_directory_changes(self, data_dir):
+        repo = DataRepository.scan(data_dir)
+        assert repo.is_current()
+        sub = data_dir / "2026"
+        (sub / "later_games_2026.yml").touch()
+        st = sub.stat()
+        os.utime(sub, ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+        assert not repo.is_current()
+        repo.refresh()
+        assert repo.is_current()
+
+
+# ===========================================================================
+# League teams files
+# ===========================================================================
+
+class TestLeagueTeamsPath:
+
+    @pytest.mark.parametrize("games, teams", [
+        ("competitions/competitions_games_2025-26.yml", "competitions/competitions_teams.yml"),
+        ("competitions/competitions_matches_2019-20.yml", "competitions/competitions_teams.yml"),
+        ("2026/fallsvets1_games_2026.yml", "2026/fallsvets1_teams.yml"),
+    ])
+    def test_next_to_the_games_file(self, games, teams):
+        assert league_teams_path(Path(games)) == Path(teams)
+
+    def test_not_a_games_file(self):
+        assert league_teams_path(Path("teams.yml")) is None
@@ -0,0 +1,217 @@
+"""
+Tests for resolve.py — the per-match records shared by every output.
+"""
+
+from __future__ import annotations
+
+from dataclasses import FrozenInstanceError, replace
+from datetime import date, datetime, time
+from unittest.mock import patch
+
+import pytest
+
+from conftest import make_league, make_match
+from ggbowlscalendar.calendar import CALENDAR_DOMAIN, iter_event_data
+from ggbowlscalendar.models import TBD, VENUE_AWAY, VENUE_HOME, TeamRegistry
+from ggbowlscalendar.printer import _build_table
+from ggbowlscalendar.resolve import _calendar_uid, _resolve_location, _resolve_opp_name, resolve_match
+
+
+# ===========================================================================
+# resolve_match
+# ===========================================================================
+
+class TestResolveMatch:
+
+    def test_home_match(self, registry):
+        match = make_match(venue=VENUE_HOME, our_score=21, opp_score=15, sub_team="2")
+        record = resolve_match(match, make_league([match]), registry)
+        assert record.match is match
+        assert record.opp.team_id == "OPP1"
+        assert record.opp_name == "Opponents FC 2"
+        assert record.location == "My Ground, Town"
+        assert record.scheduled == datetime(2024, 5, 14, 18, 0)
+        assert record.uid == _calendar_uid(match, "MYTEAM")
+        assert (record.result, record.our_score, record.opp_score) == ("W", "21", "15")
+
+    def test_away_at_neutral_venue(self, registry):
+        match = make_match(venue=VENUE_AWAY, neutral_venue_id="NEUTRAL")
+        assert resolve_match(match, make_league([match]), registry).location == "Neutral Ground, Village"
+
+    def test_rescheduled(self, registry):
+        match = make_match(rescheduled_date=date(2024, 6, 4), rescheduled_time=time(14, 0))
+        record = resolve_match(match, make_league([match]), registry)
+        assert record.scheduled == datetime(2024, 6, 4, 14, 0)
+        assert record.uid == _calendar_uid(make_match(), "MYTEAM")   # still the original date
+
+    def test_tbd_and_unplayed(self, registry):
+        match = make_match(rescheduled_date=TBD)
+        record = resolve_match(match, make_league([match]), registry)
+        assert record.scheduled is None
+        assert (record.result, record.our_score, record.opp_score) == (" ", "", "")
+
+    def test_unknown_opponent(self, registry):
+        match = make_match(venue=VENUE_AWAY, opp_id="NOBODY")
+        record = resolve_match(match, make_league([match]), registry)
+        assert record.opp.name == "***NOBODY***"
+        assert record.opp_name == "NOBODY"
+        assert record.location == "TBD"
+
+    def test_immutable(self, registry):
+        record = resolve_match(make_match(), make_league(), registry)
+        with pytest.raises(FrozenInstanceError):
+            record.location = "elsewhere"
+
+
+class TestTeamStartTime:
+
+    @pytest.fixture
+    def timed_registry(self, registry):
+        return registry.overlay({"teams": {
+            "MYTEAM": {"name": "My Bowls Club", "location": "My Ground, Town", "start_time": "19:30"},
+            "OPP1": {"name": "Opponents FC", "location": "Their Ground, City", "start_time": "14:00"},
+        }})
+
+    @pytest.mark.parametrize("venue, expected", [(VENUE_AWAY, time(14, 0)), (VENUE_HOME, time(19, 30))])
+    def test_home_team_start_time(self, timed_registry, venue, expected):
+        match = make_match(venue=venue)
+        record = resolve_match(match, make_league([match]), timed_registry)
+        assert record.scheduled == datetime.combine(match.date, expected)
+        assert record.uid == _calendar_uid(match, "MYTEAM")   # still from the original time
+
+    def test_match_start_time_wins(self, timed_registry):
+        match = replace(make_match(venue=VENUE_AWAY, start_time=time(11, 0)), fixed_start=True)
+        assert resolve_match(match, make_league([match]), timed_registry).scheduled.time() == time(11, 0)
+
+    def test_newtime_wins(self, timed_registry):
+        match = make_match(venue=VENUE_AWAY, rescheduled_time=time(16, 0))
+        assert resolve_match(match, make_league([match]), timed_registry).scheduled.time() == time(16, 0)
+
+    def test_tbd(self, timed_registry):
+        match = make_match(venue=VENUE_AWAY, rescheduled_date=TBD)
+        assert resolve_match(match, make_league([match]), timed_registry).scheduled is None
+
+    def test_calendar_and_table_use_it(self, timed_registry):
+        league = make_league([make_match(venue=VENUE_AWAY)])
+        (event,) = iter_event_data(league, timed_registry)
+        assert event.start == datetime(2024, 5, 14, 13, 50)
+        row = _build_table(league, timed_registry).rows[0]
+        assert row[5].endswith("14:00")
+
+
+# ===========================================================================
+# League.resolve
+# ===========================================================================
+
+class TestLeagueResolve:
+
+    @pytest.fixture
+    def league(self):
+        return make_league([
+            make_match(match_date=date(2024, 5, 14)),
+            make_match(match_date=date(2024, 5, 21), rescheduled_date=TBD),
+            make_match(match_date=date(2024, 5, 28), venue=VENUE_AWAY),
+        ])
+
+    def test_match_order(self, league, registry):
+        assert [r.match for r in league.resolve(registry)] == league.matches
+
+    def test_kept_for_the_same_registry(self, league, registry):
+        assert league.resolve(registry) is league.resolve(registry)
+
+    def test_redone_for_another_registry(self, league, registry):
+        first = league.resolve(registry)
+        other = TeamRegistry.from_dict({"OPP1": {"name": "Renamed", "location": "New Ground"}})
+        assert league.resolve(other) is not first
+        assert league.resolve(other)[2].location == "New Ground"
+
+    def test_not_part_of_equality_or_copies(self, league, registry):
+        league.resolve(registry)
+        assert league == replace(league)
+        assert replace(league, matches=league.matches[:1]).resolve(registry)[0].match is league.matches[0]
+        assert "_resolved" not in repr(league)
+
+    def test_table_and_calendar_share_one_pass(self, league, registry):
+        with patch.object(registry, "get", wraps=registry.get) as get, \
+             patch.object(registry, "get_many", wraps=registry.get_many) as get_many:
+            _build_table(league, registry)
+            list(iter_event_data(league, registry))
+        assert get_many.call_count == 1   # every opponent, in one call
+        assert not [call for call in get.call_args_list if call.args[0] == "OPP1"]
+
+
+# ===========================================================================
+# _resolve_opp_name
+# ===========================================================================
+
+class TestResolveOppName:
+
+    def test_normal_team_returned_unchanged(self):
+        assert _resolve_opp_name(make_match(), "Opponents FC") == "Opponents FC"
+
+    def test_stars_stripped_from_unknown_team(self):
+        assert _resolve_opp_name(make_match(), "***UNKNOWN***") == "UNKNOWN"
+
+    def test_club_comp_returns_opp_id(self):
+        m = make_match(opp_id="ClubKnockout")
+        assert _resolve_opp_name(m, "Club Championship") == "ClubKnockout"
+
+    def test_sub_team_appended(self):
+        m = make_match(sub_team="A")
+        assert _resolve_opp_name(m, "Opponents FC") == "Opponents FC A"
+
+    def test_no_sub_team_suffix_when_none(self):
+        assert _resolve_opp_name(make_match(), "Opponents FC") == "Opponents FC"
+
+
+# ===========================================================================
+# _resolve_location
+# ===========================================================================
+
+class TestResolveLocation:
+
+    def test_home_match_uses_my_location(self, registry):
+        m = make_match(venue=VENUE_HOME)
+        assert _resolve_location(m, registry, "My Ground, Town", "Their Ground, City") == "My Ground, Town"
+
+    def test_away_match_uses_opp_location(self, registry):
+        m = make_match(venue=VENUE_AWAY)
+        assert _resolve_location(m, registry, "My Ground, Town", "Their Ground, City") == "Their Ground, City"
+
+    def test_neutral_venue_overrides_both(self, registry):
+        m = make_match(neutral_venue_id="NEUTRAL")
+        assert _resolve_location(m, registry, "My Ground, Town", "Their Ground, City") == "Neutral Ground, Village"
+
+
+# ===========================================================================
+# _calendar_uid
+# ===========================================================================
+
+class TestCalendarUid:
+
+    def test_format(self):
+        m = make_match(match_date=date(2024, 5, 14), start_time=time(18, 0))
+        assert _calendar_uid(m, "MYTEAM") == f"MYTEAM-202405141800@{CALENDAR_DOMAIN}"
+
+    def test_uses_original_date_not_rescheduled(self):
+        m = make_match(
+            match_date=date(2024, 5, 14), start_time=time(18, 0),
+            rescheduled_date=date(2024, 6, 1), rescheduled_time=time(10, 0),
+        )
+        uid = _calendar_uid(m, "MYTEAM")
+        assert "202405141800" in uid
+        assert "202406011000" not in uid
+
+    def test_label_included_without_spaces(self):
+        m = make_match(match_date=date(2024, 5, 14), start_time=time(18, 0), label="Cup Final")
+        assert "CupFinal" in _calendar_uid(m, "MYTEAM")
+
+    def test_spaces_stripped_from_team_id(self):
+        m = make_match(match_date=date(2024, 5, 14), start_time=time(18, 0))
+        uid = _calendar_uid(m, "MY TEAM")
+        assert "MYTEAM-" in uid
+        assert " " not in uid
+
+    def test_ends_with_domain(self):
+        m = make_match(match_date=date(2024, 5, 14), start_time=time(18, 0))
+        assert _calendar_uid(m, "MYTEAM").endswith(f"@{CALENDAR_DOMAIN}")
@@ -0,0 +1,244 @@
+"""
+Tests for seasondb.py — the data tree compiled into an SQLite file.
+"""
+
+from __future__ import annotations
+
+import os
+from datetime import date, datetime, time
+from unittest.mock import patch
+
+import pytest
+
+from ggbowlscalendar.models import TBD, League, TeamRegistry
+from ggbowlscalendar.repository import DataRepository
+from ggbowlscalendar.seasondb import SeasonDB, shared_season_db
+from ggbowlscalendar.utils import load_yaml
+
+TEAMS_YAML = """\
+MYTEAM:
+  name: My Bowls Club
+  location: My Ground, Town
+OPP1:
+  name: Opponents FC
+  location: Their Ground, City
+  start_time: '14:30'
+"""
+
+GAMES_2024 = """\
+me: MYTEAM
+day: Tue
+start_time: '18:00'
+duration: 3
+dtstamp: 2024-01-01 12:00:00
+matches:
+- home: OPP1
+  date: 2024-05-14
+  our_score: 15
+  opp_score: 9
+  team: 2
+- away: OPP1
+  date: 2024-05-21
+  start_time: '19:00'
+  newdate: tbd
+  our_score: 0
+  opp_score: 0
+  label: Cup
+"""
+
+GAMES_2025 = """\
+me: MYTEAM
+day: Tue
+start_time: '18:00'
+duration: 3
+matches:
+- away: OPP1
+  date: 2025-05-13
+  newdate: 2025-05-20
+  newtime: '18:30'
+  location: OPP1
+  our_score: 0
+  opp_score: 0
+"""
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    data = tmp_path / "data"
+    files = {
+        "teams.yml": TEAMS_YAML,
+        "2024/myclub_games_2024.yml": GAMES_2024,
+        "2025/myclub_games_2025.yml": GAMES_2025,
+        "2025/other_games_2025.yml": GAMES_2025.replace("away: OPP1", "home: OPP1"),
+    }
+    for rel, text in files.items():
+        path = data / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text)
+    return data
+
+
+@pytest.fixture
+def db(tmp_path, data_dir):
+    with SeasonDB.open(tmp_path / "seasons.sqlite3") as season_db:
+        season_db.refresh(DataRepository.scan(data_dir))
+        yield season_db
+
+
+def _touch(path) -> None:
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+# ===========================================================================
+# Loaders
+# ===========================================================================
+
+class TestLoaders:
+
+    @pytest.mark.parametrize("team, season", [("myclub", "2024"), ("myclub", "2025"), ("other", "2025")])
+    def test_league_same_as_yaml(self, db, data_dir, team, season):
+        path = DataRepository.scan(data_dir).get(team, season).path
+        assert League.from_db(db, team, season) == League.from_dict(load_yaml(path))
+
+    def test_values_keep_their_types(self, db):
+        league = League.from_db(db, "myclub", 2024)
+        first, second = league.matches
+        assert league.dtstamp == datetime(2024, 1, 1, 12, 0)
+        assert first.sub_team == 2
+        assert second.rescheduled_date == TBD and second.fixed_start and second.label == "Cup"
+        moved = League.from_db(db, "myclub", "2025").matches[0]
+        assert moved.scheduled_datetime() == datetime(2025, 5, 20, 18, 30)
+        assert moved.neutral_venue_id == "OPP1"
+
+    def test_missing_league_raises(self, db):
+        with pytest.raises(KeyError):
+            League.from_db(db, "nobody", "2024")
+
+    def test_registry(self, db):
+        registry = TeamRegistry.from_db(db)
+        assert registry.get("OPP1").start_time == time(14, 30)
+        assert registry.get("MYTEAM").location == "My Ground, Town"
+        assert TeamRegistry.from_db(db) is registry
+
+    def test_registry_with_league_teams(self, tmp_path, data_dir):
+        (data_dir / "2025" / "myclub_teams.yml").write_text(
+            "teams:\n  OPP1:\n    name: Renamed\n    location: Elsewhere\n"
+        )
+        with SeasonDB.open(tmp_path / "seasons.sqlite3") as db:
+            db.refresh(DataRepository.scan(data_dir))
+            assert TeamRegistry.from_db(db, "myclub", "2025").get("OPP1").name == "Renamed"
+            assert TeamRegistry.from_db(db, "myclub", "2025").get("MYTEAM").name == "My Bowls Club"
+            assert TeamRegistry.from_db(db, "myclub", "2024").get("OPP1").name == "Opponents FC"
+
+
+# ===========================================================================
+# Refresh
+# ===========================================================================
+
+class TestRefresh:
+
+    def test_first_refresh_adds_every_file(self, tmp_path, data_dir):
+        with SeasonDB.open(tmp_path / "seasons.sqlite3") as db:
+            stats = db.refresh(DataRepository.scan(data_dir))
+        assert (stats.added, stats.unchanged, stats.invalid) == (4, 0, 0)
+
+    def test_unchanged_files_not_read(self, db, data_dir):
+        with patch("ggbowlscalendar.seasondb.file_digest") as digest:
+            stats = db.refresh(DataRepository.scan(data_dir))
+        assert stats.unchanged == 4 and not stats.changed
+        digest.assert_not_called()
+
+    def test_touched_file_hashed_not_reloaded(self, db, data_dir):
+        _touch(data_dir / "2024" / "myclub_games_2024.yml")
+        with patch("ggbowlscalendar.seasondb.load_yaml") as load:
+            stats = db.refresh(DataRepository.scan(data_dir))
+        assert stats.unchanged == 4
+        load.assert_not_called()
+
+    def test_changed_file_reloaded(self, db, data_dir):
+        path = data_dir / "2024" / "myclub_games_2024.yml"
+        path.write_text(GAMES_2024.replace("our_score: 15", "our_score: 5"))
+        _touch(path)
+        stats = db.refresh(DataRepository.scan(data_dir))
+        assert (stats.updated, stats.unchanged) == (1, 3)
+        assert League.from_db(db, "myclub", "2024").matches[0].our_score == 5
+
+    def test_changed_teams_file_reloaded(self, db, data_dir):
+        registry = TeamRegistry.from_db(db)
+        path = data_dir / "teams.yml"
+        path.write_text(TEAMS_YAML.replace("Opponents FC", "Opponents AFC"))
+        _touch(path)
+        db.refresh(DataRepository.scan(data_dir))
+        assert TeamRegistry.from_db(db) is not registry
+        assert TeamRegistry.from_db(db).get("OPP1").name == "Opponents AFC"
+
+    def test_removed_file_dropped(self, db, data_dir):
+        (data_dir / "2025" / "other_games_2025.yml").unlink()
+        stats = db.refresh(DataRepository.scan(data_dir))
+        assert stats.removed == 1
+        assert db.league("other", "2025") is None
+        assert {m.team for m in db.matches_between(date(2025, 1, 1), date(2026, 1, 1))} == {"myclub"}
+
+    def test_unparsable_file_recorded_once(self, db, data_dir):
+        path = data_dir / "2024" / "broken_games_2024.yml"
+        path.write_text("matches: []\n")
+        stats = db.refresh(DataRepository.scan(data_dir))
+        assert (stats.added, stats.invalid) == (1, 1)
+        assert db.league("broken", "2024") is None
+        assert db.refresh(DataRepository.scan(data_dir)).unchanged == 5
+
+    def test_schema_change_rebuilds(self, tmp_path, data_dir):
+        path = tmp_path / "seasons.sqlite3"
+        with SeasonDB.open(path) as db:
+            db.refresh(DataRepository.scan(data_dir))
+            db.connection.execute("PRAGMA user_version = 0")
+        with SeasonDB.open(path) as db:
+            assert db.refresh(DataRepository.scan(data_dir)).added == 4
+
+    def test_shared_per_process(self, tmp_path):
+        path = tmp_path / "seasons.sqlite3"
+        parent = shared_season_db(path)
+        assert shared_season_db(path) is parent
+        with patch("ggbowlscalendar.seasondb.os.getpid", return_value=-1):   # as in a forked worker
+            assert shared_season_db(path) is not parent
+
+
+# ===========================================================================
+# Queries
+# ===========================================================================
+
+class TestQueries:
+
+    def test_matches_between(self, db):
+        found = db.matches_between(date(2025, 5, 19), date(2025, 5, 26))
+        assert [(m.team, m.season, m.match.effective_date) for m in found] == [
+            ("myclub", "2025", date(2025, 5, 20)),
+            ("other", "2025", date(2025, 5, 20)),
+        ]
+
+    def test_matches_between_team_glob(self, db):
+        found = db.matches_between(date(2025, 1, 1), date(2026, 1, 1), team="my*")
+        assert {m.team for m in found} == {"myclub"}
+
+    def test_end_exclusive_and_tbd_skipped(self, db):
+        assert db.matches_between(date(2024, 5, 1), date(2024, 5, 14)) == []
+        assert len(db.matches_between(date(2024, 5, 1), date(2024, 6, 1))) == 1
+
+    def test_head_to_head_across_seasons(self, db):
+        found = db.head_to_head("OPP1", team="myclub")
+        assert [(m.season, m.my_team_id, m.match.result) for m in found] == [
+            ("2024", "MYTEAM", "W"),
+            ("2025", "MYTEAM", " "),
+        ]
+        assert [m.season for m in db.head_to_head("OPP1", since=date(2025, 1, 1), team="myclub")] == ["2025"]
+
+    def test_queries_use_the_indexes(self, db):
+        plan = db.connection.execute(
+            "EXPLAIN QUERY PLAN SELECT * FROM matches WHERE played_on >= ? AND played_on < ?", ("", "")
+        ).fetchall()
+        assert "matches_played_on" in str(plan)
+        plan = db.connection.execute(
+            "EXPLAIN QUERY PLAN SELECT * FROM matches WHERE opp_id = ? AND played_on >= ?", ("", "")
+        ).fetchall()
+        assert "matches_opp" in str(plan)
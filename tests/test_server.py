@@ -0,0 +1,341 @@
+"""
+Tests for server.py — the HTTP feed server and its render cache.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import gzip
+import os
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from http import HTTPStatus
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from ggbowlscalendar.repository import DataRepository
+from ggbowlscalendar.server import AsyncFeedServer, FeedCache, render_feed, respond
+from ggbowlscalendar.utils import load_yaml
+
+GAMES_YAML = """\
+me: MYTEAM
+day: Tue
+start_time: '18:00'
+duration: 3
+matches:
+- home: OPP1
+  date: 2024-05-14
+  our_score: 0
+  opp_score: 0
+"""
+
+TEAMS_YAML = """\
+MYTEAM:
+  name: My Team
+  location: Home Ground
+OPP1:
+  name: Opponent One
+  location: Away Ground
+"""
+
+
+@pytest.fixture
+def data_dir(tmp_path) -> Path:
+    (tmp_path / "2024").mkdir()
+    (tmp_path / "2024" / "myclub_games_2024.yml").write_text(GAMES_YAML)
+    (tmp_path / "teams.yml").write_text(TEAMS_YAML)
+    return tmp_path
+
+
+@pytest.fixture
+def cache(data_dir) -> FeedCache:
+    return FeedCache(DataRepository.scan(data_dir), data_dir / "teams.yml")
+
+
+def _bump(path: Path, text: str) -> None:
+    """Rewrite *path* and move its mtime forward so the change is always visible."""
+    st = path.stat()
+    path.write_text(text)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+# ===========================================================================
+# FeedCache
+# ===========================================================================
+
+class TestFeedCache:
+
+    def test_renders_calendar(self, cache):
+        feed = cache.get("myclub", "2024")
+        assert feed.body.startswith(b"BEGIN:VCALENDAR")
+        assert b"My Team v (Opponent One)" in feed.body
+
+    def test_unchanged_inputs_are_not_rerendered(self, cache):
+        first = cache.get("myclub", "2024")
+        assert cache.get("myclub", "2024") is first
+        assert cache.renders == 1
+
+    def test_games_change_rerenders(self, cache, data_dir):
+        first = cache.get("myclub", "2024")
+        _bump(data_dir / "2024" / "myclub_games_2024.yml", GAMES_YAML.replace("OPP1", "OPP2"))
+        second = cache.get("myclub", "2024")
+        assert cache.renders == 2
+        assert second.etag != first.etag
+
+    def test_teams_change_rerenders(self, cache, data_dir):
+        first = cache.get("myclub", "2024")
+        _bump(data_dir / "teams.yml", TEAMS_YAML.replace("Opponent One", "Renamed"))
+        second = cache.get("myclub", "2024")
+        assert b"Renamed" in second.body
+        assert second.etag != first.etag
+
+    def test_unrelated_teams_change_keeps_feed(self, cache, data_dir):
+        first = cache.get("myclub", "2024")
+        _bump(data_dir / "teams.yml", TEAMS_YAML + "OTHER:\n  name: Other\n  location: There\n")
+        assert cache.get("myclub", "2024") is first
+        assert cache.renders == 1
+
+    def test_league_teams_change_rerenders(self, cache, data_dir):
+        first = cache.get("myclub", "2024")
+        own_teams = data_dir / "2024" / "myclub_teams.yml"
+        own_teams.write_text("teams:\n  OPP1:\n    name: Overlay\n    location: Away Ground\n")
+        second = cache.get("myclub", "2024")
+        assert b"(Overlay)" in second.body and second.etag != first.etag
+        _bump(own_teams, "teams:\n  OPP1:\n    name: Renamed\n    location: Away Ground\n")
+        third = cache.get("myclub", "2024")
+        assert b"(Renamed)" in third.body and third.etag != second.etag
+        stamp = datetime.fromtimestamp(int(own_teams.stat().st_mtime), timezone.utc)
+        assert f"DTSTAMP:{stamp:%Y%m%dT%H%M%S}Z".encode() in third.body
+
+    def test_unrelated_teams_change_keeps_feed_with_league_teams(self, cache, data_dir):
+        (data_dir / "2024" / "myclub_teams.yml").write_text(
+            "teams:\n  OPP1:\n    name: Overlay\n    location: Away Ground\n"
+        )
+        first = cache.get("myclub", "2024")
+        _bump(data_dir / "teams.yml", TEAMS_YAML + "OTHER:\n  name: Other\n  location: There\n")
+        assert cache.get("myclub", "2024") is first
+
+    def test_etag_stable_across_caches(self, data_dir):
+        def etag() -> str:
+            return FeedCache(DataRepository.scan(data_dir), data_dir / "teams.yml").get(
+                "myclub", "2024").etag
+        assert etag() == etag()
+
+    def test_unknown_feed_raises(self, cache):
+        with pytest.raises(FileNotFoundError):
+            cache.get("nobody", "2024")
+
+    def test_games_file_added_while_running(self, cache, data_dir):
+        (data_dir / "2025").mkdir()
+        (data_dir / "2025" / "myclub_games_2025.yml").write_text(GAMES_YAML.replace("2024-", "2025-"))
+        assert b"DTSTART:20250514" in cache.get("myclub", "2025").body
+
+    def test_unknown_feed_rescans_only_after_a_change(self, cache):
+        with patch.object(cache.repository, "refresh") as refresh:
+            for _ in range(3):
+                with pytest.raises(FileNotFoundError):
+                    cache.get("nobody", "2024")
+        refresh.assert_not_called()
+
+    def test_invalidate_forces_render(self, cache):
+        cache.get("myclub", "2024")
+        cache.invalidate(team="myclub")
+        cache.get("myclub", "2024")
+        assert cache.renders == 2
+
+
+# ===========================================================================
+# respond
+# ===========================================================================
+
+class TestRespond:
+
+    def test_get_returns_calendar(self, cache):
+        response = respond(cache, "GET", "/myclub/2024.ics", {})
+        assert response.status == HTTPStatus.OK
+        assert response.headers["Content-Type"].startswith("text/calendar")
+        assert response.headers["ETag"].startswith('"')
+        assert "Last-Modified" in response.headers
+        assert response.body.startswith(b"BEGIN:VCALENDAR")
+
+    def test_head_has_no_body(self, cache):
+        response = respond(cache, "HEAD", "/myclub/2024.ics", {})
+        assert response.status == HTTPStatus.OK
+        assert response.body == b""
+        assert int(response.headers["Content-Length"]) > 0
+
+    def test_matching_etag_gives_304(self, cache):
+        etag = respond(cache, "GET", "/myclub/2024.ics", {}).headers["ETag"]
+        response = respond(cache, "GET", "/myclub/2024.ics", {"If-None-Match": etag})
+        assert response.status == HTTPStatus.NOT_MODIFIED
+        assert response.body == b""
+        assert response.headers["ETag"] == etag
+
+    def test_stale_etag_gives_200(self, cache):
+        response = respond(cache, "GET", "/myclub/2024.ics", {"If-None-Match": '"stale"'})
+        assert response.status == HTTPStatus.OK
+
+    def test_if_modified_since(self, cache):
+        last_modified = respond(cache, "GET", "/myclub/2024.ics", {}).headers["Last-Modified"]
+        response = respond(cache, "GET", "/myclub/2024.ics", {"If-Modified-Since": last_modified})
+        assert response.status == HTTPStatus.NOT_MODIFIED
+        response = respond(cache, "GET", "/myclub/2024.ics",
+                           {"If-Modified-Since": "Mon, 01 Jan 2001 00:00:00 GMT"})
+        assert response.status == HTTPStatus.OK
+
+    def test_gzip_when_accepted(self, cache):
+        plain = respond(cache, "GET", "/myclub/2024.ics", {})
+        zipped = respond(cache, "GET", "/myclub/2024.ics", {"Accept-Encoding": "gzip, deflate"})
+        assert zipped.headers["Content-Encoding"] == "gzip"
+        assert gzip.decompress(zipped.body) == plain.body
+        assert zipped.headers["ETag"] != plain.headers["ETag"]
+
+    def test_unknown_feed_is_404(self, cache):
+        assert respond(cache, "GET", "/nobody/2024.ics", {}).status == HTTPStatus.NOT_FOUND
+        assert respond(cache, "GET", "/favicon.ico", {}).status == HTTPStatus.NOT_FOUND
+
+    def test_post_not_allowed(self, cache):
+        response = respond(cache, "POST", "/myclub/2024.ics", {})
+        assert response.status == HTTPStatus.METHOD_NOT_ALLOWED
+
+
+# ===========================================================================
+# Single-flight rendering
+# ===========================================================================
+
+def _slow_render(calls: list):
+    """A render_feed stand-in that takes long enough for callers to pile up."""
+    real_render = render_feed
+
+    def _render(*args):
+        calls.append(args)
+        time.sleep(0.2)
+        return real_render(*args)
+    return _render
+
+
+class TestSingleFlight:
+
+    def test_threads_share_one_render(self, cache):
+        calls: list = []
+        with patch("ggbowlscalendar.server.render_feed", _slow_render(calls)):
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                feeds = list(pool.map(lambda _: cache.get("myclub", "2024"), range(8)))
+        assert len(calls) == 1
+        assert cache.renders == 1
+        assert all(feed is feeds[0] for feed in feeds)
+
+    def test_concurrent_requests_share_one_render(self, cache):
+        calls: list = []
+        server = AsyncFeedServer(cache)
+
+        async def burst():
+            return await asyncio.gather(*(server.get("myclub", "2024") for _ in range(20)))
+
+        with patch("ggbowlscalendar.server.render_feed", _slow_render(calls)):
+            feeds = asyncio.run(burst())
+        assert len(calls) == 1
+        assert all(feed is feeds[0] for feed in feeds)
+
+    def test_loop_stays_responsive_during_render(self, cache):
+        calls: list = []
+        server = AsyncFeedServer(cache)
+
+        async def scenario():
+            render = asyncio.ensure_future(server.get("myclub", "2024"))
+            started = time.perf_counter()
+            await asyncio.sleep(0.01)
+            ticked = time.perf_counter() - started
+            await render
+            return ticked
+
+        with patch("ggbowlscalendar.server.render_feed", _slow_render(calls)):
+            assert asyncio.run(scenario()) < 0.15
+
+    def test_teams_change_read_off_the_loop(self, cache, data_dir):
+        server = AsyncFeedServer(cache)
+        first = asyncio.run(server.get("myclub", "2024"))
+        _bump(data_dir / "teams.yml", TEAMS_YAML + "OTHER:\n  name: Other\n  location: There\n")
+        readers = []
+
+        def _load(path):
+            readers.append(threading.current_thread())
+            return load_yaml(path)
+
+        with patch("ggbowlscalendar.server.load_yaml", _load):
+            assert asyncio.run(server.get("myclub", "2024")) is first
+        assert readers and threading.main_thread() not in readers
+        assert cache.renders == 1
+
+    def test_games_file_added_while_running(self, cache, data_dir):
+        server = AsyncFeedServer(cache)
+        (data_dir / "2025").mkdir()
+        (data_dir / "2025" / "myclub_games_2025.yml").write_text(GAMES_YAML.replace("2024-", "2025-"))
+        response = asyncio.run(server.respond("GET", "/myclub/2025.ics", {}))
+        assert response.status == HTTPStatus.OK
+        assert asyncio.run(server.respond("GET", "/nobody/2025.ics", {})).status == HTTPStatus.NOT_FOUND
+
+    def test_failed_render_is_not_cached(self, cache):
+        server = AsyncFeedServer(cache)
+        with patch("ggbowlscalendar.server.render_feed", side_effect=ValueError("bad data")):
+            response = asyncio.run(server.respond("GET", "/myclub/2024.ics", {}))
+        assert response.status == HTTPStatus.INTERNAL_SERVER_ERROR
+        response = asyncio.run(server.respond("GET", "/myclub/2024.ics", {}))
+        assert response.status == HTTPStatus.OK
+
+
+# ===========================================================================
+# HTTP server
+# ===========================================================================
+
+def _fetch(url: str, headers: dict) -> tuple[int, dict, bytes]:
+    request = urllib.request.Request(url, headers=headers)
+    try:
+        with urllib.request.urlopen(request) as resp:
+            return resp.status, dict(resp.headers), resp.read()
+    except urllib.error.HTTPError as exc:
+        return exc.code, dict(exc.headers), b""
+
+
+class TestHttpServer:
+
+    def test_conditional_get_over_http(self, cache):
+        async def scenario():
+            server = await AsyncFeedServer(cache).start("127.0.0.1", 0)
+            url = f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}/myclub/2024.ics"
+            loop = asyncio.get_running_loop()
+            async with server:
+                first = await loop.run_in_executor(None, _fetch, url, {})
+                second = await loop.run_in_executor(
+                    None, _fetch, url, {"If-None-Match": first[1]["ETag"]})
+                missing = await loop.run_in_executor(None, _fetch, url.replace("myclub", "x"), {})
+            return first, second, missing
+
+        first, second, missing = asyncio.run(scenario())
+        assert first[0] == HTTPStatus.OK
+        assert first[2].startswith(b"BEGIN:VCALENDAR")
+        assert second[0] == HTTPStatus.NOT_MODIFIED
+        assert missing[0] == HTTPStatus.NOT_FOUND
+        assert cache.renders == 1
+
+    def test_keep_alive_serves_several_requests(self, cache):
+        async def scenario():
+            server = await AsyncFeedServer(cache).start("127.0.0.1", 0)
+            port = server.sockets[0].getsockname()[1]
+            async with server:
+                reader, writer = await asyncio.open_connection("127.0.0.1", port)
+                request = b"HEAD /myclub/2024.ics HTTP/1.1\r\nHost: x\r\n\r\n"
+                writer.write(request + request)
+                await writer.drain()
+                heads = [await reader.readuntil(b"\r\n\r\n") for _ in range(2)]
+                writer.close()
+            return heads
+
+        heads = asyncio.run(scenario())
+        assert all(head.startswith(b"HTTP/1.1 200 OK") for head in heads)
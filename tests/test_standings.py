@@ -0,0 +1,299 @@
+"""
+Tests for standings.py — league tables from many games files.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import json
+from dataclasses import replace
+from datetime import date
+from unittest.mock import patch
+
+import pytest
+
+from conftest import make_league, make_match, _FakeConsole, _FakeTable
+from ggbowlscalendar.models import VENUE_AWAY, VENUE_HOME, League
+from ggbowlscalendar.printer import print_standings
+from ggbowlscalendar.standings import (
+    Fixture,
+    PointsRules,
+    StandingsEngine,
+    group_divisions,
+    standings_records,
+    write_csv,
+    write_json,
+)
+
+MAY_14, MAY_21, MAY_28 = date(2024, 5, 14), date(2024, 5, 21), date(2024, 5, 28)
+
+
+def league_for(team_id: str, matches) -> League:
+    return replace(make_league(matches), my_team_id=team_id)
+
+
+def rows_by_team(engine: StandingsEngine) -> dict[str, dict]:
+    return {
+        row.team_id if row.sub_team is None else f"{row.team_id} {row.sub_team}": {
+            "played": row.played, "won": row.won, "drawn": row.drawn, "lost": row.lost,
+            "shots_for": row.shots_for, "shots_against": row.shots_against, "points": row.points,
+        }
+        for row in engine.table()
+    }
+
+
+@pytest.fixture
+def team_a() -> League:
+    # MYTEAM: beat OPP1 at home, lost away to TEAMB (a fixture TEAMB's file also reports)
+    return league_for("MYTEAM", [
+        make_match(venue=VENUE_HOME, opp_id="OPP1", match_date=MAY_14, our_score=20, opp_score=10),
+        make_match(venue=VENUE_AWAY, opp_id="TEAMB", match_date=MAY_21, our_score=12, opp_score=15),
+        make_match(venue=VENUE_HOME, opp_id="OPP1", match_date=MAY_28, sub_team="2"),
+    ])
+
+
+@pytest.fixture
+def team_b() -> League:
+    return league_for("TEAMB", [
+        make_match(venue=VENUE_HOME, opp_id="MYTEAM", match_date=MAY_21, our_score=15, opp_score=12),
+        make_match(venue=VENUE_AWAY, opp_id="OPP1", match_date=MAY_28, our_score=18, opp_score=18),
+    ])
+
+
+@pytest.fixture
+def engine(team_a, team_b) -> StandingsEngine:
+    engine = StandingsEngine()
+    engine.update("a.yml", team_a)
+    engine.update("b.yml", team_b)
+    return engine
+
+
+# ===========================================================================
+# Fixture
+# ===========================================================================
+
+class TestFixture:
+
+    def test_home_match(self):
+        fixture = Fixture.from_match(make_league(), make_match(venue=VENUE_HOME, our_score=5, opp_score=2))
+        assert fixture.home == ("MYTEAM", None)
+        assert (fixture.home_score, fixture.away_score) == (5, 2)
+
+    def test_away_match_is_seen_from_the_home_side(self):
+        fixture = Fixture.from_match(make_league(), make_match(venue=VENUE_AWAY, our_score=5, opp_score=2))
+        assert fixture.home == ("OPP1", None)
+        assert fixture.away == ("MYTEAM", None)
+        assert (fixture.home_score, fixture.away_score) == (2, 5)
+
+    def test_sub_team_is_part_of_the_team(self):
+        fixture = Fixture.from_match(make_league(), make_match(venue=VENUE_HOME, sub_team=2))
+        assert fixture.away == ("OPP1", "2")
+
+    def test_both_sides_give_the_same_key(self, team_a, team_b):
+        assert (
+            Fixture.from_match(team_a, team_a.matches[1]).key
+            == Fixture.from_match(team_b, team_b.matches[0]).key
+        )
+
+
+# ===========================================================================
+# StandingsEngine
+# ===========================================================================
+
+class TestStandingsEngine:
+
+    def test_table(self, engine):
+        assert rows_by_team(engine) == {
+            "TEAMB":  {"played": 2, "won": 1, "drawn": 1, "lost": 0, "shots_for": 33, "shots_against": 30, "points": 3},
+            "MYTEAM": {"played": 2, "won": 1, "drawn": 0, "lost": 1, "shots_for": 32, "shots_against": 25, "points": 2},
+            "OPP1":   {"played": 2, "won": 0, "drawn": 1, "lost": 1, "shots_for": 28, "shots_against": 38, "points": 1},
+            "OPP1 2": {"played": 0, "won": 0, "drawn": 0, "lost": 0, "shots_for": 0, "shots_against": 0, "points": 0},
+        }
+
+    def test_shared_fixture_counted_once(self, engine):
+        assert len(engine.fixtures()) == 4
+
+    def test_order(self, engine):
+        assert [row.team for row in engine.table()] == [
+            ("TEAMB", None), ("MYTEAM", None), ("OPP1", None), ("OPP1", "2"),
+        ]
+
+    def test_points_rules(self, team_a, team_b):
+        engine = StandingsEngine(rules=PointsRules(win=3, draw=1, loss=0))
+        engine.update("a.yml", team_a)
+        engine.update("b.yml", team_b)
+        assert rows_by_team(engine)["TEAMB"]["points"] == 4
+
+    def test_unknown_tie_breaker(self):
+        with pytest.raises(ValueError, match="goal_difference"):
+            StandingsEngine(tie_breakers=("goal_difference",))
+
+    def test_played_report_wins_over_unplayed(self, team_a, team_b):
+        engine = StandingsEngine()
+        engine.update("a.yml", team_a)
+        unplayed = replace(team_b, matches=[replace(team_b.matches[0], our_score=0, opp_score=0)])
+        engine.update("b.yml", unplayed)
+        assert rows_by_team(engine)["TEAMB"]["won"] == 1
+
+    def test_conflicting_results_logged(self, team_a, team_b, caplog):
+        engine = StandingsEngine()
+        engine.update("a.yml", team_a)
+        conflicting = replace(team_b, matches=[replace(team_b.matches[0], our_score=16, opp_score=12)])
+        engine.update("b.yml", conflicting)
+        assert "Conflicting results" in caplog.text
+        # the first source in name order is counted
+        assert rows_by_team(engine)["TEAMB"]["shots_for"] == 15
+
+
+# ===========================================================================
+# Incremental updates
+# ===========================================================================
+
+class TestIncremental:
+
+    def test_update_matches_full_rebuild(self, engine, team_a, team_b):
+        edited = replace(team_b, matches=[
+            team_b.matches[0],
+            replace(team_b.matches[1], our_score=21, opp_score=9),
+            make_match(venue=VENUE_HOME, opp_id="OPP3", match_date=date(2024, 6, 4), our_score=7, opp_score=8),
+        ])
+        engine.update("b.yml", edited)
+
+        fresh = StandingsEngine()
+        fresh.update("a.yml", team_a)
+        fresh.update("b.yml", edited)
+        assert rows_by_team(engine) == rows_by_team(fresh)
+
+    def test_update_only_recounts_changed_fixtures(self, engine, team_b):
+        edited = replace(team_b, matches=[team_b.matches[0], replace(team_b.matches[1], our_score=21, opp_score=9)])
+        with patch.object(engine, "_apply", wraps=engine._apply) as apply:
+            engine.update("b.yml", edited)
+        # the changed fixture is taken out and put back; the unchanged one is untouched
+        assert apply.call_count == 2
+
+    def test_remove_source(self, engine, team_a):
+        engine.remove("b.yml")
+        fresh = StandingsEngine()
+        fresh.update("a.yml", team_a)
+        assert rows_by_team(engine) == rows_by_team(fresh)
+        # the shared fixture is still counted from MYTEAM's file
+        assert rows_by_team(engine)["TEAMB"]["won"] == 1
+
+    def test_removing_everything_empties_the_table(self, engine):
+        engine.remove("a.yml")
+        engine.remove("b.yml")
+        assert engine.table() == []
+
+
+# ===========================================================================
+# Tie-breakers
+# ===========================================================================
+
+class TestTieBreakers:
+
+    @pytest.fixture
+    def tied(self) -> League:
+        # TEAMX and TEAMY both win one and lose one with the same shots;
+        # TEAMY won the game between them
+        return league_for("TEAMX", [
+            make_match(venue=VENUE_HOME, opp_id="TEAMY", match_date=MAY_14, our_score=10, opp_score=11),
+            make_match(venue=VENUE_HOME, opp_id="OPP1", match_date=MAY_21, our_score=12, opp_score=11),
+        ])
+
+    @pytest.fixture
+    def tied_y(self) -> League:
+        return league_for("TEAMY", [
+            make_match(venue=VENUE_AWAY, opp_id="TEAMX", match_date=MAY_14, our_score=11, opp_score=10),
+            make_match(venue=VENUE_HOME, opp_id="OPP2", match_date=MAY_28, our_score=11, opp_score=12),
+        ])
+
+    def test_head_to_head(self, tied, tied_y):
+        engine = StandingsEngine()
+        engine.update("x.yml", tied)
+        engine.update("y.yml", tied_y)
+        assert [row.team_id for row in engine.table() if row.team_id.startswith("TEAM")] == ["TEAMY", "TEAMX"]
+
+    def test_without_head_to_head_falls_back_to_team_id(self, tied, tied_y):
+        engine = StandingsEngine(tie_breakers=("shot_difference",))
+        engine.update("x.yml", tied)
+        engine.update("y.yml", tied_y)
+        assert [row.team_id for row in engine.table() if row.team_id.startswith("TEAM")] == ["TEAMX", "TEAMY"]
+
+    def test_shot_difference_before_shots_for(self):
+        engine = StandingsEngine()
+        engine.update("a.yml", league_for("MYTEAM", [
+            make_match(opp_id="OPP1", match_date=MAY_14, our_score=30, opp_score=20),
+            make_match(opp_id="OPP2", match_date=MAY_21, our_score=5, opp_score=21),
+        ]))
+        # OPP1 and MYTEAM are level on points; MYTEAM has the better shot difference
+        assert [row.team_id for row in engine.table()] == ["OPP2", "MYTEAM", "OPP1"]
+
+
+# ===========================================================================
+# Divisions
+# ===========================================================================
+
+class TestGroupDivisions:
+
+    def test_files_sharing_a_fixture_are_grouped(self, team_a, team_b):
+        other = league_for("TEAMC", [make_match(opp_id="OPP1", match_date=MAY_14)])
+        assert group_divisions({"a": team_a, "b": team_b, "c": other}) == [["a", "b"], ["c"]]
+
+    def test_shared_opponent_does_not_link_files(self, team_a):
+        # OPP1 v MYTEAM and OPP1 v TEAMC on the same day are different fixtures
+        other = league_for("TEAMC", [make_match(opp_id="OPP1", match_date=MAY_14)])
+        assert group_divisions({"a": team_a, "c": other}) == [["a"], ["c"]]
+
+
+# ===========================================================================
+# Output
+# ===========================================================================
+
+class TestOutput:
+
+    def test_records(self, engine, registry):
+        records = standings_records(engine.table(), registry)
+        assert records[1]["position"] == 2
+        assert records[1]["name"] == "My Bowls Club"
+        assert records[1]["shot_difference"] == 7
+        assert records[3]["name"] == "Opponents FC 2"
+
+    def test_json(self, engine, registry):
+        buf = io.StringIO()
+        write_json(buf, {"2024": [engine.table()]}, registry)
+        data = json.loads(buf.getvalue())
+        assert [r["team_id"] for r in data["2024"][0]] == ["TEAMB", "MYTEAM", "OPP1", "OPP1"]
+
+    def test_registry_per_season(self, engine, registry):
+        own = registry.overlay({"teams": {"TEAMB": {"name": "Team B", "location": "B Ground"}}})
+        buf = io.StringIO()
+        write_json(buf, {"2023": [engine.table()], "2024": [engine.table()]}, {"2023": registry, "2024": own})
+        data = json.loads(buf.getvalue())
+        assert data["2024"][0][0]["name"] == "Team B"
+        assert data["2023"][0][0]["name"] != "Team B"
+
+    def test_csv(self, engine, registry):
+        buf = io.StringIO()
+        write_csv(buf, {"2024": [engine.table(), engine.table()[:1]]}, registry)
+        rows = list(csv.DictReader(io.StringIO(buf.getvalue())))
+        assert len(rows) == 5
+        assert rows[-1]["division"] == "2"
+        assert rows[0]["points"] == "3"
+
+    def test_print_standings(self, engine, registry):
+        console, table = _FakeConsole(), _FakeTable()
+        with patch("ggbowlscalendar.printer.Console", return_value=console), \
+             patch("ggbowlscalendar.printer.Table", return_value=table):
+            print_standings(engine.table(), registry, highlight=frozenset({"MYTEAM"}))
+        assert table in console.printed
+        assert table.columns[:2] == ["Pos", "Team"]
+        assert table.rows[1][1] == "[bold]My Bowls Club[/]"
+        assert table.rows[1][8] == "+7"
+        assert "[red]" in table.rows[0][1]   # TEAMB is not in the registry
+
+    def test_print_empty(self, registry):
+        console = _FakeConsole()
+        with patch("ggbowlscalendar.printer.Console", return_value=console):
+            print_standings([], registry)
+        assert any("No standings" in str(p) for p in console.printed)
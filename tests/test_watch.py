@@ -0,0 +1,205 @@
+"""
+Tests for watch.py — change detection and targeted rebuilds.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from pathlib import Path
+
+import pytest
+
+from ggbowlscalendar.batch import BACKEND_STREAM, BuildOptions
+from ggbowlscalendar.repository import DataRepository
+from ggbowlscalendar.watch import (
+    InotifyWatcher,
+    PollingWatcher,
+    WatchSession,
+    debounced,
+)
+
+TEAMS_YAML = """\
+MYTEAM:
+  name: My Team
+  location: Home Ground
+OPP1:
+  name: Opponent One
+  location: Ground One
+OPP2:
+  name: Opponent Two
+  location: Ground Two
+"""
+
+
+def _games_yaml(opp_id: str, score: int = 0) -> str:
+    return f"""\
+me: MYTEAM
+day: Tue
+start_time: '18:00'
+duration: 3
+matches:
+- home: {opp_id}
+  date: 2024-05-14
+  our_score: {score}
+  opp_score: 0
+"""
+
+
+def _bump(path: Path, text: str) -> None:
+    """Rewrite *path* and move its mtime forward so the change is always visible."""
+    st = path.stat()
+    path.write_text(text)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+@pytest.fixture
+def data_dir(tmp_path) -> Path:
+    base = tmp_path / "data"
+    (base / "2024").mkdir(parents=True)
+    (base / "teams.yml").write_text(TEAMS_YAML)
+    (base / "2024" / "one_games_2024.yml").write_text(_games_yaml("OPP1"))
+    (base / "2024" / "two_games_2024.yml").write_text(_games_yaml("OPP2"))
+    return base
+
+
+@pytest.fixture
+def session(data_dir, tmp_path, monkeypatch) -> WatchSession:
+    monkeypatch.setenv("ICAL_OUTPUT", str(tmp_path / "out"))
+    teams_path = data_dir / "teams.yml"
+    session = WatchSession(
+        DataRepository.scan(data_dir),
+        teams_path,
+        BuildOptions(shared_inputs={"teams": teams_path}, reproducible=True, backend=BACKEND_STREAM),
+    )
+    session.load()
+    return session
+
+
+def _built(results) -> list[str]:
+    return sorted(r.job.ics_filename for r in results if r.ok)
+
+
+# ===========================================================================
+# WatchSession
+# ===========================================================================
+
+class TestWatchSession:
+
+    def test_loads_every_league(self, session):
+        assert len(session.leagues) == 2
+        assert len(session.dependencies) == 2
+
+    def test_unrelated_team_change_rebuilds_nothing(self, session, data_dir):
+        _bump(data_dir / "teams.yml", TEAMS_YAML + "OTHER:\n  name: Other\n  location: There\n")
+        assert session.apply({data_dir / "teams.yml"}) == []
+
+    def test_games_change_rebuilds_only_that_league(self, session, data_dir):
+        path = data_dir / "2024" / "one_games_2024.yml"
+        _bump(path, _games_yaml("OPP1", score=5))
+        results = session.apply({path})
+        assert _built(results) == ["one_games_2024.ics"]
+        assert session.leagues[path].matches[0].our_score == 5
+
+    def test_teams_change_rebuilds_referencing_leagues(self, session, data_dir):
+        _bump(data_dir / "teams.yml", TEAMS_YAML.replace("Ground Two", "New Ground"))
+        results = session.apply({data_dir / "teams.yml"})
+        assert _built(results) == ["two_games_2024.ics"]
+        assert session.registry.get("OPP2").location == "New Ground"
+
+    def test_own_team_change_rebuilds_everything(self, session, data_dir):
+        _bump(data_dir / "teams.yml", TEAMS_YAML.replace("Home Ground", "Moved"))
+        results = session.apply({data_dir / "teams.yml"})
+        assert _built(results) == ["one_games_2024.ics", "two_games_2024.ics"]
+
+    def test_league_teams_change_rebuilds_that_league(self, session, data_dir, tmp_path):
+        output = tmp_path / "out" / "Apps" / "icalendar" / "one_games_2024.ics"
+        teams_path = data_dir / "2024" / "one_teams.yml"
+        teams_path.write_text("teams:\n  OPP1:\n    name: Overlay One\n    location: Ground One\n")
+        assert _built(session.apply({teams_path})) == ["one_games_2024.ics"]
+        assert b"(Overlay One)" in output.read_bytes()
+        _bump(teams_path, "teams:\n  OPP1:\n    name: Renamed One\n    location: Ground One\n")
+        assert _built(session.apply({teams_path})) == ["one_games_2024.ics"]
+        assert b"(Renamed One)" in output.read_bytes()
+
+    def test_new_file_is_indexed_and_built(self, session, data_dir):
+        path = data_dir / "2024" / "three_games_2024.yml"
+        path.write_text(_games_yaml("OPP1"))
+        assert _built(session.apply({path})) == ["three_games_2024.ics"]
+        assert path in session.leagues
+
+    def test_deleted_file_is_dropped(self, session, data_dir):
+        path = data_dir / "2024" / "one_games_2024.yml"
+        path.unlink()
+        assert session.apply({path}) == []
+        assert path not in session.leagues
+        assert path not in session.dependencies
+
+    def test_broken_yaml_is_skipped(self, session, data_dir):
+        path = data_dir / "2024" / "one_games_2024.yml"
+        _bump(path, "me: MYTEAM\n")
+        assert session.apply({path}) == []
+
+    def test_output_reflects_edit(self, session, data_dir, tmp_path):
+        path = data_dir / "2024" / "one_games_2024.yml"
+        _bump(path, _games_yaml("OPP1", score=7))
+        session.apply({path})
+        output = tmp_path / "out" / "Apps" / "icalendar" / "one_games_2024.ics"
+        assert b"(7 - 0)" in output.read_bytes()
+
+
+# ===========================================================================
+# Watchers
+# ===========================================================================
+
+class _ScriptedWatcher:
+    def __init__(self, batches: list[set]):
+        self.batches = batches
+
+    def changes(self, timeout):
+        if self.batches:
+            return self.batches.pop(0)
+        if timeout is None:
+            raise StopIteration
+        return set()
+
+    def close(self):
+        pass
+
+
+class TestWatchers:
+
+    def test_debounce_merges_a_burst(self):
+        watcher = _ScriptedWatcher([{Path("a.yml")}, {Path("b.yml")}, set(), {Path("c.yml")}])
+        batches = debounced(watcher, delay=0)
+        assert next(batches) == {Path("a.yml"), Path("b.yml")}
+        assert next(batches) == {Path("c.yml")}
+
+    def test_polling_watcher_sees_edits_and_new_files(self, data_dir):
+        watcher = PollingWatcher(data_dir, interval=0.01)
+        path = data_dir / "2024" / "one_games_2024.yml"
+        _bump(path, _games_yaml("OPP2"))
+        (data_dir / "2024" / "new_games_2024.yml").write_text(_games_yaml("OPP1"))
+        (data_dir / "2024" / "notes.txt").write_text("ignored")
+        assert watcher.changes(1.0) == {path, data_dir / "2024" / "new_games_2024.yml"}
+        assert watcher.changes(0.02) == set()
+
+    def test_inotify_watcher_sees_edits(self, data_dir):
+        try:
+            watcher = InotifyWatcher(data_dir)
+        except OSError:
+            pytest.skip("inotify not available")
+        try:
+            path = data_dir / "2024" / "one_games_2024.yml"
+            path.write_text(_games_yaml("OPP2"))
+            assert watcher.changes(1.0) == {path}
+
+            season = data_dir / "2025"
+            season.mkdir()
+            time.sleep(0.05)
+            watcher.changes(0.5)
+            new_file = season / "one_games_2025.yml"
+            new_file.write_text(_games_yaml("OPP1"))
+            assert new_file in watcher.changes(1.0)
+        finally:
+            watcher.close()
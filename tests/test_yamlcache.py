@@ -0,0 +1,159 @@
+"""
+Tests for yamlcache.py — the on-disk parsed-YAML cache.
+"""
+
+from __future__ import annotations
+
+import os
+import pickle
+from unittest.mock import patch
+
+import pytest
+
+from ggbowlscalendar import utils
+from ggbowlscalendar.yamlcache import YamlCache, get_yaml_cache
+
+
+class _CountingParser:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, path):
+        self.calls += 1
+        return utils._parse_yaml(path)
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "data.yml"
+    path.write_text("key: value\nwhen: 2024-05-14\n")
+    return path
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return YamlCache(tmp_path / "cache", max_bytes=1024 * 1024)
+
+
+# ===========================================================================
+# YamlCache.load
+# ===========================================================================
+
+class TestYamlCacheLoad:
+
+    def test_second_load_skips_parse(self, cache, source):
+        parse = _CountingParser()
+        first = cache.load(source, parse)
+        second = cache.load(source, parse)
+        assert first == second
+        assert parse.calls == 1
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_cached_value_keeps_date_type(self, cache, source):
+        parse = _CountingParser()
+        cache.load(source, parse)
+        assert cache.load(source, parse)["when"].isoformat() == "2024-05-14"
+
+    def test_size_change_invalidates(self, cache, source):
+        parse = _CountingParser()
+        cache.load(source, parse)
+        source.write_text("key: changed value\n")
+        assert cache.load(source, parse) == {"key": "changed value"}
+        assert parse.calls == 2
+
+    def test_mtime_change_invalidates(self, cache, source):
+        parse = _CountingParser()
+        cache.load(source, parse)
+        st = source.stat()
+        os.utime(source, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+        cache.load(source, parse)
+        assert parse.calls == 2
+
+    def test_hash_check_catches_same_size_same_mtime_edit(self, tmp_path, source):
+        cache = YamlCache(tmp_path / "cache", max_bytes=1024 * 1024, verify_hash=True)
+        parse = _CountingParser()
+        cache.load(source, parse)
+        st = source.stat()
+        source.write_text("key: VALUE\nwhen: 2024-05-14\n")
+        os.utime(source, ns=(st.st_atime_ns, st.st_mtime_ns))
+        assert cache.load(source, parse)["key"] == "VALUE"
+
+    def test_corrupt_entry_treated_as_miss(self, cache, source):
+        parse = _CountingParser()
+        cache.load(source, parse)
+        for entry in cache.cache_dir.glob("*.pickle"):
+            entry.write_bytes(b"not a pickle")
+        assert cache.load(source, parse)["key"] == "value"
+        assert parse.calls == 2
+
+    def test_unwritable_cache_dir_still_loads(self, tmp_path, source):
+        (tmp_path / "file").write_text("")
+        cache = YamlCache(tmp_path / "file" / "cache", max_bytes=1024 * 1024)
+        parse = _CountingParser()
+        assert cache.load(source, parse)["key"] == "value"
+        assert cache.load(source, parse)["key"] == "value"
+        assert parse.calls == 2
+
+    def test_failed_write_leaves_no_temp_file(self, cache, source):
+        with patch("ggbowlscalendar.yamlcache.os.replace", side_effect=PermissionError("read-only")):
+            assert cache.load(source, _CountingParser())["key"] == "value"
+        assert list(cache.cache_dir.iterdir()) == []
+
+    def test_entry_is_pickle(self, cache, source):
+        cache.load(source, _CountingParser())
+        (entry,) = cache.cache_dir.glob("*.pickle")
+        assert pickle.loads(entry.read_bytes()).data["key"] == "value"
+
+
+# ===========================================================================
+# Eviction
+# ===========================================================================
+
+class TestYamlCacheEviction:
+
+    def test_least_recently_used_entry_evicted(self, tmp_path):
+        files = []
+        for i in range(3):
+            f = tmp_path / f"f{i}.yml"
+            f.write_text(f"n: {i}\n" + "pad: " + "x" * 200 + "\n")
+            files.append(f)
+
+        cache = YamlCache(tmp_path / "cache", max_bytes=10 ** 6)
+        parse = _CountingParser()
+        for i, f in enumerate(files):
+            cache.load(f, parse)
+            entry = cache._entry_path(f)
+            os.utime(entry, ns=(i * 10 ** 9, i * 10 ** 9))
+
+        # Make f0 the most recently used, then shrink the cap to two entries
+        cache.load(files[0], parse)
+        entry_size = cache._entry_path(files[1]).stat().st_size
+        cache.max_bytes = entry_size * 2 + entry_size // 2
+        cache.evict()
+
+        assert cache._entry_path(files[0]).exists()
+        assert not cache._entry_path(files[1]).exists()
+        assert cache._entry_path(files[2]).exists()
+
+
+# ===========================================================================
+# Configuration / load_yaml integration
+# ===========================================================================
+
+class TestGetYamlCache:
+
+    def test_disabled_by_env(self, monkeypatch):
+        monkeypatch.setenv("ICAL_YAML_CACHE", "off")
+        assert get_yaml_cache() is None
+
+    def test_enabled_uses_configured_dir(self, monkeypatch, tmp_path):
+        monkeypatch.setenv("ICAL_YAML_CACHE", "on")
+        monkeypatch.setenv("ICAL_YAML_CACHE_DIR", str(tmp_path / "c"))
+        assert get_yaml_cache().cache_dir == tmp_path / "c"
+
+    def test_load_yaml_uses_cache(self, monkeypatch, tmp_path, source):
+        monkeypatch.setenv("ICAL_YAML_CACHE", "on")
+        monkeypatch.setenv("ICAL_YAML_CACHE_DIR", str(tmp_path / "c2"))
+        utils.load_yaml(source)
+        assert utils.load_yaml(source)["key"] == "value"
+        assert get_yaml_cache().hits == 1